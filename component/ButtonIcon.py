@@ -1,8 +1,8 @@
 from PySide2.QtCore import Property, QAbstractAnimation, QEasingCurve, QEvent, QPropertyAnimation, QSize
-from PySide2.QtGui import QColor, QCursor, QIcon, QPixmap, Qt
+from PySide2.QtGui import QColor, QCursor, Qt
 from PySide2.QtWidgets import QPushButton
 
-import os
+from .IconAtlas import IconAtlas
 
 class ButtonIcon(QPushButton):
     def __init__(self, label=None, icon="", iconsize=40, inactive=(255, 255, 255), active=(255, 0, 0), duration=300):
@@ -12,17 +12,17 @@ class ButtonIcon(QPushButton):
         self.inactiveColor = QColor(inactive[0], inactive[1], inactive[2])
         self.animDuration = duration
         self.iconResolution = iconsize
+        self.atlas = IconAtlas.shared()
+        self.iconPath = None
+        self.hasIcon = False
+        self._iconKey = None
         
         self.setStyleSheet("background-color : transparent;")
         
         self.setFixedSize(self.iconResolution+5,self.iconResolution+5)
         self.setCursor(QCursor(Qt.PointingHandCursor))
         self.changeIcon(icon)
-        if hasattr(self, "px_mask"):
-            self.px.fill(self.inactiveColor)
-            self.px.setMask(self.px_mask)
-            
-            self.setIcon(QIcon(self.px))
+        if self.hasIcon:
             self.setIconSize(QSize(self.iconResolution, self.iconResolution))
 
         if isinstance(label, str):
@@ -31,7 +31,7 @@ class ButtonIcon(QPushButton):
             self.setFont(font)
             self.setText(label)
             
-        if self.px:
+        if self.hasIcon:
             self.setColor(self.inactiveColor)
             self.hoverAnimation = self.animate(self.inactiveColor, self.activeColor, self.animDuration, self.animationCallback)
             self.leaveAnimation = self.animate(self.activeColor, self.inactiveColor, self.animDuration, self.animationCallback)
@@ -43,19 +43,27 @@ class ButtonIcon(QPushButton):
     Height = Property(int, getHeight, setHeight)
 
     def changeIcon(self, path):
-        self.iconPath = path
-        if os.path.isfile(self.iconPath):
-            self.px = QPixmap(self.iconPath)
-            self.px.scaled(self.iconResolution, self.iconResolution, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            self.px_mask = self.px.createMaskFromColor(QColor('transparent'))
+        # The atlas only reads a file the first time it is shown at this size
+        if self.atlas.shape(path, self.iconResolution, self.devicePixelRatioF()) is not None:
+            self.iconPath = path
+            self.hasIcon = True
+            self._iconKey = None
         self.event(QEvent(QEvent.Type.MouseButtonRelease))
         self.update()
 
+    def tint(self, color):
+        if not self.hasIcon:
+            return
+        ratio = self.devicePixelRatioF()
+        key = (self.iconPath, ratio, self.atlas.quantize(color))
+        if key == self._iconKey:
+            return
+        self._iconKey = key
+        self.setIcon(self.atlas.icon(self.iconPath, self.iconResolution, color, ratio))
+
     def setColor(self,value): 
         self.__color = value
-        self.px.fill(self.__color)
-        self.px.setMask(self.px_mask)
-        self.setIcon(QIcon(self.px))
+        self.tint(value)
 
     def getColor(self): return self.__color
     color = Property(QColor, getColor, setColor)
@@ -94,12 +102,8 @@ class ButtonIcon(QPushButton):
                 (self.inactiveColor.green() + self.activeColor.green())/2,
                 (self.inactiveColor.blue() + self.activeColor.blue())/2
             )
-            self.px.fill(pressColor)
-            self.px.setMask(self.px_mask)
-            self.setIcon(QIcon(self.px))
+            self.tint(pressColor)
         elif event.type() == QEvent.Type.MouseButtonRelease:
-            self.px.fill(self.activeColor)
-            self.px.setMask(self.px_mask)
-            self.setIcon(QIcon(self.px))
+            self.tint(self.activeColor)
 
         return super(ButtonIcon, self).event(event)
\ No newline at end of file
@@ -0,0 +1,105 @@
+from collections import deque
+from PySide2.QtCore import QObject, QTimer, Signal
+
+class EventBridge(QObject):
+    # libvlc callbacks run on libvlc threads, they only append to a deque or overwrite a slot
+    # (both atomic under the GIL) and the GUI thread drains everything at most once per frame.
+    # State transitions are queued in order, time and buffering only keep their latest value.
+    stateChanged = Signal(str)
+    timeChanged = Signal(int)
+    bufferChanged = Signal(float)
+    lengthChanged = Signal(int)
+    _wake = Signal()
+
+    def __init__(self, parent=None, frameInterval=16):
+        super(EventBridge, self).__init__(parent)
+        self.states = deque()
+        self.time = None
+        self.buffer = None
+        self.length = None
+        self.lastState = None
+        self.received = 0
+        self.dropped = 0
+        self.delivered = 0
+        self._scheduled = False
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(frameInterval)
+        self.timer.timeout.connect(self.flush)
+        self._wake.connect(self._schedule)
+
+    # libvlc thread side
+    def onState(self, event, state):
+        self.received += 1
+        self.lastState = state
+        self.states.append(state)
+        self._notify()
+
+    def onTime(self, event):
+        self.received += 1
+        if self.time is not None:
+            self.dropped += 1
+        self.time = event.u.new_time
+        self._notify()
+
+    def onBuffer(self, event):
+        # libvlc keeps a single callback per event type, the Buffering transition is derived here
+        if self.lastState != 'Buffering':
+            self.onState(event, 'Buffering')
+        self.received += 1
+        if self.buffer is not None:
+            self.dropped += 1
+        self.buffer = event.u.new_cache
+        self._notify()
+
+    def onLength(self, event):
+        self.received += 1
+        if self.length is not None:
+            self.dropped += 1
+        self.length = event.u.new_length
+        self._notify()
+
+    def _notify(self):
+        if not self._scheduled:
+            self._scheduled = True
+            self._wake.emit()
+
+    # GUI thread side
+    def _schedule(self):
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def flush(self):
+        self._scheduled = False
+        while self.states:
+            self.delivered += 1
+            self.stateChanged.emit(self.states.popleft())
+
+        length, self.length = self.length, None
+        if length is not None:
+            self.delivered += 1
+            self.lengthChanged.emit(length)
+
+        buffer, self.buffer = self.buffer, None
+        if buffer is not None:
+            self.delivered += 1
+            self.bufferChanged.emit(buffer)
+
+        ms, self.time = self.time, None
+        if ms is not None:
+            self.delivered += 1
+            self.timeChanged.emit(ms)
+
+    def clear(self):
+        self.states.clear()
+        self.time = None
+        self.buffer = None
+        self.length = None
+
+    def stats(self):
+        return {
+            'received' : self.received,
+            'dropped' : self.dropped,
+            'delivered' : self.delivered
+        }
@@ -0,0 +1,203 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import repeat
+from operator import add
+
+class BoxReader(object):
+    # Minimal ISO-BMFF (MP4/MOV) box walker over an mmap, only the box headers and sample tables are ever paged in
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.view = memoryview(buffer)
+
+    def boxes(self, start, end):
+        offset = start
+        while offset + 8 <= end:
+            size, kind = struct.unpack_from(">I4s", self.buffer, offset)
+            header = 8
+            if size == 1:
+                size, = struct.unpack_from(">Q", self.buffer, offset + 8)
+                header = 16
+            elif size == 0:
+                size = end - offset
+            if size < header or offset + size > end:
+                return
+            yield kind, offset + header, offset + size
+            offset += size
+
+    def find(self, start, end, *path):
+        for kind, begin, finish in self.boxes(start, end):
+            if kind == path[0]:
+                if len(path) == 1:
+                    return begin, finish
+                found = self.find(begin, finish, *path[1:])
+                if found:
+                    return found
+        return None
+
+    def fullBox(self, box):
+        # Skip version and flags, returns (version, payload start, end)
+        begin, end = box
+        return self.buffer[begin], begin + 4, end
+
+    def table(self, box, fmt):
+        _, begin, end = self.fullBox(box)
+        count, = struct.unpack_from(">I", self.buffer, begin)
+        size = struct.calcsize(fmt)
+        begin += 4
+        count = min(count, (end - begin) // size)
+        return struct.iter_unpack(fmt, self.view[begin:begin + count * size]), count
+
+    def words(self, box, fields=1, typecode="I"):
+        # Large tables of 32 bit fields are read in one go as a native array
+        _, begin, end = self.fullBox(box)
+        count, = struct.unpack_from(">I", self.buffer, begin)
+        begin += 4
+        count = min(count, (end - begin) // (4 * fields))
+        table = array(typecode)
+        table.frombytes(self.view[begin:begin + count * 4 * fields])
+        if sys.byteorder == "little":
+            table.byteswap()
+        return table
+
+class FrameIndex(object):
+    extensions = (".mp4", ".m4v", ".mov", ".3gp", ".mj2")
+
+    def __init__(self, timescale, pts, keyframes, editOffset=0):
+        self.timescale = timescale
+        self.pts = pts
+        self.keyframes = keyframes
+        self.editOffset = editOffset
+
+    @classmethod
+    def supports(cls, path):
+        return bool(path) and os.path.splitext(path)[1].lower() in cls.extensions and os.path.isfile(path)
+
+    @classmethod
+    def fromFile(cls, path):
+        try:
+            with open(path, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                    reader = BoxReader(buffer)
+                    try:
+                        return cls.fromReader(reader, len(buffer))
+                    finally:
+                        reader.view.release()
+        except (OSError, ValueError, BufferError, struct.error):
+            return None
+
+    @classmethod
+    def fromReader(cls, reader, size):
+        moov = reader.find(0, size, b"moov")
+        if not moov:
+            return None
+        for kind, begin, end in reader.boxes(*moov):
+            if kind != b"trak":
+                continue
+            hdlr = reader.find(begin, end, b"mdia", b"hdlr")
+            if not hdlr or bytes(reader.view[hdlr[0]+8:hdlr[0]+12]) != b"vide":
+                continue
+            return cls.fromTrack(reader, begin, end)
+        return None
+
+    @classmethod
+    def fromTrack(cls, reader, begin, end):
+        mdhd = reader.find(begin, end, b"mdia", b"mdhd")
+        stbl = reader.find(begin, end, b"mdia", b"minf", b"stbl")
+        stts = stbl and reader.find(*stbl, b"stts")
+        if not mdhd or not stts:
+            return None
+        version, mdhd, _ = reader.fullBox(mdhd)
+        if version == 1:
+            timescale, = struct.unpack_from(">I", reader.buffer, mdhd + 16)
+        else:
+            timescale, = struct.unpack_from(">I", reader.buffer, mdhd + 8)
+        if not timescale:
+            return None
+
+        # Decode timestamps from the stts run lengths
+        entries, _ = reader.table(stts, ">II")
+        dts = array("q")
+        current = 0
+        for count, delta in entries:
+            dts.extend(range(current, current + count * delta, delta) if delta else [current] * count)
+            current += count * delta
+
+        # Composition offsets turn decode order into presentation time
+        ctts = reader.find(*stbl, b"ctts")
+        if ctts:
+            table = reader.words(ctts, 2, "i")
+            counts, offsets = table[0::2], table[1::2]
+            if len(offsets) != len(dts):
+                expanded = array("i")
+                for count, offset in zip(counts, offsets):
+                    expanded.extend(repeat(offset, count))
+                del expanded[len(dts):]
+                expanded.extend(repeat(0, len(dts) - len(expanded)))
+                offsets = expanded
+            dts = array("q", map(add, dts, offsets))
+
+        stsz = reader.find(*stbl, b"stsz")
+        if stsz:
+            _, payload, _ = reader.fullBox(stsz)
+            count, = struct.unpack_from(">I", reader.buffer, payload + 4)
+            del dts[count:]
+
+        pts = array("q", sorted(dts))
+
+        # Sync samples are numbered in decode order, map them to presentation frame numbers
+        stss = reader.find(*stbl, b"stss")
+        keyframes = array("I")
+        if stss:
+            keyTimes = sorted(dts[n - 1] for n in reader.words(stss) if 0 < n <= len(dts))
+            keyframes.extend(bisect_right(pts, t) - 1 for t in keyTimes)
+        else:
+            keyframes.extend(range(len(pts)))
+
+        editOffset = 0
+        elst = reader.find(begin, end, b"edts", b"elst")
+        if elst:
+            version = reader.fullBox(elst)[0]
+            entries, _ = reader.table(elst, ">QqI" if version else ">IiI")
+            for duration, mediaTime, rate in entries:
+                if mediaTime >= 0:
+                    editOffset = mediaTime
+                    break
+        return cls(timescale, pts, keyframes, editOffset)
+
+    @property
+    def frameCount(self):
+        return len(self.pts)
+
+    @property
+    def duration(self):
+        if not self.pts:
+            return 0.0
+        last = self.pts[-1] - self.pts[-2] if len(self.pts) > 1 else 0
+        return self.timeOf(len(self.pts) - 1) + last * 1000 / self.timescale
+
+    @property
+    def fps(self):
+        return self.frameCount / (self.duration / 1000) if self.duration else 0.0
+
+    def timeOf(self, frame):
+        # Presentation time in ms of a frame number
+        if not self.pts:
+            return 0.0
+        frame = max(min(int(frame), len(self.pts) - 1), 0)
+        return max(self.pts[frame] - self.editOffset, 0) * 1000 / self.timescale
+
+    def frameAt(self, ms):
+        # The frame on screen at a given time in ms. libvlc reports whole ms truncated and timeOf is a float,
+        # so a time less than 1 ms before a frame's pts already counts as that frame
+        if not self.pts:
+            return 0
+        ticks = (ms + 1) * self.timescale / 1000 + self.editOffset
+        return max(bisect_left(self.pts, ticks) - 1, 0)
+
+    def keyframeBefore(self, frame):
+        index = bisect_right(self.keyframes, frame) - 1
+        return self.keyframes[index] if index >= 0 else 0
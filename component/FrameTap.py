@@ -0,0 +1,275 @@
+import ctypes
+import threading
+import time
+from collections import deque
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .MediaContainer import vlc
+
+# python-vlc declares the chroma as c_char_p which can't be written back, the same prototype with a writable buffer
+VideoFormatCb = ctypes.CFUNCTYPE(ctypes.c_uint, ctypes.POINTER(ctypes.c_void_p), ctypes.POINTER(ctypes.c_char),
+    ctypes.POINTER(ctypes.c_uint), ctypes.POINTER(ctypes.c_uint), ctypes.POINTER(ctypes.c_uint), ctypes.POINTER(ctypes.c_uint))
+
+class Frame(object):
+    # A decoded picture living in one of the tap's pool buffers, the planes are views and stay valid until released
+    __slots__ = ("tap", "slot", "generation", "number", "timestamp", "planes")
+
+    def __init__(self, tap, slot, generation, number, timestamp, planes):
+        self.tap = tap
+        self.slot = slot
+        self.generation = generation
+        self.number = number
+        self.timestamp = timestamp
+        self.planes = planes
+
+    @property
+    def array(self):
+        return self.planes[0]
+
+    def release(self):
+        if self.tap is not None:
+            self.tap.release(self)
+            self.tap = None
+
+class FrameTap(object):
+    # Opt-in access to the decoded pictures of a player through the libvlc video callbacks.
+    # Pictures are decoded straight into a fixed pool of NumPy buffers, nothing is copied on the way to the consumer.
+    # With the "drop" policy a full pool recycles the oldest unread frame, with "block" the decoder waits for a release.
+    # A slot goes back to the pool once libvlc unlocked it and the consumer is done with it, whichever comes last:
+    # late pictures are unlocked without being displayed and a displayed picture can be displayed again
+    slotIdle, slotFilled, slotHeld = range(3)
+    chromas = {
+        # per plane (width divisor, height divisor, bytes per pixel)
+        "RV32" : ((1, 1, 4),),
+        "RV24" : ((1, 1, 3),),
+        "GREY" : ((1, 1, 1),),
+        "I420" : ((1, 1, 1), (2, 2, 1), (2, 2, 1)),
+    }
+
+    def __init__(self, chroma="RV32", poolSize=4, policy="drop", blockTimeout=0.5, condition=None):
+        if chroma not in self.chromas:
+            raise ValueError(f"Unsupported chroma {chroma}")
+        if policy not in ("drop", "block"):
+            raise ValueError(f"Unknown policy {policy}")
+        self.chroma = chroma
+        self.poolSize = max(poolSize, 2)
+        self.policy = policy
+        self.blockTimeout = blockTimeout
+        # A shared condition lets one consumer wait on several taps
+        self.condition = condition or threading.Condition()
+        # Called on the decoder thread after every published frame, for consumers that don't wait on the condition
+        self.onPublish = None
+
+        self.width = self.height = 0
+        self.generation = 0
+        self.layout = []
+        self.buffers = []
+        self.free = deque()
+        self.filled = deque()
+        # Per slot, the consumer side state and whether libvlc has it locked
+        self.state = []
+        self.locked = []
+        self.frameNumber = 0
+
+        self.produced = 0
+        self.consumed = 0
+        self.dropped = 0
+        self.blocked = 0
+        self._latest = None
+
+        @VideoFormatCb
+        def setup(opaque, chroma, width, height, pitches, lines):
+            ctypes.memmove(chroma, self.chroma.encode("ascii"), 4)
+            self.allocate(width[0], height[0])
+            for i, (pitch, rows, _, _) in enumerate(self.layout):
+                pitches[i] = pitch
+                lines[i] = rows
+            return self.poolSize
+
+        @vlc.CallbackDecorators.VideoCleanupCb
+        def cleanup(opaque):
+            with self.condition:
+                self.generation += 1
+                self.condition.notify_all()
+
+        @vlc.CallbackDecorators.VideoLockCb
+        def lock(opaque, planes):
+            slot = self.acquire()
+            for i, pointer in enumerate(self.pointers[slot]):
+                planes[i] = pointer
+            return slot + 1
+
+        @vlc.CallbackDecorators.VideoUnlockCb
+        def unlock(opaque, picture, planes):
+            self.unlock(picture - 1)
+
+        @vlc.CallbackDecorators.VideoDisplayCb
+        def display(opaque, picture):
+            self.publish(picture - 1)
+
+        self._callbacks = (setup, cleanup, lock, unlock, display)
+
+    @staticmethod
+    def available():
+        return np is not None
+
+    def install(self, player):
+        setup, cleanup, lock, unlock, display = self._callbacks
+        player.video_set_callbacks(lock, unlock, display, None)
+        player.video_set_format_callbacks(ctypes.cast(setup, vlc.CallbackDecorators.VideoFormatCb), cleanup)
+        return player
+
+    def allocate(self, width, height):
+        # Every slot is one contiguous buffer with 32 byte aligned plane pitches
+        with self.condition:
+            self.width, self.height = width, height
+            self.layout = []
+            offset = 0
+            for wDiv, hDiv, bpp in self.chromas[self.chroma]:
+                planeWidth = -(-width // wDiv)
+                rows = -(-height // hDiv)
+                pitch = (planeWidth * bpp + 31) // 32 * 32
+                self.layout.append((pitch, rows, offset, (planeWidth, bpp)))
+                offset += pitch * rows
+            self.generation += 1
+            # One extra scratch buffer past the pool for when the consumer holds every slot
+            self.buffers = [np.empty(offset, dtype=np.uint8) for i in range(self.poolSize + 1)]
+            self.pointers = [[buffer.ctypes.data + plane[2] for plane in self.layout] for buffer in self.buffers]
+            self.views = [self.planeViews(buffer) for buffer in self.buffers]
+            self.free = deque(range(self.poolSize))
+            self.filled.clear()
+            self.state = [self.slotIdle] * self.poolSize
+            self.locked = [False] * self.poolSize
+            self._latest = None
+            self.condition.notify_all()
+
+    def planeViews(self, buffer):
+        views = []
+        for pitch, rows, offset, (planeWidth, bpp) in self.layout:
+            view = buffer[offset:offset + pitch * rows].reshape(rows, pitch)[:, :planeWidth * bpp]
+            views.append(view.reshape(rows, planeWidth, bpp) if bpp > 1 else view)
+        return tuple(views)
+
+    def _recycle(self, slot):
+        # Called with the condition held
+        self.state[slot] = self.slotIdle
+        if not self.locked[slot]:
+            self.free.append(slot)
+            self.condition.notify_all()
+
+    # Decoder thread side
+    def acquire(self):
+        with self.condition:
+            if not self.free and self.policy == "block":
+                self.blocked += 1
+                self.condition.wait_for(lambda: self.free, self.blockTimeout)
+            if not self.free and self.filled:
+                # Drop the oldest unread frame, also the fallback when blocking timed out
+                slot, _, _ = self.filled.popleft()
+                self._recycle(slot)
+                self.dropped += 1
+            if not self.free:
+                # Every slot is held by the consumer or libvlc, decode into the scratch buffer nobody reads
+                return self.poolSize
+            slot = self.free.popleft()
+            self.locked[slot] = True
+            return slot
+
+    def unlock(self, slot):
+        with self.condition:
+            if slot >= self.poolSize or not self.locked[slot]:
+                return
+            self.locked[slot] = False
+            if self.state[slot] == self.slotIdle:
+                # Never displayed, or already read and released
+                self.free.append(slot)
+                self.condition.notify_all()
+
+    def publish(self, slot):
+        with self.condition:
+            if slot >= self.poolSize:
+                self.dropped += 1
+                return
+            if not self.locked[slot] or self.state[slot] != self.slotIdle:
+                # Displayed again while still queued or read
+                return
+            self.state[slot] = self.slotFilled
+            self.frameNumber += 1
+            self.produced += 1
+            self.filled.append((slot, self.frameNumber, time.perf_counter()))
+            self.condition.notify_all()
+        if self.onPublish is not None:
+            self.onPublish()
+
+    # Consumer side
+    def _take(self, slot, number, timestamp):
+        self.state[slot] = self.slotHeld
+        self.consumed += 1
+        return Frame(self, slot, self.generation, number, timestamp, self.views[slot])
+
+    def release(self, frame):
+        with self.condition:
+            if frame.generation != self.generation or self.state[frame.slot] != self.slotHeld:
+                return
+            self._recycle(frame.slot)
+            if self._latest is frame:
+                self._latest = None
+
+    def latest(self, timeout=0):
+        # The newest frame, older unread frames are recycled. The previously returned latest frame is released,
+        # so a polling consumer never has to release anything itself
+        with self.condition:
+            if not self.filled and timeout:
+                self.condition.wait_for(lambda: self.filled, timeout)
+            if not self.filled:
+                return self._latest
+            while len(self.filled) > 1:
+                slot, _, _ = self.filled.popleft()
+                self._recycle(slot)
+                self.dropped += 1
+            previous = self._latest
+            self._latest = self._take(*self.filled.popleft())
+        if previous is not None:
+            previous.release()
+        return self._latest
+
+    def next(self, timeout=None):
+        # The oldest unread frame in decode order, the caller releases it
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.filled, timeout):
+                return None
+            return self._take(*self.filled.popleft())
+
+    def frames(self, timeout=None):
+        # Iterates frames in order until no frame arrives within timeout, each one is released when the next is requested
+        frame = None
+        try:
+            while True:
+                if frame is not None:
+                    frame.release()
+                frame = self.next(timeout)
+                if frame is None:
+                    return
+                yield frame
+        finally:
+            if frame is not None:
+                frame.release()
+
+    def hasNew(self):
+        return bool(self.filled)
+
+    def stats(self):
+        with self.condition:
+            return {
+                'produced' : self.produced,
+                'consumed' : self.consumed,
+                'dropped' : self.dropped,
+                'blocked' : self.blocked,
+                'pending' : len(self.filled),
+                'held' : self.state.count(self.slotHeld),
+                'poolSize' : self.poolSize
+            }
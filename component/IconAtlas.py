@@ -0,0 +1,86 @@
+from collections import OrderedDict
+from PySide2.QtCore import QSize, Qt
+from PySide2.QtGui import QColor, QIcon, QImage, QImageReader, QPainter, QPixmap
+
+class IconAtlas(object):
+    # Process wide cache of icons, every SVG is rasterized once per display size and device pixel ratio
+    # and tinted variants are kept in a bounded LRU keyed by (path, size, ratio, quantized color)
+    _shared = None
+
+    @classmethod
+    def shared(cls):
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def __init__(self, maxEntries=512, quantumBits=3):
+        self.maxEntries = maxEntries
+        # Animation steps that only differ in the low bits of each channel share one icon
+        self.quantumBits = quantumBits
+        keep = (0xFF << quantumBits) & 0xFF
+        self.mask = keep * 0x01010101
+        self.shapes = {}
+        self.icons = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def shape(self, path, size, ratio=1.0):
+        # Alpha shape of the icon rendered at its final pixel size, None when the file can't be read
+        key = (path, size, ratio)
+        if key in self.shapes:
+            return self.shapes[key]
+        reader = QImageReader(path)
+        image = None
+        if reader.canRead():
+            pixels = int(round(size * ratio))
+            source = reader.size()
+            if source.isValid():
+                reader.setScaledSize(source.scaled(QSize(pixels, pixels), Qt.KeepAspectRatio))
+            image = reader.read()
+            if image.isNull():
+                image = None
+            else:
+                image = image.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+        self.shapes[key] = image
+        return image
+
+    def quantize(self, color):
+        return color.rgba() & self.mask
+
+    def tintColor(self, quantized):
+        # The high bits are replicated into the cleared ones so 0 and 255 come out exact
+        channels = [(quantized >> shift) & 0xFF for shift in (16, 8, 0, 24)]
+        return QColor(*(c | (c >> (8 - self.quantumBits)) for c in channels))
+
+    def icon(self, path, size, color, ratio=1.0):
+        quantized = self.quantize(color)
+        key = (path, size, ratio, quantized)
+        icon = self.icons.get(key)
+        if icon is not None:
+            self.icons.move_to_end(key)
+            self.hits += 1
+            return icon
+        self.misses += 1
+
+        shape = self.shape(path, size, ratio)
+        if shape is None:
+            return QIcon()
+        # Keep the anti aliased edges, the color only replaces what is under the shape's alpha
+        tinted = QImage(shape)
+        painter = QPainter(tinted)
+        painter.setCompositionMode(QPainter.CompositionMode_SourceIn)
+        painter.fillRect(tinted.rect(), self.tintColor(quantized))
+        painter.end()
+        pixmap = QPixmap.fromImage(tinted)
+        pixmap.setDevicePixelRatio(ratio)
+        icon = QIcon(pixmap)
+
+        self.icons[key] = icon
+        while len(self.icons) > self.maxEntries:
+            self.icons.popitem(last=False)
+        return icon
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {'hits' : self.hits, 'misses' : self.misses, 'hitRate' : self.hits / total if total else 0.0,
+                'icons' : len(self.icons), 'shapes' : len(self.shapes)}
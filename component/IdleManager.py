@@ -0,0 +1,61 @@
+import time
+from PySide2.QtCore import QObject, QTimer, Signal
+
+class IdleManager(QObject):
+    # Event driven idle detection with a single deadline timer. Activity only moves the deadline forward,
+    # the timer is re-armed when it fires early, so a busy mouse costs no extra wakeups and an idle or
+    # stopped manager costs none at all
+    idle = Signal()
+    active = Signal()
+
+    def __init__(self, parent=None, timeout=5000):
+        super(IdleManager, self).__init__(parent)
+        self.timeout = timeout
+        self.deadline = 0.0
+        self.isIdle = False
+        self.running = False
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._onTimer)
+
+        self.wakeups = 0
+        self._since = time.monotonic()
+
+    def setTimeout(self, timeout):
+        self.timeout = timeout
+        if self.running:
+            self.poke()
+
+    def poke(self):
+        # Mouse or keyboard activity
+        self.running = True
+        self.deadline = time.monotonic() + self.timeout / 1000
+        if self.isIdle:
+            self.isIdle = False
+            self.active.emit()
+        if not self.timer.isActive():
+            self.timer.start(self.timeout)
+
+    def stop(self):
+        # Nothing to watch, e.g. the cursor left or the window is hidden
+        self.running = False
+        self.timer.stop()
+
+    def _onTimer(self):
+        self.wakeups += 1
+        remaining = self.deadline - time.monotonic()
+        if remaining > 0.001:
+            self.timer.start(int(remaining * 1000) + 1)
+            return
+        self.running = False
+        self.isIdle = True
+        self.idle.emit()
+
+    def wakeupsPerSecond(self):
+        elapsed = time.monotonic() - self._since
+        return self.wakeups / elapsed if elapsed > 0 else 0.0
+
+    def resetStats(self):
+        self.wakeups = 0
+        self._since = time.monotonic()
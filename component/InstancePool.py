@@ -0,0 +1,51 @@
+import threading
+
+class InstancePool(object):
+    # Every libvlc Instance loads the whole plugin set and spawns its own threads,
+    # players asking for the same options share one instance and it is released with the last of them
+    def __init__(self, factory):
+        self.factory = factory
+        self.lock = threading.Lock()
+        self.instances = {}
+        self.refCounts = {}
+
+    @staticmethod
+    def split(options):
+        if isinstance(options, str):
+            options = options.split()
+        return list(options or ())
+
+    @classmethod
+    def key(cls, options):
+        # Sorted only to match the same options given in another order, libvlc gets them as passed
+        return tuple(sorted(cls.split(options)))
+
+    def acquire(self, options=()):
+        options = self.split(options)
+        key = self.key(options)
+        with self.lock:
+            instance = self.instances.get(key)
+            if instance is None:
+                instance = self.factory(options)
+                self.instances[key] = instance
+                self.refCounts[key] = 0
+            self.refCounts[key] += 1
+            return instance
+
+    def release(self, instance):
+        with self.lock:
+            for key, shared in self.instances.items():
+                if shared is instance:
+                    break
+            else:
+                return
+            self.refCounts[key] -= 1
+            if self.refCounts[key] > 0:
+                return
+            del self.instances[key]
+            del self.refCounts[key]
+        instance.release()
+
+    def stats(self):
+        with self.lock:
+            return {" ".join(key) or "default" : count for key, count in self.refCounts.items()}
@@ -0,0 +1,74 @@
+import json
+import os
+import time
+from collections import deque
+
+class LatencyMonitor(object):
+    # Every recording method returns straight away when disabled so it can stay wired in the hot paths
+    def __init__(self, enabled=None, window=512):
+        if enabled is None:
+            enabled = os.environ.get("VLCPLAYER_LATENCY", "") not in ("", "0")
+        self.enabled = enabled
+        self.window = window
+        self.marks = {}
+        self.samples = {}
+        self.recorded = set()
+
+    def setEnabled(self, enabled):
+        self.enabled = enabled
+        if not enabled:
+            self.marks.clear()
+
+    def start(self, name):
+        if not self.enabled:
+            return
+        self.marks[name] = time.perf_counter()
+        self.recorded = {m for m in self.recorded if m[0] != name}
+
+    def since(self, name, metric):
+        # Record the time from a mark without clearing it, only the first time for each mark
+        if not self.enabled:
+            return
+        begin = self.marks.get(name)
+        if begin is None or (name, metric) in self.recorded:
+            return
+        self.recorded.add((name, metric))
+        self.record(metric, (time.perf_counter() - begin) * 1000)
+
+    def stop(self, name, metric=None):
+        if not self.enabled:
+            return
+        begin = self.marks.pop(name, None)
+        if begin is None:
+            return
+        self.record(metric or name, (time.perf_counter() - begin) * 1000)
+
+    def record(self, metric, ms):
+        if metric not in self.samples:
+            self.samples[metric] = deque(maxlen=self.window)
+        self.samples[metric].append(ms)
+
+    @staticmethod
+    def percentile(ordered, p):
+        if not ordered:
+            return 0.0
+        index = (len(ordered) - 1) * p / 100
+        lower = int(index)
+        upper = min(lower + 1, len(ordered) - 1)
+        return ordered[lower] + (ordered[upper] - ordered[lower]) * (index - lower)
+
+    def percentiles(self, metric, points=(50, 95, 99)):
+        ordered = sorted(self.samples.get(metric, ()))
+        result = {f"p{p}" : self.percentile(ordered, p) for p in points}
+        result['count'] = len(ordered)
+        return result
+
+    def summary(self):
+        return {metric : self.percentiles(metric) for metric in self.samples}
+
+    def dump(self, path=None):
+        data = json.dumps(self.summary(), indent=4)
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(data)
+        return data
@@ -0,0 +1,265 @@
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from PySide2.QtCore import QObject, Signal
+
+from .MediaLibrary import MediaLibrary
+
+# Pool process side, every process keeps one libvlc instance for all of its probes
+_instance = None
+
+def _initWorker():
+    global _instance
+    try:
+        from .MediaContainer import instancePool
+        _instance = instancePool.acquire(["--no-audio", "--no-spu"])
+    except Exception as e:
+        print("Library probe unavailable:", e)
+        _instance = None
+
+def probeFile(path, timeout):
+    if _instance is None:
+        raise RuntimeError("libvlc is not available")
+    from .MediaContainer import MediaContainer, vlc
+    media = _instance.media_new_path(path)
+    parsed = threading.Event()
+    media.event_manager().event_attach(vlc.EventType.MediaParsedChanged, lambda event: parsed.set())
+    try:
+        media.parse_with_options(vlc.MediaParseFlag.local, timeout)
+        parsed.wait(timeout / 1000 + 0.5)
+        if media.get_parsed_status() != vlc.MediaParsedStatus.done:
+            return None
+        return MediaContainer.readMediaInfo(media)
+    finally:
+        media.release()
+
+class LibraryScanner(QObject):
+    # Walks the library roots on a background thread and keeps the MediaLibrary index in step: each folder's
+    # listing is compared with its rows by size and mtime, only new and changed files are written and probed.
+    # Probes run in a process pool so a slow or crashing demuxer never reaches the player
+    progress = Signal(dict)
+    # A root's files are all in the index, probing may still be going on
+    walked = Signal(str)
+    finished = Signal(dict)
+
+    def __init__(self, parent=None, libraryPath=None, workers=None, probe=True, timeout=5000, commitInterval=500):
+        super(LibraryScanner, self).__init__(parent)
+        self.libraryPath = libraryPath
+        self.workers = workers or max(1, min(4, (os.cpu_count() or 2) // 2))
+        self.probe = probe
+        self.timeout = timeout
+        self.commitInterval = commitInterval
+        self.thread = None
+        self.cancelled = threading.Event()
+        self.counters = {}
+
+    def scan(self, roots=None):
+        # Roots are added to the library, without roots every known root is rescanned
+        if self.isRunning():
+            return False
+        self.cancelled.clear()
+        roots = [os.path.normpath(os.path.abspath(root)) for root in roots] if roots else None
+        self.thread = threading.Thread(target=self.run, args=(roots,), daemon=True)
+        self.thread.start()
+        return True
+
+    def isRunning(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def wait(self, timeout=None):
+        if self.thread:
+            self.thread.join(timeout)
+
+    def stats(self):
+        counters = dict(self.counters)
+        walkTime = counters.get('walkTime', 0)
+        probeTime = counters.get('probeTime', 0)
+        counters['filesPerSecond'] = counters.get('files', 0) / walkTime if walkTime else 0.0
+        counters['probesPerSecond'] = counters.get('probed', 0) / probeTime if probeTime else 0.0
+        return counters
+
+    # Scan thread side
+    def run(self, roots):
+        self.counters = {'roots' : 0, 'folders' : 0, 'files' : 0, 'changed' : 0, 'removed' : 0, 'skipped' : 0,
+                         'errors' : 0, 'probed' : 0, 'failed' : 0, 'walkTime' : 0.0, 'probeTime' : 0.0,
+                         'cancelled' : False, 'unavailable' : False}
+        self._lastCommit = time.perf_counter()
+        library = MediaLibrary(self.libraryPath)
+        try:
+            if roots:
+                for root in roots:
+                    library.addRoot(root)
+            roots = roots or library.roots()
+            self.counters['roots'] = len(roots)
+
+            begin = time.perf_counter()
+            for root in roots:
+                self.walk(library, root)
+            self.counters['walkTime'] = time.perf_counter() - begin
+
+            if self.probe and not self.cancelled.is_set():
+                begin = time.perf_counter()
+                self.probeRoots(library, roots)
+                self.counters['probeTime'] = time.perf_counter() - begin
+        finally:
+            library.close()
+            self.counters['cancelled'] = self.cancelled.is_set()
+            self.finished.emit(self.stats())
+
+    def _checkpoint(self, library, force=False):
+        # Batches writes into transactions and reports progress at the same pace
+        now = time.perf_counter()
+        if not force and (now - self._lastCommit) * 1000 < self.commitInterval:
+            return
+        library.commit()
+        self._lastCommit = now
+        self.progress.emit(self.stats())
+
+    def walk(self, library, root):
+        visited = set()
+        folders = [root]
+        library.begin()
+        while folders and not self.cancelled.is_set():
+            folder = folders.pop()
+            visited.add(folder)
+            found = {}
+            try:
+                with os.scandir(folder) as entries:
+                    for entry in entries:
+                        if entry.name[0] == ".":
+                            continue
+                        # Links to folders are not followed, they could loop
+                        if entry.is_dir(follow_symlinks=False):
+                            folders.append(entry.path)
+                        elif library.supports(entry.name) and entry.is_file():
+                            if not self._encodable(entry.path):
+                                self.counters['skipped'] += 1
+                                continue
+                            stat = entry.stat()
+                            found[entry.path] = (stat.st_size, stat.st_mtime_ns)
+            except OSError:
+                # Unreadable or unmounted, its rows stay as they are
+                continue
+            if not self._encodable(folder):
+                # Its files were skipped above, the folder is only walked for its subfolders
+                self.counters['skipped'] += 1
+                continue
+            try:
+                known = library.folder(folder)
+                changed = [(path, folder, root, size, mtime) for path, (size, mtime) in found.items()
+                           if known.get(path) != (size, mtime)]
+                removed = known.keys() - found.keys()
+                if changed:
+                    library.upsert(changed)
+                if removed:
+                    library.remove(removed)
+            except (sqlite3.Error, ValueError) as e:
+                # One folder that can't be written doesn't end the scan
+                print("Library scan error in", folder, e)
+                self.counters['errors'] += 1
+                continue
+            self.counters['folders'] += 1
+            self.counters['files'] += len(found)
+            self.counters['changed'] += len(changed)
+            self.counters['removed'] += len(removed)
+            self._checkpoint(library)
+            if not library.db.in_transaction:
+                library.begin()
+        if not self.cancelled.is_set():
+            # Folders that disappeared since the last scan
+            gone = [folder for folder in library.folders(root) if folder not in visited]
+            library.removeFolders(gone)
+        self._checkpoint(library, force=True)
+        if not self.cancelled.is_set():
+            self.walked.emit(root)
+
+    @staticmethod
+    def _encodable(path):
+        # Names that aren't valid in the file system encoding come back with surrogate escapes,
+        # neither SQLite nor libvlc can take them
+        try:
+            path.encode("utf-8")
+        except UnicodeEncodeError:
+            return False
+        return True
+
+    def _probing(self):
+        return not self.cancelled.is_set() and not self.counters['unavailable']
+
+    def probeRoots(self, library, roots):
+        # Bounded in flight so memory doesn't grow with the number of new files
+        limit = self.workers * 4
+        pool = self._createPool()
+        pending = {}
+        results = []
+        try:
+            for root in roots:
+                after = ""
+                while self._probing():
+                    rows = library.unprobed(root, after)
+                    if not rows:
+                        break
+                    after = rows[-1][0]
+                    for row in rows:
+                        while len(pending) >= limit and self._probing():
+                            pool = self._collect(library, pool, pending, results)
+                        if not self._probing():
+                            break
+                        pending[pool.submit(probeFile, row[0], self.timeout)] = row
+            while pending and self._probing():
+                pool = self._collect(library, pool, pending, results)
+            self._writeResults(library, results)
+            self._checkpoint(library, force=True)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _createPool(self):
+        # Spawned, a forked copy of a process running Qt and libvlc threads isn't safe to use
+        return ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_initWorker)
+
+    def _collect(self, library, pool, pending, results):
+        done, _ = wait(list(pending), timeout=0.5, return_when=FIRST_COMPLETED)
+        broken = False
+        for future in done:
+            path, size, mtime = pending.pop(future)
+            try:
+                info = future.result()
+            except BrokenProcessPool:
+                # A probe took its process down, the files in flight are marked failed rather than retried
+                broken = True
+                info = None
+            except RuntimeError:
+                # No libvlc in the pool, the files stay unprobed for a later scan
+                self.counters['unavailable'] = True
+                continue
+            except Exception:
+                info = None
+            self.counters['probed' if info else 'failed'] += 1
+            results.append((path, size, mtime, info))
+        if broken:
+            for future, (path, size, mtime) in pending.items():
+                results.append((path, size, mtime, None))
+                self.counters['failed'] += 1
+            pending.clear()
+            pool.shutdown(wait=False, cancel_futures=True)
+            pool = self._createPool()
+        if results and (time.perf_counter() - self._lastCommit) * 1000 >= self.commitInterval:
+            self._writeResults(library, results)
+            self._checkpoint(library, force=True)
+        return pool
+
+    def _writeResults(self, library, results):
+        if not results:
+            return
+        library.begin()
+        library.setInfo(results)
+        library.commit()
+        results.clear()
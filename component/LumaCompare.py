@@ -0,0 +1,184 @@
+import math
+import threading
+from collections import deque
+from PySide2.QtCore import QPointF, QRectF, Qt, Signal
+from PySide2.QtGui import QColor, QImage, QPainter, QPen, QPolygonF
+from PySide2.QtWidgets import QWidget
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class LumaComparator(object):
+    # Vectorized per frame metrics between two luma planes, every buffer is preallocated for the frame size
+    def __init__(self, diffGain=4, histogramStep=2):
+        self.shape = None
+        self.diffGain = diffGain
+        self.histogramStep = histogramStep
+        self.levels = np.arange(256, dtype=np.float64) if np is not None else None
+        self.squares = self.levels ** 2 if np is not None else None
+
+    def allocate(self, shape):
+        self.shape = shape
+        self.high = np.empty(shape, dtype=np.uint8)
+        self.low = np.empty(shape, dtype=np.uint8)
+        # One on screen, one waiting for the GUI and one to write into
+        self.diffs = [np.empty(shape, dtype=np.uint8) for i in range(3)]
+
+    def compare(self, a, b, busy=()):
+        # busy are diff buffers still in use by the caller, they are not written
+        shape = (min(a.shape[0], b.shape[0]), min(a.shape[1], b.shape[1]))
+        a, b = a[:shape[0], :shape[1]], b[:shape[0], :shape[1]]
+        if shape != self.shape:
+            self.allocate(shape)
+
+        # |a - b| in uint8 without widening
+        np.maximum(a, b, out=self.high)
+        np.minimum(a, b, out=self.low)
+        np.subtract(self.high, self.low, out=self.high)
+
+        count = self.high.size
+        diffHist = np.bincount(self.high.ravel(), minlength=256)
+        mse = float(diffHist @ self.squares) / count
+        meanDiff = float(diffHist @ self.levels) / count
+
+        # The luma histograms are only compared by shape, a subsampled grid is enough and a quarter of the work
+        step = self.histogramStep
+        histA = np.bincount(a[::step, ::step].ravel(), minlength=256)
+        histB = np.bincount(b[::step, ::step].ravel(), minlength=256)
+        histA, histB = histA / histA.sum(), histB / histB.sum()
+        histDistance = math.sqrt(max(1.0 - float(np.sqrt(histA * histB).sum()), 0.0))
+
+        # Amplified diff image
+        diff = next(buffer for buffer in self.diffs if not any(buffer is b for b in busy))
+        np.minimum(self.high, 255 // self.diffGain, out=diff)
+        np.multiply(diff, self.diffGain, out=diff)
+
+        return {
+            'meanDiff' : meanDiff,
+            'mse' : mse,
+            'psnr' : 10 * math.log10(255 * 255 / mse) if mse else float("inf"),
+            'histDistance' : histDistance
+        }, diff
+
+class LumaCompare(QWidget):
+    metricsChanged = Signal(dict)
+    _compared = Signal()
+
+    def __init__(self, left, right, parent=None, history=300, graphHeight=80):
+        super(LumaCompare, self).__init__(parent)
+        self.setWindowTitle("Luminance Compare")
+        self.setStyleSheet("background-color : black;")
+        self.containers = (left, right)
+        self.taps = []
+        self.comparator = LumaComparator()
+        self.condition = threading.Condition()
+        self.thread = None
+        self.running = False
+        self.frames = 0
+
+        self.history = {'psnr' : deque(maxlen=history), 'meanDiff' : deque(maxlen=history)}
+        self.graphHeight = graphHeight
+        self.metrics = {}
+        self.image = None
+        # Diff waiting for the GUI with the metrics of every compare since the last one shown, and the diff
+        # the image wraps. Neither is written into
+        self.pending = None
+        self.pendingMetrics = deque(maxlen=history)
+        self.diff = None
+        self._scheduled = False
+        self._compared.connect(self.onCompared)
+
+    @staticmethod
+    def available():
+        return np is not None
+
+    def start(self):
+        if self.running or np is None:
+            return
+        # I420 is what most decoders output, the luma plane arrives without any conversion
+        self.taps = [container.enableFrameTap(chroma="I420", poolSize=3, condition=self.condition) for container in self.containers]
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if not self.running:
+            return
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        self.thread.join(1)
+        for container in self.containers:
+            container.disableFrameTap()
+        self.taps = []
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.running and not all(tap.hasNew() for tap in self.taps):
+                    self.condition.wait(0.5)
+                if not self.running:
+                    return
+                # Held until the next latest() call, the decoders never write into them meanwhile
+                frames = [tap.latest() for tap in self.taps]
+            with self.condition:
+                busy = (self.diff, self.pending)
+            metrics, diff = self.comparator.compare(*(frame.planes[0] for frame in frames), busy=busy)
+            self.frames += 1
+            # Coalesced like VideoOverlay, a GUI that falls behind shows only the newest diff but graphs every compare
+            with self.condition:
+                self.pending = diff
+                self.pendingMetrics.append(metrics)
+                if self._scheduled:
+                    continue
+                self._scheduled = True
+            self._compared.emit()
+
+    def onCompared(self):
+        with self.condition:
+            diff, self.pending = self.pending, None
+            metricsList = list(self.pendingMetrics)
+            self.pendingMetrics.clear()
+            self._scheduled = False
+            if diff is None:
+                return
+            # QImage wraps the diff buffer, the array is kept alongside so it outlives the image
+            self.diff = diff
+        self.image = QImage(diff.data, diff.shape[1], diff.shape[0], diff.strides[0], QImage.Format_Grayscale8)
+        for metrics in metricsList:
+            self.history['psnr'].append(min(metrics['psnr'], 60))
+            self.history['meanDiff'].append(metrics['meanDiff'])
+        self.metrics = metricsList[-1]
+        self.metricsChanged.emit(self.metrics)
+        self.update()
+
+    def paintEvent(self, event):
+        qp = QPainter(self)
+        area = QRectF(0, 0, self.width(), self.height() - self.graphHeight)
+        if self.image is not None:
+            size = self.image.size().scaled(area.size().toSize(), Qt.KeepAspectRatio)
+            target = QRectF(area.center().x() - size.width()/2, area.center().y() - size.height()/2, size.width(), size.height())
+            qp.drawImage(target, self.image)
+
+        graph = QRectF(0, area.bottom(), self.width(), self.graphHeight)
+        qp.fillRect(graph, QColor(20, 20, 20))
+        for key, color, scale in (('psnr', QColor(255, 0, 0), 60), ('meanDiff', QColor(255, 255, 255), 64)):
+            values = self.history[key]
+            if len(values) < 2:
+                continue
+            step = graph.width() / (values.maxlen - 1)
+            points = [QPointF(i * step, graph.bottom() - min(v / scale, 1) * graph.height()) for i, v in enumerate(values)]
+            qp.setPen(QPen(color, 1))
+            qp.drawPolyline(QPolygonF(points))
+
+        if self.metrics:
+            qp.setPen(Qt.white)
+            qp.drawText(graph.adjusted(5, 5, -5, -5), Qt.AlignLeft | Qt.AlignTop,
+                f"PSNR {self.metrics['psnr']:.2f} dB   Mean diff {self.metrics['meanDiff']:.2f}   Histogram {self.metrics['histDistance']:.4f}")
+        qp.end()
+
+    def closeEvent(self, event):
+        self.stop()
+        return super(LumaCompare, self).closeEvent(event)
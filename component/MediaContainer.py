@@ -1,9 +1,18 @@
+import math
 import sys
 import os
-from PySide2.QtCore import Qt, Signal
+import threading
+import time
+from collections import deque
+from PySide2.QtCore import Qt, QTimer, Signal
 from PySide2.QtWidgets import QLabel, QVBoxLayout, QWidget
 
 from .FrameWidget import FrameWidget
+from .EventBridge import EventBridge
+from .FrameIndex import FrameIndex
+from .LatencyMonitor import LatencyMonitor
+from .MetadataCache import MetadataCache
+from .PlaylistParser import PlaylistParser
 
 try:
     fileDir = os.path.dirname(__file__)
@@ -16,9 +25,10 @@ vlcdir = os.path.normpath(os.path.join(fileDir, "..", "vlc"))
 if not os.path.isdir(vlcdir):
     vlcdir = os.path.normpath(os.path.join(os.getcwd(), "vlc"))
 
-if pyVersion >= 3.8:
+# The bundled libvlc is for Windows, elsewhere the system libvlc is used
+if sys.platform == "win32" and pyVersion >= 3.8:
     os.add_dll_directory(vlcdir)
-else:
+elif sys.platform == "win32":
     if not vlcdir in sys.path:
         sys.path.append(vlcdir)
     os.environ['PYTHON_VLC_MODULE_PATH'] = vlcdir
@@ -27,40 +37,101 @@ else:
     
 import vlc
 
+from .InstancePool import InstancePool
+from .PlaybackClock import PlaybackClock
+
+instancePool = InstancePool(vlc.Instance)
+
 class MediaContainer(FrameWidget):
     stateChanged = Signal(str)
     lengthChanged = Signal(int)
     timeChanged = Signal(float)
     fpsChanged = Signal(float)
-
-    def __init__(self, parent=None, controller=None):
+    mediaParsed = Signal(dict)
+    frameIndexChanged = Signal(object, int)
+    frameStepped = Signal(int)
+    mediaChanged = Signal(str)
+    playlistOpened = Signal(str)
+
+    playerEvents = (
+        (vlc.EventType.MediaPlayerNothingSpecial, 'NothingSpecial'),
+        (vlc.EventType.MediaPlayerOpening, 'Opening'),
+        (vlc.EventType.MediaPlayerPlaying, 'Playing'),
+        (vlc.EventType.MediaPlayerPaused, 'Paused'),
+        (vlc.EventType.MediaPlayerStopped, 'Stopped'),
+        (vlc.EventType.MediaPlayerEndReached, 'Ended'),
+        (vlc.EventType.MediaPlayerEncounteredError, 'Error')
+    )
+
+    def __init__(self, parent=None, controller=None, metadataCache=None, vlcOptions=(), singleWindow=False):
         super(MediaContainer, self).__init__(parent)
 
-        self.mediaContainer = QLabel()
-        self.mediaContainer.setStyleSheet("background:black;")
-        self.mediaContainer.setAttribute(Qt.WA_TranslucentBackground, False)
-        self.mediaContainer.setObjectName("Video")
-        self.vlc = vlc.Instance()
+        # Single window mode paints the video with Qt so the Controller can be a child widget instead of a
+        # second translucent window, it needs NumPy for the frame tap
+        if singleWindow:
+            from .FrameTap import FrameTap
+            singleWindow = FrameTap.available()
+        self.singleWindow = singleWindow
+
+        self.mediaContainer = self._createSurface()
+        self.vlc = instancePool.acquire(vlcOptions)
         self.mediaPlayer = self.vlc.media_player_new()
-        self.mediaPlayer.set_hwnd(int(self.mediaContainer.winId()))
+        self.attachSurface(self.mediaPlayer, self.mediaContainer)
         self.eventManager = self.mediaPlayer.event_manager()
         self.media = None
+        self.mediaPath = None
+        self.mediaOptions = []
+        self.metadata = {}
+        self.frameIndex = None
+        self.fps = 0
+        self.parseTimeout = 5000
+        self._parseToken = 0
+        self._parseStart = 0
+        self.metadataCache = metadataCache or MetadataCache.shared()
+        # New entries are written out once parses stop coming in for a while, and on close
+        self.cacheSaveTimer = QTimer(self)
+        self.cacheSaveTimer.setSingleShot(True)
+        self.cacheSaveTimer.setInterval(5000)
+        self.cacheSaveTimer.timeout.connect(self.metadataCache.save)
+        self.latency = LatencyMonitor()
+        # Media time for the playhead and overlays, fed by libvlc reports and the commands sent to the player
+        self.clock = PlaybackClock()
         self.setFocusPolicy(Qt.NoFocus)
-        self.mediaContainer.setFocusPolicy(Qt.NoFocus)
 
-        self.eventManager.event_attach(vlc.EventType.MediaPlayerNothingSpecial, self._onStateChanged, 'NothingSpecial')
-        self.eventManager.event_attach(vlc.EventType.MediaPlayerOpening, self._onStateChanged, 'Opening')
-        self.eventManager.event_attach(vlc.EventType.MediaPlayerBuffering, self._onStateChanged, 'Buffering')
-        self.eventManager.event_attach(vlc.EventType.MediaPlayerPlaying, self._onStateChanged, 'Playing')
-        self.eventManager.event_attach(vlc.EventType.MediaPlayerPaused, self._onStateChanged, 'Paused')
-        self.eventManager.event_attach(vlc.EventType.MediaPlayerStopped, self._onStateChanged, 'Stopped')
-        self.eventManager.event_attach(vlc.EventType.MediaPlayerEndReached, self._onStateChanged, 'Ended')
-        self.eventManager.event_attach(vlc.EventType.MediaPlayerEncounteredError, self._onStateChanged, 'Error')
-
-        self.eventManager.event_attach(vlc.EventType.MediaPlayerBuffering, self._onBuffer)
-
-        self.eventManager.event_attach(vlc.EventType.MediaPlayerLengthChanged, self._onPlayerLengthChanged)
-        self.eventManager.event_attach(vlc.EventType.MediaPlayerPositionChanged, self._onTimeChanged)
+        # Gapless playback, the next item is pre-rolled paused on a standby player and hidden surface
+        self.standbyContainer = None
+        self.standbyPlayer = None
+        self.nextPath = None
+        self.nextMedia = None
+        self.prerollLead = 3000
+        self.gaps = deque(maxlen=100)
+        self._swapTime = None
+        self._resumeTime = None
+
+        # Output configuration applied to every new player, see resetPlayer
+        self._configurePlayer = None
+        self.frameTap = None
+
+        # Frame stepping, repeated requests accumulate into one target and seeks are coalesced
+        self.stepTarget = None
+        self.nextFrameLimit = 4
+        self.stepTimer = QTimer(self)
+        self.stepTimer.setSingleShot(True)
+        self.stepTimer.setInterval(15)
+        self.stepTimer.timeout.connect(self._onStepTimer)
+        self._stepPending = False
+
+        self.eventBridge = EventBridge(self)
+        self._attachEvents(self.eventManager)
+
+        self.eventBridge.stateChanged.connect(self._onStateChanged)
+        self.eventBridge.bufferChanged.connect(self._onBuffer)
+        self.eventBridge.lengthChanged.connect(self._onPlayerLengthChanged)
+        self.eventBridge.timeChanged.connect(self._onTimeChanged)
+        self.lengthChanged.connect(self.clock.setLength)
+
+        self.mediaParsed.connect(self._applyMetadata)
+        self.frameIndexChanged.connect(self._applyFrameIndex)
 
         hbox = QVBoxLayout(self)
         hbox.setContentsMargins(self.gripSize,self.gripSize,self.gripSize,self.gripSize)
@@ -73,9 +144,59 @@ class MediaContainer(FrameWidget):
         if controller:
             self.setController(controller)
 
+    def _createSurface(self):
+        if self.singleWindow:
+            from .FrameTap import FrameTap
+            from .VideoSurface import VideoSurface
+            surface = VideoSurface()
+            surface.setTap(FrameTap(chroma="RV32", poolSize=3))
+        else:
+            surface = QLabel()
+            surface.setStyleSheet("background:black;")
+            surface.setAttribute(Qt.WA_TranslucentBackground, False)
+        surface.setObjectName("Video")
+        surface.setFocusPolicy(Qt.NoFocus)
+        return surface
+
+    @staticmethod
+    def setSurface(player, surface):
+        # libvlc renders into a native window, the handle setter depends on the platform
+        handle = int(surface.winId())
+        if sys.platform == "win32":
+            player.set_hwnd(handle)
+        elif sys.platform == "darwin":
+            player.set_nsobject(handle)
+        else:
+            player.set_xwindow(handle)
+
+    def attachSurface(self, player, surface):
+        # Native window for libvlc in window mode, the surface's frame tap in single window mode
+        if self.singleWindow:
+            surface.tap.install(player)
+        else:
+            self.setSurface(player, surface)
+
+    def _attachEvents(self, eventManager):
+        for eventType, state in self.playerEvents:
+            eventManager.event_attach(eventType, self.eventBridge.onState, state)
+
+        eventManager.event_attach(vlc.EventType.MediaPlayerBuffering, self.eventBridge.onBuffer)
+
+        eventManager.event_attach(vlc.EventType.MediaPlayerLengthChanged, self.eventBridge.onLength)
+        eventManager.event_attach(vlc.EventType.MediaPlayerTimeChanged, self.eventBridge.onTime)
+
+    def _detachEvents(self, eventManager):
+        for eventType, _ in self.playerEvents:
+            eventManager.event_detach(eventType)
+        eventManager.event_detach(vlc.EventType.MediaPlayerBuffering)
+        eventManager.event_detach(vlc.EventType.MediaPlayerLengthChanged)
+        eventManager.event_detach(vlc.EventType.MediaPlayerTimeChanged)
+
     def setController(self, controller):
         self.controller = controller
         self.controller.setParent(self)
+        if self.singleWindow:
+            self.controller.raise_()
         # self.setFocusProxy(self.controller)
 
     def show(self):
@@ -86,8 +207,69 @@ class MediaContainer(FrameWidget):
     def close(self):
         if hasattr(self, "controller"):
             self.controller.close()
+        self.cacheSaveTimer.stop()
+        self.metadataCache.save()
+        if self.latency.enabled:
+            print("Latency", self.latency.dump())
+        self.releasePlayer()
         return super(MediaContainer, self).close()
 
+    def releasePlayer(self):
+        if self.vlc is None:
+            return
+        self._detachEvents(self.eventManager)
+        self.eventBridge.clear()
+        for player in (self.mediaPlayer, self.standbyPlayer):
+            if player:
+                player.stop()
+                player.release()
+        self.mediaPlayer = None
+        self.standbyPlayer = None
+        instancePool.release(self.vlc)
+        self.vlc = None
+
+    def resetPlayer(self, configure=None):
+        # libvlc has no way to remove video callbacks once set, so output changes go through a fresh player.
+        # configure(player) may install callbacks, otherwise the new player renders to the window again
+        playing = self.isPlaying()
+        self._resumeTime = max(self.mediaPlayer.get_time(), 0) if self.media else None
+        self._detachEvents(self.eventManager)
+        self.eventBridge.clear()
+        self.mediaPlayer.stop()
+        self.mediaPlayer.release()
+        # A pre-rolled item is opened again when its turn comes
+        self.nextMedia = None
+        if self.standbyPlayer:
+            self.standbyPlayer.stop()
+
+        self._configurePlayer = configure
+        self.mediaPlayer = self.vlc.media_player_new()
+        self.mediaPlayer.set_rate(self.clock.rate)
+        if configure:
+            configure(self.mediaPlayer)
+        else:
+            self.attachSurface(self.mediaPlayer, self.mediaContainer)
+        self.eventManager = self.mediaPlayer.event_manager()
+        self._attachEvents(self.eventManager)
+        if self.media:
+            self.mediaPlayer.set_media(self.media)
+            if playing:
+                self.mediaPlayer.play()
+        return self.mediaPlayer
+
+    def enableFrameTap(self, **options):
+        # Decoded pictures go to a FrameTap instead of the window, options are passed to FrameTap
+        from .FrameTap import FrameTap
+        self.frameTap = FrameTap(**options)
+        self.resetPlayer(self.frameTap.install)
+        return self.frameTap
+
+    def disableFrameTap(self):
+        if self.frameTap is None:
+            return
+        self.frameTap = None
+        self.resetPlayer()
+
     def resizeEvent(self, event):
         super(MediaContainer, self).resizeEvent(event)
         if hasattr(self, "controller"):
@@ -100,50 +282,283 @@ class MediaContainer(FrameWidget):
     def isOnTop(self):
         return self._isOnTop
 
-    def resizeController(self):
-        self.controller.move(self.pos().x()+(self.gripSize)+1, self.pos().y()+(self.gripSize)+1)
-        self.controller.resize(self.width()-(self.gripSize*2)-2, self.height()-(self.gripSize*2)-2)
-        self.controller.activateWindow()
+    def controllerGeometry(self):
+        # Screen coordinates for the Controller window, parent coordinates for the embedded one
+        grip = self.gripSize
+        rect = self.rect() if self.singleWindow else self.geometry()
+        return rect.adjusted(grip, grip, -grip, -grip)
 
-    def createMedia(self, mediaPath):
-        self.media = self.vlc.media_new(mediaPath)
-        self.media.parse()
+    def resizeController(self):
+        self.controller.setGeometry(self.controllerGeometry())
+        if not self.singleWindow:
+            self.controller.activateWindow()
+
+    def createMedia(self, mediaPath, *options):
+        # Returns whether media was opened, callers only start playback when it was
+        if PlaylistParser.supports(mediaPath):
+            # Playlists are expanded by whoever keeps the queue, the current item stays as it is until then
+            self.playlistOpened.emit(mediaPath)
+            return False
+        self.latency.start('open')
+        self._resumeTime = None
+        self.clock.reset()
+        self.cancelNext()
+        self.media = self.vlc.media_new(mediaPath, *self.mediaOptions, *options)
         self.mediaPlayer.set_media(self.media)
-
-        if self.mediaPlayer.video_get_height() > 0:
-            self.setRatio(self.mediaPlayer.video_get_width()/self.mediaPlayer.video_get_height())
-        self._onFPSChanged()
+        self._loadMetadata(mediaPath)
+        return True
+
+    def _loadMetadata(self, mediaPath):
+        # Parsing is requested asynchronously so the GUI thread never waits on disk or network,
+        # the media is handed to the player right away and can start as soon as the decoder is ready
+        self._parseToken += 1
+        self.metadata = {}
+        self.frameIndex = None
+        self.mediaPath = mediaPath
+        self.mediaChanged.emit(mediaPath)
+
+        localPath = MetadataCache.localPath(mediaPath)
+        if FrameIndex.supports(localPath):
+            threading.Thread(target=self._buildFrameIndex, args=(localPath, self._parseToken), daemon=True).start()
+
+        cached = self.metadataCache.get(mediaPath)
+        if cached:
+            cached['mrl'] = mediaPath
+            cached['token'] = self._parseToken
+            self._applyMetadata(cached)
+        else:
+            self._parseStart = time.perf_counter()
+            self._requestParse(self.media, self._parseToken)
+
+    def _requestParse(self, media, token):
+        events = media.event_manager()
+        events.event_attach(vlc.EventType.MediaParsedChanged, self._onMediaParsed, media, token)
+        flags = vlc.MediaParseFlag.local | vlc.MediaParseFlag.network
+        media.parse_with_options(flags, self.parseTimeout)
+
+    def _onMediaParsed(self, event, media, token):
+        # Called from a libvlc thread, only gather the values and let the GUI thread apply them
+        if token != self._parseToken:
+            return
+        info = self.readMediaInfo(media)
+        info['token'] = token
+        info['parseTime'] = (time.perf_counter() - self._parseStart) * 1000
+        self.mediaParsed.emit(info)
+
+    @staticmethod
+    def readMediaInfo(media):
+        info = {
+            'mrl' : media.get_mrl(),
+            'duration' : max(media.get_duration(), 0),
+            'fps' : 0,
+            'width' : 0,
+            'height' : 0,
+            'codec' : ""
+        }
+        for track in media.tracks_get() or []:
+            if track.type != vlc.TrackType.video:
+                continue
+            video = track.u.video.contents
+            info['width'] = video.width
+            info['height'] = video.height
+            # FourCC, e.g. h264
+            info['codec'] = track.codec.to_bytes(4, "little").decode("latin-1").strip()
+            if video.frame_rate_den:
+                info['fps'] = video.frame_rate_num/video.frame_rate_den
+            break
+        return info
+
+    def _onPlayerStarted(self):
+        # Streams that could not be parsed beforehand report their size once the decoder runs
+        width, height = self.mediaPlayer.video_get_size(0)
+        if not height:
+            return
+        self.mediaParsed.emit({
+            'mrl' : self.media.get_mrl() if self.media else "",
+            'duration' : max(self.mediaPlayer.get_length(), 0),
+            'fps' : self.mediaPlayer.get_fps(),
+            'width' : width,
+            'height' : height,
+            'token' : self._parseToken
+        })
+
+    def _buildFrameIndex(self, path, token):
+        self.frameIndexChanged.emit(FrameIndex.fromFile(path), token)
+
+    def _applyFrameIndex(self, frameIndex, token):
+        if token != self._parseToken or frameIndex is None or not frameIndex.frameCount:
+            return
+        self.frameIndex = frameIndex
+        if self.metadata:
+            self.metadata['frames'] = frameIndex.frameCount
+        self.lengthChanged.emit(self.metadata.get('duration') or int(frameIndex.duration))
+
+    def frameCount(self, length=None):
+        if self.frameIndex:
+            return self.frameIndex.frameCount
+        if length is None:
+            length = self.metadata.get('duration', 0)
+        return int(length/1000*self.fps)
+
+    def frameToTime(self, frame):
+        if self.frameIndex:
+            return self.frameIndex.timeOf(frame)
+        # fps is a float, times that are whole ms would otherwise come out a hair short and truncate to the ms before
+        return round(frame/self.fps*1000, 6) if self.fps else 0
+
+    def timeToFrame(self, ms):
+        if self.frameIndex:
+            return self.frameIndex.frameAt(ms)
+        # With the same 1 ms tolerance as FrameIndex.frameAt
+        return max(math.ceil((ms + 1)/1000*self.fps) - 1, 0) if self.fps else 0
+
+    def positionToFrame(self, pos):
+        duration = self.metadata.get('duration') or self.mediaPlayer.get_length()
+        if self.frameIndex and duration > 0:
+            return self.frameIndex.frameAt(pos*duration)
+        return int(pos*self.frameCount(duration))
+
+    def _applyMetadata(self, info):
+        if info.get('token', self._parseToken) != self._parseToken:
+            return
+        self.latency.since('open', 'parse')
+        if info['height'] > 0:
+            self.setRatio(info['width']/info['height'])
+        self._onFPSChanged(info['fps'])
 
         self.metadata = {
-            'duration' : self.media.get_duration(),
-            'frames' : int(self.media.get_duration()/1000*self.fps)
+            'duration' : info['duration'],
+            'frames' : self.frameCount(info['duration']),
+            'fps' : self.fps,
+            'width' : info['width'],
+            'height' : info['height']
         }
-
-    def _onFPSChanged(self):
-        self.fps = self.mediaPlayer.get_fps()
+        if info['duration']:
+            self.lengthChanged.emit(info['duration'])
+        if 'parseTime' in info and info['duration'] and info['height']:
+            self.metadataCache.put(self.mediaPath, info, info['parseTime'])
+            self.cacheSaveTimer.start()
+
+    def _onFPSChanged(self, fps=None):
+        self.fps = fps or self.mediaPlayer.get_fps()
         self.fpsChanged.emit(self.fps)
 
-    def _onStateChanged(self, event, state):
+    def queueNext(self, mediaPath):
+        self.cancelNext()
+        self.nextPath = mediaPath
+
+    def cancelNext(self):
+        self.nextPath = None
+        self.nextMedia = None
+        if self.standbyPlayer:
+            self.standbyPlayer.stop()
+
+    def setPrerollLead(self, ms):
+        self.prerollLead = ms
+
+    def _preroll(self):
+        if self.standbyPlayer is None:
+            self.standbyContainer = self._createSurface()
+            self.standbyContainer.hide()
+            self.layout().addWidget(self.standbyContainer)
+            # Below the embedded Controller once it is shown
+            self.standbyContainer.stackUnder(self.mediaContainer)
+            self.standbyPlayer = self.vlc.media_player_new()
+            self.attachSurface(self.standbyPlayer, self.standbyContainer)
+        # start-paused opens and buffers the item then holds it on its first frame
+        self.nextMedia = self.vlc.media_new(self.nextPath, *self.mediaOptions, "start-paused")
+        self.standbyPlayer.set_media(self.nextMedia)
+        self.standbyPlayer.audio_set_volume(self.mediaPlayer.audio_get_volume())
+        self.standbyPlayer.set_rate(self.clock.rate)
+        self.standbyPlayer.play()
+
+    def _swapPlayers(self):
+        self._swapTime = time.perf_counter()
+        self._detachEvents(self.eventManager)
+        self.eventBridge.clear()
+        previous = self.mediaPlayer
+
+        # The pre-rolled player's events are attached before it's unpaused, its Playing and first TimeChanged
+        # reach the bridge like any other player's
+        self.mediaPlayer, self.standbyPlayer = self.standbyPlayer, self.mediaPlayer
+        self.mediaContainer, self.standbyContainer = self.standbyContainer, self.mediaContainer
+        self.eventManager = self.mediaPlayer.event_manager()
+        self._attachEvents(self.eventManager)
+        self.clock.reset()
+        self.clock.setPlaying(True)
+
+        self.mediaPlayer.set_pause(0)
+        self.mediaContainer.show()
+        self.standbyContainer.hide()
+        previous.stop()
+        self.media = self.nextMedia
+        mediaPath = self.nextPath
+        self.nextPath = None
+        self.nextMedia = None
+        self._loadMetadata(mediaPath)
+
+    def gapStats(self):
+        if not self.gaps:
+            return {'count' : 0, 'last' : 0.0, 'mean' : 0.0, 'max' : 0.0}
+        return {
+            'count' : len(self.gaps),
+            'last' : self.gaps[-1],
+            'mean' : sum(self.gaps) / len(self.gaps),
+            'max' : max(self.gaps)
+        }
+
+    def _onStateChanged(self, state):
+        if state == "Ended" and self.nextMedia is not None:
+            self._swapPlayers()
+            return
+        if state == "Ended" and self.nextPath and self._configurePlayer:
+            if self.createMedia(self.nextPath):
+                self.play()
+            return
         self.state = state
-        if self.state == "Playing":
-            self.media.parse()
-            self._onPlayerLengthChanged(None)
+        if state != "Buffering":
+            self.clock.setPlaying(state == "Playing")
+        if self.state in ("Opening", "Buffering"):
+            self.latency.since('open', state.lower())
+        elif self.state == "Ended":
+            self.clock.seek(self.clock.length)
+        elif self.state == "Playing":
+            self.stepTarget = None
+            if self._resumeTime:
+                self.setTime(self._resumeTime)
+                self._resumeTime = None
+            self.latency.stop('open', 'playing')
+            self._onPlayerLengthChanged()
+            if not self.metadata.get('height'):
+                self._onPlayerStarted()
         self.stateChanged.emit(state)
 
-    def _onBuffer(self, event):
+    def _onBuffer(self, cache):
         ...
-        # print(dir(event))
-        # print(vars(event))
-        # print(event.getBuffering())
-
-    def _onPlayerLengthChanged(self, event):
-        self.media = self.mediaPlayer.get_media()
-        if self.media:
-            self.lengthChanged.emit(self.media.get_duration())
 
-    def _onTimeChanged(self, event):
-        self.time = self.getPosition()
-        self.timeChanged.emit(min(self.time+(0.03*self.time), 1))
+    def _onPlayerLengthChanged(self, length=None):
+        if not self.media:
+            return
+        if length is None:
+            length = self.media.get_duration()
+        self.lengthChanged.emit(length)
+
+    def _onTimeChanged(self, ms):
+        self.latency.stop('seek')
+        self.latency.stop('step')
+        if self._swapTime is not None:
+            self.gaps.append((time.perf_counter() - self._swapTime) * 1000)
+            self._swapTime = None
+        # Players with a custom output open the next item on end instead, a standby player would share that output
+        if self.nextPath and self.nextMedia is None and not self._configurePlayer:
+            length = self.clock.length
+            if length > 0 and length - ms <= self.prerollLead:
+                self._preroll()
+        if self.stepTarget is not None:
+            # The slider already shows the stepped frame
+            return
+        self.clock.report(ms)
+        self.timeChanged.emit(self.clock.now())
     
     def isPlaying(self):
         return self.mediaPlayer.is_playing()
@@ -160,13 +575,99 @@ class MediaContainer(FrameWidget):
     def setPosition(self, pos):
         if self.mediaPlayer.is_seekable():
             pos = max(min(pos, 1), 0)
+            self.stepTarget = None
+            self.latency.start('seek')
             self.mediaPlayer.set_position(pos)
+            self.clock.seek(pos * self.clock.length)
+
+    def stepForward(self, n=1):
+        origin = self._stepOrigin()
+        frame = origin + n
+        frames = self.frameCount()
+        if frames:
+            frame = min(frame, frames - 1)
+        n = frame - origin
+        if n <= 0:
+            return
+        self.pause()
+        self.latency.start('step')
+        self.stepTarget = frame
+        self.clock.seek(self.frameToTime(frame))
+        if n <= self.nextFrameLimit and not self.stepTimer.isActive():
+            # Decoding the next frames is cheaper than a seek and never lands on the same frame
+            for _ in range(n):
+                self.mediaPlayer.next_frame()
+        else:
+            self._requestStepSeek()
+        self.frameStepped.emit(frame)
+
+    def stepBackward(self, n=1):
+        frame = max(self._stepOrigin() - n, 0)
+        self.pause()
+        self.latency.start('step')
+        self.stepTarget = frame
+        self.clock.seek(self.frameToTime(frame))
+        self._requestStepSeek()
+        self.frameStepped.emit(frame)
+
+    def _stepOrigin(self):
+        if self.stepTarget is not None:
+            return self.stepTarget
+        return self.timeToFrame(self.clock.now())
+
+    def _requestStepSeek(self):
+        # Seek right away, then at most once per timer interval while a key is held
+        if self.stepTimer.isActive():
+            self._stepPending = True
+            return
+        self._seekStepTarget()
+        self.stepTimer.start()
+
+    def _onStepTimer(self):
+        if self._stepPending:
+            self._stepPending = False
+            self._seekStepTarget()
+            self.stepTimer.start()
+
+    def _seekStepTarget(self):
+        if self.stepTarget is None or not self.mediaPlayer.is_seekable():
+            return
+        # Truncated, libvlc's precise seek drops every frame before the requested time and rounding up skips one
+        self.mediaPlayer.set_time(int(self.frameToTime(self.stepTarget)))
+
+    def setFrame(self, frame):
+        # Exact millisecond seek when the frame table is known, position fraction otherwise
+        self.stepTarget = None
+        if not self.frameIndex:
+            frames = self.frameCount()
+            if frames:
+                self.setPosition(frame/frames)
+            return
+        if self.mediaPlayer.is_seekable():
+            self.latency.start('seek')
+            self.setTime(self.frameIndex.timeOf(frame))
+
+    def setTime(self, ms):
+        if self.mediaPlayer.is_seekable():
+            # Truncated like the step seeks, a time rounded up lands on the next frame
+            self.mediaPlayer.set_time(int(ms))
+            self.clock.seek(ms)
+
+    def setRate(self, rate):
+        if self.mediaPlayer.set_rate(rate) == 0:
+            self.clock.setRate(rate)
 
     def getPosition(self):
-        return self.mediaPlayer.get_position()
+        return self.clock.position()
 
     def setVolume(self, volume):
         self.mediaPlayer.audio_set_volume(volume)
 
+    def setMute(self, state):
+        self.mediaPlayer.audio_set_mute(state)
+
+    def isMuted(self):
+        return bool(self.mediaPlayer.audio_get_mute())
+
     def stop(self):
         self.mediaPlayer.stop()
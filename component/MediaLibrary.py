@@ -0,0 +1,141 @@
+import os
+import sqlite3
+
+from .MetadataCache import defaultCachePath
+
+def defaultLibraryPath():
+    return os.path.join(os.path.dirname(defaultCachePath()), "library.sqlite3")
+
+class MediaLibrary(object):
+    # SQLite index of the media found under the library roots. WAL lets the GUI read while a scan writes,
+    # every thread opens its own MediaLibrary on the same file since connections can't be shared.
+    # Rows are looked up by folder so a rescan only ever holds one folder's entries in memory
+    version = 1
+    extensions = ('.mp4', '.m4v', '.mov', '.mkv', '.webm', '.avi', '.wmv', '.flv', '.ts', '.mts', '.m2ts',
+                  '.mpg', '.mpeg', '.mxf', '.mp3', '.m4a', '.flac', '.wav', '.ogg', '.opus')
+    # probed: 0 waiting for a probe, 1 done, -1 libvlc couldn't parse it (retried once the file changes)
+    schema = """
+        CREATE TABLE IF NOT EXISTS media (
+            path TEXT PRIMARY KEY,
+            folder TEXT NOT NULL,
+            root TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            mtime INTEGER NOT NULL,
+            probed INTEGER NOT NULL DEFAULT 0,
+            duration INTEGER NOT NULL DEFAULT 0,
+            fps REAL NOT NULL DEFAULT 0,
+            width INTEGER NOT NULL DEFAULT 0,
+            height INTEGER NOT NULL DEFAULT 0,
+            codec TEXT NOT NULL DEFAULT ''
+        );
+        CREATE INDEX IF NOT EXISTS mediaFolder ON media (folder);
+        CREATE INDEX IF NOT EXISTS mediaRoot ON media (root, path);
+        CREATE TABLE IF NOT EXISTS roots (path TEXT PRIMARY KEY);
+    """
+
+    def __init__(self, path=None):
+        self.path = path or defaultLibraryPath()
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        # Commits are explicit, a scan writes in batches
+        self.db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        if self.db.execute("PRAGMA user_version").fetchone()[0] != self.version:
+            self.db.executescript("DROP TABLE IF EXISTS media; DROP TABLE IF EXISTS roots;")
+            self.db.execute(f"PRAGMA user_version={self.version}")
+        self.db.executescript(self.schema)
+
+    @classmethod
+    def supports(cls, name):
+        return os.path.splitext(name)[1].lower() in cls.extensions
+
+    # Roots
+    def roots(self):
+        return [row[0] for row in self.db.execute("SELECT path FROM roots ORDER BY path")]
+
+    def addRoot(self, root):
+        self.db.execute("INSERT OR IGNORE INTO roots VALUES (?)", (os.path.normpath(root),))
+
+    def removeRoot(self, root):
+        root = os.path.normpath(root)
+        self.begin()
+        self.db.execute("DELETE FROM roots WHERE path = ?", (root,))
+        self.db.execute("DELETE FROM media WHERE root = ?", (root,))
+        self.commit()
+
+    # Scanner side
+    def folder(self, folder):
+        # Signatures of the files indexed in one folder
+        return {path: (size, mtime) for path, size, mtime in
+                self.db.execute("SELECT path, size, mtime FROM media WHERE folder = ?", (folder,))}
+
+    def folders(self, root):
+        return [row[0] for row in self.db.execute("SELECT DISTINCT folder FROM media WHERE root = ?", (root,))]
+
+    def begin(self):
+        self.db.execute("BEGIN")
+
+    def commit(self):
+        if self.db.in_transaction:
+            self.db.execute("COMMIT")
+
+    def upsert(self, rows):
+        # rows of (path, folder, root, size, mtime), a changed file loses its probe results
+        self.db.executemany("""
+            INSERT INTO media (path, folder, root, size, mtime) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (path) DO UPDATE SET folder = excluded.folder, root = excluded.root, size = excluded.size,
+                mtime = excluded.mtime, probed = 0, duration = 0, fps = 0, width = 0, height = 0, codec = ''
+        """, rows)
+
+    def remove(self, paths):
+        self.db.executemany("DELETE FROM media WHERE path = ?", ((path,) for path in paths))
+
+    def removeFolders(self, folders):
+        self.db.executemany("DELETE FROM media WHERE folder = ?", ((folder,) for folder in folders))
+
+    def unprobed(self, root, after="", limit=1000):
+        # Paged by path, the results are written back while the next page is read
+        return self.db.execute("""SELECT path, size, mtime FROM media WHERE root = ? AND probed = 0 AND path > ?
+            ORDER BY path LIMIT ?""", (root, after, limit)).fetchall()
+
+    def setInfo(self, rows):
+        # rows of (path, size, mtime, info), info is None when the probe failed. The signature has to match,
+        # a file that changed while it was probed waits for the next probe
+        self.db.executemany("""
+            UPDATE media SET probed = ?, duration = ?, fps = ?, width = ?, height = ?, codec = ?
+            WHERE path = ? AND size = ? AND mtime = ?
+        """, ((1 if info else -1, info['duration'] if info else 0, info['fps'] if info else 0,
+               info['width'] if info else 0, info['height'] if info else 0, info['codec'] if info else "",
+               path, size, mtime) for path, size, mtime, info in rows))
+
+    # Reader side
+    def paths(self, folder=None):
+        # Generator in path order, suited to PlaylistModel.extend. Selected by folder rather than by root,
+        # a folder added inside an existing root keeps the rows of that root
+        if folder is None:
+            cursor = self.db.execute("SELECT path FROM media ORDER BY path")
+        else:
+            folder = os.path.normpath(folder)
+            # Everything below folder sorts between folder + sep and the character after sep
+            cursor = self.db.execute("SELECT path FROM media WHERE folder = ? OR (folder > ? AND folder < ?) ORDER BY path",
+                                     (folder, folder + os.sep, folder + chr(ord(os.sep) + 1)))
+        for row in cursor:
+            yield row[0]
+
+    def get(self, path):
+        row = self.db.execute("""SELECT path, size, mtime, probed, duration, fps, width, height, codec
+            FROM media WHERE path = ?""", (path,)).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('path', 'size', 'mtime', 'probed', 'duration', 'fps', 'width', 'height', 'codec'), row))
+
+    def stats(self):
+        count, probed, failed, size, duration = self.db.execute("""
+            SELECT COUNT(*), COALESCE(SUM(probed = 1), 0), COALESCE(SUM(probed = -1), 0),
+                COALESCE(SUM(size), 0), COALESCE(SUM(duration), 0) FROM media""").fetchone()
+        return {'files' : count, 'probed' : probed, 'failed' : failed, 'bytes' : size, 'duration' : duration}
+
+    def close(self):
+        self.commit()
+        self.db.close()
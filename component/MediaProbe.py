@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import deque
+from PySide2.QtCore import QObject, Signal
+
+from .MediaContainer import MediaContainer, instancePool, vlc
+from .MetadataCache import MetadataCache
+
+class MediaProbe(QObject):
+    # Background duration and title lookups for playlist rows. Requests are served newest first and only the
+    # latest maxPending are kept, rows that scrolled out of view long ago are simply forgotten
+    probed = Signal(object, str, int, str)
+
+    def __init__(self, parent=None, workers=2, maxPending=64, timeout=2000, metadataCache=None):
+        super(MediaProbe, self).__init__(parent)
+        self.workerCount = workers
+        self.timeout = timeout
+        self.metadataCache = metadataCache or MetadataCache.shared()
+
+        self.vlc = None
+        self.threads = []
+        self.condition = threading.Condition()
+        self.pending = deque(maxlen=maxPending)
+        self.queued = set()
+        self.closed = False
+
+        self.probes = 0
+        self.cacheHits = 0
+        self.failures = 0
+
+    def request(self, key, path):
+        with self.condition:
+            if key in self.queued or self.closed:
+                return
+            if len(self.pending) == self.pending.maxlen:
+                self.queued.discard(self.pending[-1][0])
+            self.queued.add(key)
+            self.pending.appendleft((key, path))
+            self.condition.notify()
+        self.startWorkers()
+
+    def cancel(self):
+        with self.condition:
+            self.pending.clear()
+            self.queued.clear()
+
+    def startWorkers(self):
+        if self.threads:
+            return
+        self.vlc = instancePool.acquire(["--no-audio", "--no-spu"])
+        for i in range(self.workerCount):
+            thread = threading.Thread(target=self.run, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    # Worker thread side
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.pending and not self.closed:
+                    self.condition.wait()
+                if self.closed:
+                    return
+                key, path = self.pending.popleft()
+                self.queued.discard(key)
+            try:
+                duration, title = self.probe(path)
+            except Exception as e:
+                # A bad entry costs its row, not the worker
+                print("Probe failed for", path, e)
+                duration, title = None, ""
+            if duration is None:
+                self.failures += 1
+                duration = 0
+            self.probed.emit(key, path, duration, title)
+
+    def probe(self, path):
+        cached = self.metadataCache.get(path, count=False)
+        if cached:
+            self.cacheHits += 1
+            return cached['duration'], ""
+        self.probes += 1
+        media = self.vlc.media_new(path)
+        parsed = threading.Event()
+        media.event_manager().event_attach(vlc.EventType.MediaParsedChanged, lambda event: parsed.set())
+        start = time.perf_counter()
+        media.parse_with_options(vlc.MediaParseFlag.local, self.timeout)
+        parsed.wait(self.timeout / 1000 + 0.5)
+        try:
+            if media.get_parsed_status() != vlc.MediaParsedStatus.done:
+                return None, ""
+            info = MediaContainer.readMediaInfo(media)
+            self.metadataCache.put(path, info, (time.perf_counter() - start) * 1000)
+            return info['duration'], media.get_meta(vlc.Meta.Title) or ""
+        finally:
+            media.release()
+
+    def stats(self):
+        return {'probes' : self.probes, 'cacheHits' : self.cacheHits, 'failures' : self.failures, 'pending' : len(self.pending)}
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.pending.clear()
+            self.condition.notify_all()
+        for thread in self.threads:
+            thread.join(self.timeout / 1000)
+        self.threads = []
+        if self.vlc:
+            instancePool.release(self.vlc)
+            self.vlc = None
@@ -0,0 +1,140 @@
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from urllib.parse import unquote, urlparse
+
+def defaultCachePath():
+    if sys.platform == "win32":
+        root = os.environ.get("LOCALAPPDATA", os.path.expanduser("~"))
+    else:
+        root = os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache"))
+    return os.path.join(root, "vlcplayer", "metadata.json")
+
+class MetadataCache(object):
+    version = 1
+    fields = ('duration', 'fps', 'width', 'height')
+    _shared = None
+
+    @classmethod
+    def shared(cls):
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def __init__(self, path=None, maxEntries=2000):
+        self.path = path or defaultCachePath()
+        self.maxEntries = maxEntries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.parseTimeSaved = 0.0
+        self._dirty = False
+        self.load()
+
+    @staticmethod
+    def localPath(mediaPath):
+        if mediaPath.startswith("file://"):
+            parsed = urlparse(mediaPath)
+            path = unquote(parsed.path)
+            if sys.platform == "win32" and path[:1] == "/" and path[2:3] == ":":
+                path = path[1:]
+            return os.path.normpath(path)
+        if "://" not in mediaPath:
+            return os.path.normpath(os.path.abspath(mediaPath))
+        return None
+
+    def key(self, mediaPath):
+        path = self.localPath(mediaPath)
+        if path is None:
+            return mediaPath, None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None, None
+        return os.path.normcase(path), [stat.st_size, int(stat.st_mtime)]
+
+    def get(self, mediaPath, count=True):
+        # Only lookups made in place of a parse count towards the hit rate, the playlist probe and the
+        # waveform pass count=False and keep their own numbers
+        key, signature = self.key(mediaPath)
+        with self.lock:
+            entry = self.entries.get(key) if key else None
+            if entry is None or entry.get('signature') != signature:
+                if entry is not None:
+                    del self.entries[key]
+                    self._dirty = True
+                if count:
+                    self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            if count:
+                self.hits += 1
+                self.parseTimeSaved += entry.get('parseTime', 0)
+            return {f: entry[f] for f in self.fields}
+
+    def put(self, mediaPath, info, parseTime=0):
+        key, signature = self.key(mediaPath)
+        if key is None:
+            return
+        entry = {f: info[f] for f in self.fields}
+        entry['signature'] = signature
+        entry['parseTime'] = parseTime
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxEntries:
+                self.entries.popitem(last=False)
+            self._dirty = True
+
+    def _validEntry(self, entry):
+        if not isinstance(entry, dict):
+            return False
+        if not all(isinstance(entry.get(f), (int, float)) for f in self.fields):
+            return False
+        return entry.get('signature') is None or isinstance(entry.get('signature'), list)
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get('version') != self.version:
+            return
+        with self.lock:
+            for key, entry in data.get('entries', []):
+                if self._validEntry(entry):
+                    self.entries[key] = entry
+            while len(self.entries) > self.maxEntries:
+                self.entries.popitem(last=False)
+
+    def save(self):
+        with self.lock:
+            if not self._dirty:
+                return
+            data = {'version' : self.version, 'entries' : list(self.entries.items())}
+            self._dirty = False
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmpPath = self.path + ".tmp"
+            with open(tmpPath, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.replace(tmpPath, self.path)
+        except OSError as e:
+            print("Unable to save metadata cache", e)
+
+    def hitRate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {
+            'entries' : len(self.entries),
+            'hits' : self.hits,
+            'misses' : self.misses,
+            'hitRate' : self.hitRate(),
+            'parseTimeSaved' : self.parseTimeSaved
+        }
@@ -0,0 +1,79 @@
+import time
+
+class PlaybackClock(object):
+    # Media time between libvlc reports. Every report, seek, pause or rate change anchors (media ms, monotonic s)
+    # and now() extrapolates from the anchor with the rate, so readers at display rate never call into libvlc
+    def __init__(self, resyncThreshold=250):
+        self.length = 0
+        self.rate = 1.0
+        self.playing = False
+        self.anchorTime = 0.0
+        self.anchorClock = time.monotonic()
+        # Reports closer than this to the extrapolation are blended in, further ones snap the clock
+        self.resyncThreshold = resyncThreshold
+        self.lastNow = 0.0
+        self.reports = 0
+        self.resyncs = 0
+        self.error = 0.0
+
+    def _estimate(self, clock):
+        if not self.playing:
+            return self.anchorTime
+        return self.anchorTime + (clock - self.anchorClock) * 1000 * self.rate
+
+    def _anchor(self, ms):
+        self.anchorTime = float(ms)
+        self.anchorClock = time.monotonic()
+        self.lastNow = self.anchorTime
+
+    def now(self):
+        # Media time in ms, never moves backwards between two anchors while playing
+        ms = self._estimate(time.monotonic())
+        if self.length > 0:
+            ms = min(ms, self.length)
+        ms = max(ms, self.lastNow if self.playing else 0.0)
+        self.lastNow = ms
+        return ms
+
+    def position(self):
+        return self.now() / self.length if self.length > 0 else 0.0
+
+    def report(self, ms):
+        # libvlc time reports are coarse and late by a variable amount, small errors are halved per report
+        # so the playhead converges without stepping back and forth
+        self.reports += 1
+        clock = time.monotonic()
+        self.error = ms - self._estimate(clock)
+        if not self.playing or abs(self.error) > self.resyncThreshold:
+            self.resyncs += 1
+            self._anchor(ms)
+            return
+        self.anchorTime = self._estimate(clock) + self.error / 2
+        self.anchorClock = clock
+
+    def seek(self, ms):
+        self.resyncs += 1
+        self._anchor(max(ms, 0))
+
+    def setPlaying(self, playing):
+        if playing == self.playing:
+            return
+        ms = self.now()
+        self.playing = playing
+        self._anchor(ms)
+
+    def setRate(self, rate):
+        ms = self.now()
+        self.rate = rate
+        self._anchor(ms)
+
+    def setLength(self, length):
+        self.length = max(length, 0)
+
+    def reset(self):
+        self.playing = False
+        self.length = 0
+        self._anchor(0)
+
+    def stats(self):
+        return {'reports' : self.reports, 'resyncs' : self.resyncs, 'error' : self.error}
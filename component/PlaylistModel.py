@@ -0,0 +1,194 @@
+import time
+from itertools import islice
+from PySide2.QtCore import QAbstractListModel, QModelIndex, QTimer, Qt, Signal
+from PySide2.QtGui import QFont
+
+from .PlaylistStore import PlaylistStore
+
+class PlaylistModel(QAbstractListModel):
+    # Lazy list model over a PlaylistStore. Appends of any size are consumed from an iterator in slices of at
+    # most sliceBudget ms per event loop turn, durations and titles are probed only for rows a view asks for.
+    # Views lay out every row again on each insert, so loaded rows are announced in steps that at least double
+    # the row count, or every announceInterval ms, which keeps the total layout work linear
+    loading = Signal(bool)
+    currentChanged = Signal(int)
+    PathRole = Qt.UserRole
+    DurationRole = Qt.UserRole + 1
+
+    def __init__(self, parent=None, probe=None, sliceBudget=8, batch=2000, announceInterval=500):
+        super(PlaylistModel, self).__init__(parent)
+        self.store = PlaylistStore()
+        self.probe = probe
+        if probe is not None:
+            probe.probed.connect(self.onProbed)
+        self.generation = 0
+        self.sliceBudget = sliceBudget
+        self.batch = batch
+        self.sources = []
+        self.count = 0
+        self.announceInterval = announceInterval
+        self._lastAnnounce = 0.0
+        self.boldFont = QFont()
+        self.boldFont.setBold(True)
+
+        self.loadTimer = QTimer(self)
+        self.loadTimer.setInterval(0)
+        self.loadTimer.timeout.connect(self._loadSlice)
+
+        # Probe results arrive one by one, the rows they touched are announced together
+        self.changedRows = None
+        self.changeTimer = QTimer(self)
+        self.changeTimer.setSingleShot(True)
+        self.changeTimer.setInterval(50)
+        self.changeTimer.timeout.connect(self._flushChanges)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.count
+
+    def data(self, index, role=Qt.DisplayRole):
+        row = index.row()
+        if not index.isValid() or row >= self.count:
+            return None
+        if role == Qt.DisplayRole:
+            duration = self.store.duration(row)
+            if duration < 0:
+                self.requestProbe(row)
+                return self.store.title(row)
+            seconds = duration // 1000
+            return f"{self.store.title(row)}  {seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}" if seconds >= 3600 \
+                else f"{self.store.title(row)}  {seconds // 60:02d}:{seconds % 60:02d}"
+        if role == Qt.ToolTipRole or role == self.PathRole:
+            return self.store.path(row)
+        if role == self.DurationRole:
+            return self.store.duration(row)
+        if role == Qt.FontRole and row == self.store.current():
+            return self.boldFont
+        return None
+
+    def requestProbe(self, row):
+        if self.probe is not None:
+            self.probe.request((self.generation, row), self.store.path(row))
+
+    def onProbed(self, key, path, duration, title):
+        generation, row = key
+        if generation != self.generation or row >= self.count:
+            return
+        self.store.setInfo(row, duration, title)
+        self._rowChanged(row)
+
+    def _rowChanged(self, row):
+        if self.changedRows is None:
+            self.changedRows = [row, row]
+        else:
+            self.changedRows[0] = min(self.changedRows[0], row)
+            self.changedRows[1] = max(self.changedRows[1], row)
+        if not self.changeTimer.isActive():
+            self.changeTimer.start()
+
+    def _flushChanges(self):
+        if self.changedRows is None:
+            return
+        first, last = self.changedRows
+        self.changedRows = None
+        self.dataChanged.emit(self.index(first), self.index(last))
+
+    # Loading
+    def append(self, path):
+        self.extend((path,))
+
+    def extend(self, paths):
+        # Takes lists and generators alike, nothing is read until the event loop runs
+        self.sources.append(iter(paths))
+        if not self.loadTimer.isActive():
+            self.loadTimer.start()
+            self.loading.emit(True)
+
+    def isLoading(self):
+        return self.loadTimer.isActive()
+
+    def cancelLoad(self):
+        # Generators are closed right away so playlist parsers release their files
+        for source in self.sources:
+            close = getattr(source, "close", None)
+            if close:
+                close()
+        self.sources = []
+        if self.loadTimer.isActive():
+            self.loadTimer.stop()
+            # Rows read so far are kept
+            self._announce()
+            self.loading.emit(False)
+
+    def _loadSlice(self):
+        now = time.perf_counter()
+        deadline = now + self.sliceBudget / 1000
+        if not self.count:
+            self._lastAnnounce = now
+        while self.sources and time.perf_counter() < deadline:
+            paths = list(islice(self.sources[0], self.batch))
+            if len(paths) < self.batch:
+                self.sources.pop(0)
+            self.store.extend(paths)
+        staged = len(self.store) - self.count
+        if not self.sources or staged >= max(self.batch, self.count) or \
+                (time.perf_counter() - self._lastAnnounce) * 1000 >= self.announceInterval:
+            self._announce()
+        if not self.sources:
+            self.loadTimer.stop()
+            self.loading.emit(False)
+
+    def _announce(self):
+        self._lastAnnounce = time.perf_counter()
+        total = len(self.store)
+        if total <= self.count:
+            return
+        self.beginInsertRows(QModelIndex(), self.count, total - 1)
+        self.count = total
+        self.endInsertRows()
+
+    def clear(self):
+        self.cancelLoad()
+        self.beginResetModel()
+        self.generation += 1
+        self.store.clear()
+        self.count = 0
+        self.endResetModel()
+        if self.probe is not None:
+            self.probe.cancel()
+
+    # Play order
+    def path(self, row):
+        return self.store.path(row) if 0 <= row < len(self.store) else None
+
+    def current(self):
+        return self.store.current()
+
+    def _moved(self, previous, row):
+        for r in (previous, row):
+            if 0 <= r < self.count:
+                index = self.index(r)
+                self.dataChanged.emit(index, index, [Qt.FontRole])
+        if row >= 0:
+            self.currentChanged.emit(row)
+        return row
+
+    def setCurrent(self, row):
+        previous = self.store.current()
+        return self._moved(previous, self.store.setCurrent(row))
+
+    def next(self):
+        previous = self.store.current()
+        return self._moved(previous, self.store.next())
+
+    def previous(self):
+        previous = self.store.current()
+        return self._moved(previous, self.store.previous())
+
+    def peekNext(self):
+        return self.store.peekNext()
+
+    def setShuffle(self, shuffle):
+        self.store.setShuffle(shuffle)
+
+    def setRepeat(self, mode):
+        self.store.setRepeat(mode)
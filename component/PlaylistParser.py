@@ -0,0 +1,155 @@
+import os
+import sys
+from urllib.parse import quote, unquote
+from xml.parsers.expat import ParserCreate
+
+from .MetadataCache import MetadataCache
+
+class PlaylistParser(object):
+    # Generator parsers for M3U/extended M3U, PLS and XSPF. Files are read line by line (XSPF in chunks)
+    # and entries are yielded as they are found, so memory stays constant whatever the playlist size.
+    # Closing the generator or setting the cancel event stops the read and closes the file
+    extensions = ('.m3u', '.m3u8', '.pls', '.xspf')
+
+    @classmethod
+    def supports(cls, mediaPath):
+        path = MetadataCache.localPath(mediaPath) if mediaPath else None
+        return bool(path) and os.path.splitext(path)[1].lower() in cls.extensions and os.path.isfile(path)
+
+    @classmethod
+    def parse(cls, mediaPath, cancel=None):
+        path = MetadataCache.localPath(mediaPath)
+        ext = os.path.splitext(path)[1].lower()
+        if ext == '.pls':
+            entries = cls.parsePLS(path)
+        elif ext == '.xspf':
+            entries = cls.parseXSPF(path)
+        else:
+            entries = cls.parseM3U(path)
+        if cancel is None:
+            return entries
+        return cls._cancellable(entries, cancel)
+
+    @classmethod
+    def expand(cls, mediaPaths, cancel=None):
+        # Playlists among the paths are replaced by their entries, everything else passes through
+        for mediaPath in mediaPaths:
+            if cancel is not None and cancel.is_set():
+                return
+            if cls.supports(mediaPath):
+                yield from cls.parse(mediaPath, cancel)
+            else:
+                yield mediaPath
+
+    @staticmethod
+    def _cancellable(entries, cancel):
+        try:
+            for entry in entries:
+                if cancel.is_set():
+                    return
+                yield entry
+        finally:
+            entries.close()
+
+    @staticmethod
+    def resolve(entry, base):
+        # Local entries become paths relative to the playlist's folder, other URLs are kept as they are
+        if entry.startswith("file:///"):
+            # What MetadataCache.localPath returns, without a full URL parse for every entry
+            path = unquote(entry[7:])
+            if sys.platform == "win32" and path[2:3] == ":":
+                path = path[1:]
+            return os.path.normpath(path)
+        if entry.startswith("file://"):
+            return MetadataCache.localPath(entry)
+        if "://" in entry:
+            return entry
+        return os.path.normpath(os.path.join(base, entry))
+
+    @classmethod
+    def resolveBytes(cls, raw, base):
+        # Legacy playlists aren't always UTF-8. Windows names are Unicode and those playlists were written in the
+        # ANSI code page, elsewhere names are bytes and a file:// URL carries them to libvlc unchanged
+        try:
+            return cls.resolve(raw.decode("utf-8"), base)
+        except UnicodeDecodeError:
+            pass
+        if sys.platform == "win32":
+            return cls.resolve(raw.decode("mbcs", "replace"), base)
+        if b"://" in raw:
+            return quote(raw, safe="/:?&=#%@+")
+        return "file://" + quote(os.path.normpath(os.path.join(os.fsencode(base), raw)))
+
+    @staticmethod
+    def lines(f):
+        # Stripped byte lines without the UTF-8 BOM
+        for i, line in enumerate(f):
+            if i == 0 and line[:3] == b"\xef\xbb\xbf":
+                line = line[3:]
+            yield line.strip()
+
+    @classmethod
+    def parseM3U(cls, path):
+        # Extended M3U directives and comments start with #, every other line is an entry
+        base = os.path.dirname(path)
+        with open(path, "rb") as f:
+            for line in cls.lines(f):
+                if line and line[:1] != b"#":
+                    yield cls.resolveBytes(line, base)
+
+    @classmethod
+    def parsePLS(cls, path):
+        # FileN=... lines in file order, titles and lengths are left to the probe
+        base = os.path.dirname(path)
+        with open(path, "rb") as f:
+            for line in cls.lines(f):
+                if line[:4].lower() != b"file":
+                    continue
+                key, sep, value = line.partition(b"=")
+                value = value.strip()
+                if sep and key[4:].strip().isdigit() and value:
+                    yield cls.resolveBytes(value, base)
+
+    @classmethod
+    def parseXSPF(cls, path, chunkSize=1 << 16):
+        # Expat handlers collect the track locations of each chunk, no element tree is ever built
+        base = os.path.dirname(path)
+        entries = []
+        state = {'track' : False, 'found' : False, 'text' : None}
+
+        def start(name, attributes):
+            tag = name.rpartition("}")[2]
+            if tag == "track":
+                state['track'] = True
+                state['found'] = False
+            elif tag == "location" and state['track'] and not state['found']:
+                state['text'] = []
+
+        def end(name):
+            tag = name.rpartition("}")[2]
+            if tag == "track":
+                state['track'] = False
+            elif tag == "location" and state['text'] is not None:
+                location = "".join(state['text']).strip()
+                state['text'] = None
+                if location:
+                    state['found'] = True
+                    entries.append(location)
+
+        def text(data):
+            if state['text'] is not None:
+                state['text'].append(data)
+
+        parser = ParserCreate(namespace_separator="}")
+        parser.StartElementHandler = start
+        parser.EndElementHandler = end
+        parser.CharacterDataHandler = text
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(chunkSize)
+                parser.Parse(chunk, not chunk)
+                for location in entries:
+                    yield cls.resolve(location if "://" in location else unquote(location), base)
+                entries.clear()
+                if not chunk:
+                    return
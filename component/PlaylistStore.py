@@ -0,0 +1,180 @@
+import os
+import random
+from array import array
+from itertools import accumulate, islice
+
+class PlaylistStore(object):
+    # Entries packed into typed arrays: every path lives in one UTF-8 blob with an offset table and durations
+    # in an int array, so 100k entries cost a few MB instead of a handful of Python objects each.
+    # The play order is a permutation with its inverse, next, previous and jumping to a row are O(1) in every mode
+    repeatModes = ("off", "all", "one")
+
+    def __init__(self, seed=None):
+        self.random = random.Random(seed)
+        self.clear()
+        self.shuffle = False
+        self.repeat = "off"
+
+    def clear(self):
+        self.blob = bytearray()
+        self.offsets = array('Q', [0])
+        # Milliseconds, -1 until probed
+        self.durations = array('i')
+        # Only rows that were probed have a title
+        self.titles = {}
+        self.order = array('I')
+        self.rank = array('I')
+        self.cursor = -1
+        # First row of the next shuffled round once it has been peeked at
+        self.upcoming = None
+
+    def __len__(self):
+        return len(self.durations)
+
+    def append(self, path):
+        row = len(self.durations)
+        self.blob += path.encode("utf-8", "surrogateescape")
+        self.offsets.append(len(self.blob))
+        self.durations.append(-1)
+        self.order.append(row)
+        self.rank.append(row)
+        if self.shuffle:
+            # Incremental Fisher-Yates over the part of the order that is still to come
+            self._swap(row, self.random.randint(self.cursor + 1, row))
+        return row
+
+    def extend(self, paths):
+        # Batched append, the arrays grow once per call instead of once per entry
+        first = len(self.durations)
+        encoded = [path.encode("utf-8", "surrogateescape") for path in paths]
+        self.offsets.extend(islice(accumulate(map(len, encoded), initial=len(self.blob)), 1, None))
+        self.blob += b"".join(encoded)
+        last = first + len(encoded)
+        self.durations.extend(array('i', [-1]) * len(encoded))
+        self.order.extend(range(first, last))
+        self.rank.extend(range(first, last))
+        if self.shuffle:
+            for row in range(first, last):
+                self._swap(row, self.random.randint(self.cursor + 1, row))
+        return first, last
+
+    def path(self, row):
+        return self.blob[self.offsets[row]:self.offsets[row + 1]].decode("utf-8", "surrogateescape")
+
+    def title(self, row):
+        title = self.titles.get(row)
+        if title:
+            return title
+        path = self.path(row)
+        return os.path.basename(path.rstrip("/\\")) or path
+
+    def duration(self, row):
+        return self.durations[row]
+
+    def setInfo(self, row, duration, title=None):
+        self.durations[row] = max(int(duration), 0)
+        if title:
+            self.titles[row] = title
+
+    # Play order
+    def _swap(self, i, j):
+        order, rank = self.order, self.rank
+        order[i], order[j] = order[j], order[i]
+        rank[order[i]] = i
+        rank[order[j]] = j
+
+    def current(self):
+        return self.order[self.cursor] if 0 <= self.cursor < len(self.order) else -1
+
+    def setCurrent(self, row):
+        if not 0 <= row < len(self.order):
+            return -1
+        if self.shuffle:
+            # A picked row is played now and the rest of the round keeps its shuffled order
+            if self.rank[row] > self.cursor:
+                self.cursor += 1
+            self._swap(self.rank[row], self.cursor)
+        else:
+            self.cursor = self.rank[row]
+        return row
+
+    def _step(self, delta):
+        if not self.order:
+            return None
+        if self.repeat == "one" and self.cursor >= 0:
+            return self.cursor
+        cursor = self.cursor + delta
+        if 0 <= cursor < len(self.order):
+            return cursor
+        if self.repeat != "all":
+            return None
+        return cursor % len(self.order)
+
+    def _nextRound(self):
+        # The next round's first row is picked when it's first asked for, so the row pre-rolled from
+        # peekNext is the one next() moves to
+        if self.upcoming is None:
+            self.upcoming = self.random.randrange(len(self.order))
+        return self.upcoming
+
+    def peekNext(self):
+        cursor = self._step(1)
+        if cursor is None:
+            return -1
+        if self.shuffle and cursor < self.cursor:
+            return self._nextRound()
+        return self.order[cursor]
+
+    def next(self):
+        cursor = self._step(1)
+        if cursor is None:
+            return -1
+        if self.shuffle and cursor < self.cursor:
+            # Wrapped around, the next round gets a new order
+            self.reshuffle(first=self._nextRound())
+            return self.order[0]
+        self.cursor = cursor
+        return self.order[cursor]
+
+    def previous(self):
+        cursor = self._step(-1)
+        if cursor is None:
+            return -1
+        self.cursor = cursor
+        return self.order[cursor]
+
+    def setShuffle(self, shuffle):
+        if shuffle == self.shuffle:
+            return
+        self.shuffle = shuffle
+        current = self.current()
+        if shuffle:
+            self.reshuffle(first=current if current >= 0 else None)
+        else:
+            self.order = array('I', range(len(self.durations)))
+            self.rank = array('I', self.order)
+            self.cursor = current
+
+    def reshuffle(self, first=None):
+        # A new round, the given row stays at the front so the playing item doesn't change
+        self.upcoming = None
+        rows = list(range(len(self.durations)))
+        self.random.shuffle(rows)
+        self.order = array('I', rows)
+        self.rank = array('I', bytes(4 * len(rows)))
+        for i, row in enumerate(rows):
+            self.rank[row] = i
+        if first is not None:
+            self._swap(self.rank[first], 0)
+            self.cursor = 0
+        else:
+            self.cursor = -1
+
+    def setRepeat(self, mode):
+        if mode not in self.repeatModes:
+            raise ValueError(f"Unknown repeat mode {mode}")
+        self.repeat = mode
+
+    def memoryUsage(self):
+        arrays = (self.offsets, self.durations, self.order, self.rank)
+        return len(self.blob) + sum(a.itemsize * len(a) for a in arrays)
@@ -0,0 +1,33 @@
+from PySide2.QtCore import Qt, Signal
+from PySide2.QtWidgets import QAbstractItemView, QListView
+
+class PlaylistView(QListView):
+    # Uniform rows let the view place any row without asking the model for its size,
+    # so only the rows on screen are ever read and probed. The layout still visits every row,
+    # batched it is spread over several event loop turns instead of stalling one
+    rowActivated = Signal(int)
+
+    def __init__(self, model, parent=None):
+        super(PlaylistView, self).__init__(parent)
+        self.setWindowFlags(Qt.Tool)
+        self.setWindowTitle("Playlist")
+        self.setUniformItemSizes(True)
+        self.setLayoutMode(QListView.Batched)
+        self.setBatchSize(1000)
+        self.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setStyleSheet("QListView {background : #111111; color : #dddddd; border : none;} "
+                           "QListView::item:selected {background : #aa0000;}")
+        self.setModel(model)
+        self.activated.connect(lambda index: self.rowActivated.emit(index.row()))
+        model.currentChanged.connect(self.onCurrentChanged)
+
+    def onCurrentChanged(self, row):
+        if self.isVisible():
+            self.scrollTo(self.model().index(row), QAbstractItemView.EnsureVisible)
+
+    def keyPressEvent(self, event):
+        if event.key() in [Qt.Key_Escape, Qt.Key_Tab, Qt.Key_L]:
+            self.hide()
+            return
+        return super(PlaylistView, self).keyPressEvent(event)
@@ -0,0 +1,320 @@
+import ctypes
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict, deque
+from PySide2.QtCore import QObject, QPoint, Signal
+from PySide2.QtGui import QImage, QPainter
+
+from .LatencyMonitor import LatencyMonitor
+from .MediaContainer import instancePool, vlc
+from .MetadataCache import MetadataCache, defaultCachePath
+
+class SpriteCache(object):
+    # Thumbnails of one file stored as sprite sheets of columns x rows tiles, with a json index of filled tiles
+    def __init__(self, directory, mediaPath, tileSize, columns=10, rows=10):
+        self.directory = directory
+        self.tileSize = tileSize
+        self.columns = columns
+        self.rows = rows
+        self.lock = threading.Lock()
+        self.sheets = {}
+        self.dirty = set()
+
+        stat = os.stat(mediaPath)
+        signature = f"{os.path.normcase(mediaPath)}|{stat.st_size}|{int(stat.st_mtime)}|{tileSize[0]}x{tileSize[1]}"
+        self.name = hashlib.sha1(signature.encode("utf-8")).hexdigest()
+        self.filled = {}
+        try:
+            with open(self.indexPath(), "r", encoding="utf-8") as f:
+                self.filled = {int(k) : set(v) for k, v in json.load(f).items()}
+        except (OSError, ValueError, AttributeError):
+            self.filled = {}
+
+    def indexPath(self):
+        return os.path.join(self.directory, f"{self.name}.json")
+
+    def sheetPath(self, sheet):
+        return os.path.join(self.directory, f"{self.name}_{sheet}.png")
+
+    def locate(self, bucket):
+        perSheet = self.columns * self.rows
+        sheet, tile = divmod(bucket, perSheet)
+        w, h = self.tileSize
+        return sheet, tile, QPoint((tile % self.columns) * w, (tile // self.columns) * h)
+
+    def _sheet(self, sheet):
+        image = self.sheets.get(sheet)
+        if image is None:
+            image = QImage(self.sheetPath(sheet))
+            if image.isNull():
+                image = QImage(self.columns * self.tileSize[0], self.rows * self.tileSize[1], QImage.Format_RGB32)
+                image.fill(0)
+                self.filled.pop(sheet, None)
+            self.sheets[sheet] = image
+        return image
+
+    def get(self, bucket):
+        sheet, tile, pos = self.locate(bucket)
+        with self.lock:
+            if tile not in self.filled.get(sheet, ()):
+                return None
+            return self._sheet(sheet).copy(pos.x(), pos.y(), *self.tileSize)
+
+    def put(self, bucket, image):
+        sheet, tile, pos = self.locate(bucket)
+        with self.lock:
+            target = self._sheet(sheet)
+            painter = QPainter(target)
+            painter.drawImage(pos, image)
+            painter.end()
+            self.filled.setdefault(sheet, set()).add(tile)
+            self.dirty.add(sheet)
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            for sheet in self.dirty:
+                self.sheets[sheet].save(self.sheetPath(sheet), "PNG")
+            with open(self.indexPath(), "w", encoding="utf-8") as f:
+                json.dump({k : sorted(v) for k, v in self.filled.items()}, f)
+            self.dirty.clear()
+
+class ThumbnailWorker(object):
+    # Headless libvlc player decoding into a small RV32 buffer through the video callbacks
+    def __init__(self, provider):
+        self.provider = provider
+        self.mediaPath = None
+        self.size = None
+        self.frameReady = threading.Event()
+        self.player = provider.vlc.media_player_new()
+        self.player.audio_set_mute(True)
+
+        @vlc.CallbackDecorators.VideoLockCb
+        def lock(opaque, planes):
+            planes[0] = self.bufferPointer
+            return None
+
+        @vlc.CallbackDecorators.VideoDisplayCb
+        def display(opaque, picture):
+            self.frameReady.set()
+
+        self._callbacks = (lock, display)
+        self.player.video_set_callbacks(lock, None, display, None)
+
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def setSize(self, size):
+        if size == self.size:
+            return
+        self.size = size
+        # The open media may still have a picture locked on the old buffer, the player is stopped before it goes
+        # and the buffer itself is kept until the next media is set
+        self.player.stop()
+        self.retired = getattr(self, "buffer", None)
+        self.buffer = ctypes.create_string_buffer(size[0] * size[1] * 4)
+        self.bufferPointer = ctypes.cast(self.buffer, ctypes.c_void_p)
+        self.player.video_set_format("RV32", size[0], size[1], size[0] * 4)
+        self.mediaPath = None
+
+    def run(self):
+        while True:
+            job = self.provider.takeJob()
+            if job is None:
+                break
+            mediaPath, size, bucket, ms = job
+            image = self.decode(mediaPath, size, ms)
+            self.provider.deliver(mediaPath, bucket, image)
+        self.player.stop()
+        self.player.release()
+
+    def decode(self, mediaPath, size, ms):
+        self.setSize(size)
+        self.frameReady.clear()
+        if mediaPath != self.mediaPath:
+            self.mediaPath = mediaPath
+            media = self.provider.vlc.media_new(mediaPath, "no-audio", "no-spu", f"start-time={ms/1000:.3f}")
+            self.player.set_media(media)
+            self.retired = None
+            self.player.play()
+            ready = self.frameReady.wait(self.provider.timeout)
+            self.player.set_pause(1)
+        else:
+            self.player.set_time(int(ms))
+            ready = self.frameReady.wait(self.provider.timeout)
+        if not ready:
+            self.mediaPath = None
+            return None
+        return QImage(self.buffer.raw, size[0], size[1], size[0] * 4, QImage.Format_RGB32).copy()
+
+class ThumbnailProvider(QObject):
+    # (mediaPath, bucket, image), a thumbnail still decoding when the media changes arrives with the old path
+    thumbnailReady = Signal(str, int, QImage)
+
+    def __init__(self, parent=None, workers=2, width=160, cacheSize=256, spriteCache=True, timeout=2.0):
+        super(ThumbnailProvider, self).__init__(parent)
+        self.workerCount = workers
+        self.width = width
+        self.cacheSize = cacheSize
+        self.spriteCacheEnabled = spriteCache
+        self.spriteDirectory = os.path.join(os.path.dirname(defaultCachePath()), "thumbnails")
+        self.timeout = timeout
+        self.latency = LatencyMonitor(enabled=True)
+
+        self.vlc = None
+        self.workers = []
+        self.condition = threading.Condition()
+        self.pending = deque()
+        self.cache = OrderedDict()
+        self.requested = {}
+        self.current = None
+        self.closed = False
+
+        self.mediaPath = None
+        self.duration = 0
+        self.size = (width, int(width * 9 / 16))
+        self.sprites = None
+
+        self.hits = 0
+        self.misses = 0
+        self.cancelled = 0
+
+        self.thumbnailReady.connect(self.onThumbnailReady)
+
+    def setMedia(self, mediaPath, duration, ratio=16/9):
+        localPath = MetadataCache.localPath(mediaPath) if mediaPath else None
+        if localPath and not os.path.isfile(localPath):
+            localPath = None
+        height = int(self.width / ratio) if ratio else self.size[1]
+        size = (self.width, height + height % 2)
+        if (localPath, duration, size) == (self.mediaPath, self.duration, self.size):
+            return
+        self.saveSprites()
+        with self.condition:
+            self.cancelled += len(self.pending)
+            self.pending.clear()
+        self.mediaPath = localPath
+        self.duration = duration
+        self.size = size
+        self.sprites = None
+        if self.mediaPath and self.spriteCacheEnabled:
+            self.sprites = SpriteCache(self.spriteDirectory, self.mediaPath, self.size)
+
+    def bucketLength(self):
+        # Hover positions are quantized so nearby requests share a thumbnail
+        return max(self.duration / 200, 1000)
+
+    def bucketFor(self, ms):
+        return int(max(ms, 0) // self.bucketLength())
+
+    def request(self, ms):
+        # Returns the cached thumbnail or None, in which case thumbnailReady follows unless cancelled
+        if not self.mediaPath or self.duration <= 0:
+            return None
+        bucket = self.bucketFor(ms)
+        if bucket != self.current:
+            self.latency.start('hover')
+        self.current = bucket
+
+        image = self.cached(bucket)
+        if image is not None:
+            self.hits += 1
+            self.latency.stop('hover', 'thumbnail')
+            return image
+        self.misses += 1
+
+        self.startWorkers()
+        with self.condition:
+            # Whatever the cursor already left is dropped, only the latest position is decoded
+            self.cancelled += len(self.pending)
+            self.pending.clear()
+            if bucket not in self.requested.values():
+                center = min((bucket + 0.5) * self.bucketLength(), max(self.duration - 1, 0))
+                self.pending.append((self.mediaPath, self.size, bucket, center))
+                self.condition.notify()
+        return None
+
+    def cancel(self):
+        self.current = None
+        with self.condition:
+            self.cancelled += len(self.pending)
+            self.pending.clear()
+
+    def cached(self, bucket):
+        key = (self.mediaPath, bucket)
+        image = self.cache.get(key)
+        if image is not None:
+            self.cache.move_to_end(key)
+            return image
+        if self.sprites:
+            image = self.sprites.get(bucket)
+            if image is not None:
+                self.remember(key, image)
+        return image
+
+    def remember(self, key, image):
+        self.cache[key] = image
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.cacheSize:
+            self.cache.popitem(last=False)
+
+    def startWorkers(self):
+        if self.workers:
+            return
+        self.vlc = instancePool.acquire(["--no-audio", "--no-spu"])
+        self.workers = [ThumbnailWorker(self) for i in range(self.workerCount)]
+
+    # Worker thread side
+    def takeJob(self):
+        with self.condition:
+            while not self.pending and not self.closed:
+                self.condition.wait()
+            if self.closed:
+                return None
+            job = self.pending.popleft()
+            self.requested[threading.get_ident()] = job[2]
+            return job
+
+    def deliver(self, mediaPath, bucket, image):
+        with self.condition:
+            self.requested.pop(threading.get_ident(), None)
+        if image is None:
+            return
+        self.thumbnailReady.emit(mediaPath, bucket, image)
+
+    # GUI thread side
+    def onThumbnailReady(self, mediaPath, bucket, image):
+        # The media may have changed while the signal was queued, only the current file's thumbnails are kept
+        if mediaPath != self.mediaPath:
+            return
+        if self.sprites:
+            self.sprites.put(bucket, image)
+        self.remember((mediaPath, bucket), image)
+        if bucket == self.current:
+            self.latency.stop('hover', 'thumbnail')
+
+    def saveSprites(self):
+        if self.sprites:
+            self.sprites.save()
+
+    def stats(self):
+        stats = {'hits' : self.hits, 'misses' : self.misses, 'cancelled' : self.cancelled, 'cached' : len(self.cache)}
+        stats.update(self.latency.percentiles('thumbnail'))
+        return stats
+
+    def close(self):
+        self.saveSprites()
+        with self.condition:
+            self.closed = True
+            self.pending.clear()
+            self.condition.notify_all()
+        for worker in self.workers:
+            worker.thread.join(self.timeout)
+        self.workers = []
+        if self.vlc:
+            instancePool.release(self.vlc)
+            self.vlc = None
@@ -1,5 +1,6 @@
-from PySide2.QtCore import Property, QPoint
-from PySide2.QtWidgets import QApplication, QSlider, QStyleOptionSlider, QToolTip
+from PySide2.QtCore import Property, QLineF, QPoint, Qt
+from PySide2.QtGui import QColor, QPainter, QPixmap
+from PySide2.QtWidgets import QApplication, QLabel, QSlider, QStyle, QStyleOptionSlider, QToolTip
 
 class TimeSlider(QSlider):
     def __init__(self, *args, maxTime=1, offset=QPoint(-25, -45)):
@@ -7,11 +8,20 @@ class TimeSlider(QSlider):
         self.offset = offset
 
         self.setMaxTime(maxTime)
+        self.setFrameMapper(None)
         self.setFixedHeight(16)
         self.style = QApplication.style()
         self.opt = QStyleOptionSlider()
         self.setMaximum(1000)
 
+        self.waveform = None
+        self.waveformRange = None
+        self.waveformColor = QColor(255, 255, 255, 60)
+        self._waveformLines = (None, [])
+        self.thumbnails = None
+        self.preview = None
+        self.hoverBucket = None
+
         self.valueChanged.connect(self.showTip)
         self.enterEvent = self.showTip
         self.setTipVisibility(True)
@@ -21,8 +31,55 @@ class TimeSlider(QSlider):
     def setMaxTime(self, maxTime):
         self.maxTime = maxTime
         
+    def setFrameMapper(self, frameToTime):
+        # Callable returning the exact time in ms of a slider value, linear over maxTime when None
+        self.frameToTime = frameToTime
+
+    def setThumbnailProvider(self, provider):
+        self.thumbnails = provider
+        self.thumbnails.thumbnailReady.connect(self.onThumbnailReady)
+        self.preview = QLabel(None, Qt.ToolTip)
+        self.preview.setStyleSheet("border : 1px solid #aa0000; background : black;")
+        self.setMouseTracking(True)
+
+    def setWaveform(self, pyramid):
+        self.waveform = pyramid
+        self._waveformLines = (None, [])
+        self.update()
+
+    def setWaveformRange(self, startMs=None, endMs=None):
+        # Zoom the waveform to a time range, the matching pyramid level is picked at paint time
+        self.waveformRange = (startMs, endMs) if startMs is not None and endMs is not None else None
+        self.update()
+
+    def waveformLines(self):
+        start, end = self.waveformRange or (0, self.maxTime)
+        key = (id(self.waveform), start, end, self.width(), self.height())
+        if self._waveformLines[0] == key:
+            return self._waveformLines[1]
+        lines = []
+        peaks = self.waveform.peaks(start, end, self.width())
+        if peaks is not None:
+            mins, maxs, _ = peaks
+            middle = self.height() / 2
+            for x, (low, high) in enumerate(zip(mins.tolist(), maxs.tolist())):
+                if high > low:
+                    lines.append(QLineF(x, middle - high*middle, x, middle - low*middle))
+        self._waveformLines = (key, lines)
+        return lines
+
+    def paintEvent(self, event):
+        if self.waveform is not None and self.height() > 2:
+            painter = QPainter(self)
+            painter.setPen(self.waveformColor)
+            painter.drawLines(self.waveformLines())
+            painter.end()
+        return super(TimeSlider, self).paintEvent(event)
+
     def setTipVisibility(self, visible):
         self.tipVisible = visible
+        if not visible:
+            self.hidePreview()
 
     def setHeight(self,value): self.setFixedHeight(value)
     def getHeight(self): return self.height()
@@ -35,10 +92,57 @@ class TimeSlider(QSlider):
 
             pos_local = rectHandle.topLeft() + self.offset
             pos_global = self.mapToGlobal(pos_local)
-            currentms = self.maxTime * (float(self.value()) / max(self.maximum(), 1))
+            currentms = self.timeAt(self.value())
             currentTime = f"{int(currentms / (1000*60*60)) % 24:02d}:{int(currentms / (1000*60)) % 60:02d}:{(currentms / (1000)) % 60:04.02f} ({self.value()})"
             self.tip = QToolTip.showText(pos_global, currentTime, self)
 
+    def timeAt(self, value):
+        if self.frameToTime:
+            return self.frameToTime(value)
+        return self.maxTime * (float(value) / max(self.maximum(), 1))
+
+    def valueAt(self, x):
+        self.initStyleOption(self.opt)
+        rectHandle = self.style.subControlRect(self.style.CC_Slider, self.opt, self.style.SC_SliderHandle)
+        span = max(self.width() - rectHandle.width(), 1)
+        return QStyle.sliderValueFromPosition(self.minimum(), self.maximum(), int(x - rectHandle.width()/2), span)
+
+    def showPreview(self, x):
+        ms = self.timeAt(self.valueAt(x))
+        self.hoverBucket = self.thumbnails.bucketFor(ms)
+        image = self.thumbnails.request(ms)
+        if image is not None:
+            self.preview.setPixmap(QPixmap.fromImage(image))
+            self.preview.adjustSize()
+        if self.preview.pixmap() is None or self.preview.pixmap().isNull():
+            return
+        size = self.preview.size()
+        self.preview.move(self.mapToGlobal(QPoint(int(x - size.width()/2), -size.height() - 30)))
+        self.preview.show()
+
+    def hidePreview(self):
+        if self.preview:
+            self.preview.hide()
+            self.thumbnails.cancel()
+        self.hoverBucket = None
+
+    def onThumbnailReady(self, mediaPath, bucket, image):
+        if mediaPath != self.thumbnails.mediaPath or bucket != self.hoverBucket:
+            return
+        self.preview.setPixmap(QPixmap.fromImage(image))
+        self.preview.adjustSize()
+        if not self.preview.isVisible() and self.underMouse():
+            self.showPreview(self.mapFromGlobal(self.cursor().pos()).x())
+
+    def mouseMoveEvent(self, event):
+        if self.thumbnails and self.tipVisible:
+            self.showPreview(event.pos().x())
+        return super(TimeSlider, self).mouseMoveEvent(event)
+
+    def leaveEvent(self, event):
+        self.hidePreview()
+        return super(TimeSlider, self).leaveEvent(event)
+
     def qss(self):
         return """
             QSlider::handle:horizontal, QSlider::handle:vertical {
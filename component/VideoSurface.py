@@ -0,0 +1,84 @@
+from PySide2.QtCore import QRect, QRectF, Qt, Signal
+from PySide2.QtGui import QImage, QPainter
+from PySide2.QtWidgets import QWidget
+
+class VideoSurface(QWidget):
+    # Paints the pictures of an RV32 FrameTap with QPainter, so controls can be plain child widgets on the same
+    # window surface. Only the damaged part of the picture is drawn, a control repainting over the video redraws
+    # the pixels under that control and nothing else
+    _frameReady = Signal()
+
+    def __init__(self, parent=None):
+        super(VideoSurface, self).__init__(parent)
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self.setAttribute(Qt.WA_NoSystemBackground)
+        self.tap = None
+        self.frame = None
+        self.image = None
+        self.target = QRect()
+        self.frames = 0
+        self._scheduled = False
+        self._frameReady.connect(self._present)
+
+    def setTap(self, tap):
+        if self.tap is not None:
+            self.tap.onPublish = None
+        self.tap = tap
+        tap.onPublish = self._notify
+
+    # Decoder thread side, coalesced like EventBridge so a slow GUI sees only the newest picture
+    def _notify(self):
+        if not self._scheduled:
+            self._scheduled = True
+            self._frameReady.emit()
+
+    # GUI thread side
+    def _present(self):
+        self._scheduled = False
+        frame = self.tap.latest()
+        if frame is None or frame is self.frame:
+            return
+        # The QImage wraps the pool buffer, the tap doesn't reuse it until the next latest() call
+        self.frame = frame
+        array = frame.array
+        self.image = QImage(array.data, array.shape[1], array.shape[0], array.strides[0], QImage.Format_RGB32)
+        self.frames += 1
+        target = self.imageRect()
+        if target != self.target:
+            # The letterbox changed too
+            self.target = target
+            self.update()
+        else:
+            self.update(target)
+
+    def imageRect(self):
+        if self.image is None:
+            return QRect()
+        size = self.image.size().scaled(self.size(), Qt.KeepAspectRatio)
+        return QRect((self.width() - size.width()) // 2, (self.height() - size.height()) // 2, size.width(), size.height())
+
+    def resizeEvent(self, event):
+        self.target = self.imageRect()
+        return super(VideoSurface, self).resizeEvent(event)
+
+    def paintEvent(self, event):
+        qp = QPainter(self)
+        for rect in event.region().rects():
+            damaged = rect.intersected(self.target)
+            if damaged != rect:
+                qp.fillRect(rect, Qt.black)
+            if damaged.isEmpty():
+                continue
+            # Map the damaged rectangle back into the picture and scale only that part
+            sx = self.image.width() / self.target.width()
+            sy = self.image.height() / self.target.height()
+            source = QRectF((damaged.x() - self.target.x()) * sx, (damaged.y() - self.target.y()) * sy,
+                            damaged.width() * sx, damaged.height() * sy)
+            qp.drawImage(QRectF(damaged), self.image, source)
+        qp.end()
+
+    def clear(self):
+        self.frame = None
+        self.image = None
+        self.target = QRect()
+        self.update()
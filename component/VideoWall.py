@@ -0,0 +1,237 @@
+import math
+import time
+from PySide2.QtCore import Qt, QTimer, Signal
+from PySide2.QtWidgets import QAction, QGridLayout, QMenu, QWidget
+
+from .MediaContainer import MediaContainer, vlc
+
+class VideoTile(MediaContainer):
+    # Decode hints by tile width, small tiles decode at reduced resolution and skip the loop filter
+    decodeHints = (
+        (320, ["avcodec-lowres=2", "avcodec-skiploopfilter=4"]),
+        (640, ["avcodec-lowres=1", "avcodec-skiploopfilter=4"]),
+    )
+
+    def __init__(self, index, parent=None, vlcOptions=()):
+        super(VideoTile, self).__init__(parent, vlcOptions=vlcOptions)
+        self.index = index
+        self.setWindowFlags(Qt.Widget)
+        self.setGripSize(0)
+        self.layout().setContentsMargins(0,0,0,0)
+        self.setStyleSheet("#Master {background-color : black;}")
+        self.mediaPlayer.video_set_mouse_input(False)
+        self.mediaPlayer.video_set_key_input(False)
+
+        self.hintLevel = None
+        self.hintTimer = QTimer(self)
+        self.hintTimer.setSingleShot(True)
+        self.hintTimer.setInterval(500)
+        self.hintTimer.timeout.connect(self.applyDecodeHints)
+
+        self.lastStats = None
+        self.metrics = {'index' : index, 'decodedFps' : 0.0, 'displayedFps' : 0.0, 'dropped' : 0, 'droppedPerSec' : 0.0, 'cpuEstimate' : 0.0}
+
+    def keepRatio(self, size):
+        # The grid decides the tile geometry, the video is letterboxed by libvlc instead
+        return
+
+    def hintsFor(self, width):
+        for level, (limit, options) in enumerate(self.decodeHints):
+            if width < limit:
+                return level, options
+        return len(self.decodeHints), []
+
+    def createMedia(self, mediaPath, *options):
+        self.hintLevel, self.mediaOptions = self.hintsFor(self.width())
+        return super(VideoTile, self).createMedia(mediaPath, *options)
+
+    def resizeEvent(self, event):
+        super(VideoTile, self).resizeEvent(event)
+        if self.media:
+            self.hintTimer.start()
+
+    def applyDecodeHints(self):
+        level, _ = self.hintsFor(self.width())
+        if level == self.hintLevel or not self.mediaPath:
+            return
+        # Decoder options only apply when opening, reopen at the current time with the new hints
+        playing = self.isPlaying()
+        seconds = max(self.mediaPlayer.get_time(), 0) / 1000
+        muted = self.isMuted()
+        self.createMedia(self.mediaPath, f"start-time={seconds:.3f}")
+        self.setMute(muted)
+        if playing:
+            self.play()
+
+    def sampleStats(self, interval):
+        if not self.media:
+            return
+        stats = vlc.MediaStats()
+        if not self.media.get_stats(stats):
+            return
+        current = (stats.decoded_video, stats.displayed_pictures, stats.lost_pictures + getattr(stats, "late_pictures", 0))
+        if self.lastStats and interval > 0:
+            decoded, displayed, dropped = [max(c - l, 0) for c, l in zip(current, self.lastStats)]
+            self.metrics['decodedFps'] = decoded / interval
+            self.metrics['displayedFps'] = displayed / interval
+            self.metrics['droppedPerSec'] = dropped / interval
+        self.metrics['dropped'] = current[2]
+        self.lastStats = current
+
+    def decodeLoad(self):
+        # Relative decode work, used to split the process CPU time between tiles
+        return self.metrics['decodedFps'] * max(self.metadata.get('width', 0) * self.metadata.get('height', 0), 1)
+
+class VideoWall(QWidget):
+    tileSelected = Signal(int)
+
+    def __init__(self, parent=None, vlcOptions=(), statsInterval=1000):
+        super(VideoWall, self).__init__(parent)
+        self.setWindowTitle("Video Wall")
+        self.setStyleSheet("background-color : black;")
+        self.setFocusPolicy(Qt.StrongFocus)
+        self.vlcOptions = vlcOptions
+        self.tiles = []
+        self.selected = 0
+        self.enlarged = None
+
+        self.grid = QGridLayout(self)
+        self.grid.setContentsMargins(0,0,0,0)
+        self.grid.setSpacing(2)
+
+        self.statsTimer = QTimer(self)
+        self.statsTimer.setInterval(statsInterval)
+        self.statsTimer.timeout.connect(self.sampleStats)
+        self._lastSample = None
+
+        self.setupRightClick()
+
+    def setupRightClick(self):
+        self.popMenu = QMenu(self)
+        self.muteAct = QAction('Mute', self)
+        self.enlargeAct = QAction('Enlarge', self)
+        self.muteAct.setCheckable(True)
+        self.enlargeAct.setCheckable(True)
+        self.popMenu.addAction(self.muteAct)
+        self.popMenu.addAction(self.enlargeAct)
+        self.muteAct.triggered.connect(lambda state: self.setMute(self.selected, state))
+        self.enlargeAct.triggered.connect(lambda: self.toggleEnlarge(self.selected))
+
+    def addStream(self, mediaPath):
+        # Every tile shares the same pooled libvlc instance
+        tile = VideoTile(len(self.tiles), self, vlcOptions=self.vlcOptions)
+        self.tiles.append(tile)
+        self.relayout()
+        tile.createMedia(mediaPath)
+        tile.setMute(len(self.tiles) > 1)
+        return tile
+
+    def relayout(self):
+        for tile in self.tiles:
+            self.grid.removeWidget(tile)
+        if self.enlarged is not None:
+            for tile in self.tiles:
+                tile.setVisible(tile.index == self.enlarged)
+            self.grid.addWidget(self.tiles[self.enlarged], 0, 0)
+            return
+        columns = max(math.ceil(math.sqrt(len(self.tiles))), 1)
+        for tile in self.tiles:
+            tile.show()
+            self.grid.addWidget(tile, tile.index // columns, tile.index % columns)
+
+    def tileAt(self, pos):
+        child = self.childAt(pos)
+        while child is not None and not isinstance(child, VideoTile):
+            child = child.parentWidget()
+        return child
+
+    def select(self, index):
+        if not 0 <= index < len(self.tiles):
+            return
+        self.selected = index
+        self.tileSelected.emit(index)
+
+    def setMute(self, index, state):
+        self.tiles[index].setMute(state)
+
+    def toggleMute(self, index):
+        self.setMute(index, not self.tiles[index].isMuted())
+
+    def toggleEnlarge(self, index):
+        self.enlarged = None if self.enlarged == index else index
+        self.relayout()
+
+    def play(self):
+        for tile in self.tiles:
+            tile.play()
+        self.statsTimer.start()
+
+    def pause(self):
+        for tile in self.tiles:
+            tile.pause()
+
+    def togglePlay(self):
+        if any(tile.isPlaying() for tile in self.tiles):
+            self.pause()
+        else:
+            self.play()
+
+    def sampleStats(self):
+        now = time.perf_counter()
+        cpu = time.process_time()
+        if self._lastSample is None:
+            self._lastSample = (now, cpu)
+            return
+        interval = now - self._lastSample[0]
+        cpuShare = (cpu - self._lastSample[1]) / interval if interval > 0 else 0
+        self._lastSample = (now, cpu)
+
+        for tile in self.tiles:
+            tile.sampleStats(interval)
+        total = sum(tile.decodeLoad() for tile in self.tiles) or 1
+        for tile in self.tiles:
+            tile.metrics['cpuEstimate'] = cpuShare * tile.decodeLoad() / total
+
+    def stats(self):
+        return [dict(tile.metrics) for tile in self.tiles]
+
+    def mousePressEvent(self, event):
+        tile = self.tileAt(event.pos())
+        if tile:
+            self.select(tile.index)
+        return super(VideoWall, self).mousePressEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        if event.button() == Qt.MouseButton.RightButton and self.tiles:
+            self.muteAct.setChecked(self.tiles[self.selected].isMuted())
+            self.enlargeAct.setChecked(self.enlarged == self.selected)
+            self.popMenu.exec_(self.mapToGlobal(event.pos()))
+        return super(VideoWall, self).mouseReleaseEvent(event)
+
+    def mouseDoubleClickEvent(self, event):
+        tile = self.tileAt(event.pos())
+        if tile:
+            self.toggleEnlarge(tile.index)
+        return super(VideoWall, self).mouseDoubleClickEvent(event)
+
+    def keyPressEvent(self, event):
+        if event.key() in [Qt.Key_Space]:
+            self.togglePlay()
+        elif event.key() in [Qt.Key_M] and self.tiles:
+            self.toggleMute(self.selected)
+        elif event.key() in [Qt.Key_Return, Qt.Key_Enter, Qt.Key_F] and self.tiles:
+            self.toggleEnlarge(self.selected)
+        elif Qt.Key_1 <= event.key() <= Qt.Key_9:
+            self.select(event.key() - Qt.Key_1)
+        elif event.key() in [Qt.Key_Escape]:
+            if self.enlarged is not None:
+                self.toggleEnlarge(self.enlarged)
+            else:
+                self.close()
+        return super(VideoWall, self).keyPressEvent(event)
+
+    def closeEvent(self, event):
+        self.statsTimer.stop()
+        for tile in self.tiles:
+            tile.releasePlayer()
+        return super(VideoWall, self).closeEvent(event)
@@ -0,0 +1,251 @@
+import ctypes
+import hashlib
+import os
+import threading
+import time
+from PySide2.QtCore import QObject, Signal
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .MediaContainer import instancePool, vlc
+from .MetadataCache import MetadataCache, defaultCachePath
+
+class WaveformPyramid(object):
+    # min/max/rms peaks of the audio at several zoom levels, level 0 holds one peak per samplesPerPeak samples
+    # and every next level reduces the previous one by factor
+    def __init__(self, sampleRate, samplesPerPeak, levels, factor=4):
+        self.sampleRate = sampleRate
+        self.samplesPerPeak = samplesPerPeak
+        self.levels = levels
+        self.factor = factor
+
+    @classmethod
+    def build(cls, sampleRate, samplesPerPeak, mins, maxs, squares, factor=4, minimumPeaks=256):
+        rms = np.sqrt(squares / samplesPerPeak)
+        levels = [(mins, maxs, rms.astype(np.float32))]
+        while len(levels[-1][0]) > minimumPeaks:
+            lmin, lmax, lrms = levels[-1]
+            count = len(lmin) // factor * factor
+            if not count:
+                break
+            shape = (-1, factor)
+            levels.append((
+                lmin[:count].reshape(shape).min(axis=1),
+                lmax[:count].reshape(shape).max(axis=1),
+                np.sqrt((lrms[:count].reshape(shape) ** 2).mean(axis=1)).astype(np.float32)
+            ))
+        return cls(sampleRate, samplesPerPeak, levels, factor)
+
+    def msPerPeak(self, level):
+        return self.samplesPerPeak * self.factor ** level * 1000 / self.sampleRate
+
+    def levelFor(self, msPerPixel):
+        # Coarsest level that still has at least one peak per pixel
+        level = 0
+        while level + 1 < len(self.levels) and self.msPerPeak(level + 1) <= msPerPixel:
+            level += 1
+        return level
+
+    def peaks(self, startMs, endMs, pixels):
+        # (mins, maxs, rms) with one value per pixel for the time range, read from the matching level
+        if pixels <= 0 or endMs <= startMs:
+            return None
+        level = self.levelFor((endMs - startMs) / pixels)
+        mins, maxs, rms = self.levels[level]
+        step = self.msPerPeak(level)
+        edges = np.linspace(startMs / step, endMs / step, pixels + 1).astype(np.int64)
+        edges = np.clip(edges, 0, len(mins))
+        end = int(edges[-1])
+        if not end:
+            return None
+        valid = edges[1:] > edges[:-1]
+        starts = np.minimum(edges[:-1], end - 1)
+        return (
+            np.where(valid, np.minimum.reduceat(mins[:end], starts), 0),
+            np.where(valid, np.maximum.reduceat(maxs[:end], starts), 0),
+            np.where(valid, np.maximum.reduceat(rms[:end], starts), 0)
+        )
+
+    def save(self, path):
+        arrays = {'meta' : np.array([self.sampleRate, self.samplesPerPeak, self.factor], dtype=np.int64)}
+        for i, (mins, maxs, rms) in enumerate(self.levels):
+            arrays[f"min{i}"] = mins
+            arrays[f"max{i}"] = maxs
+            arrays[f"rms{i}"] = rms
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmpPath = path + ".tmp.npz"
+        np.savez_compressed(tmpPath, **arrays)
+        os.replace(tmpPath, path)
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with np.load(path) as data:
+                sampleRate, samplesPerPeak, factor = (int(v) for v in data['meta'])
+                levels = []
+                while f"min{len(levels)}" in data:
+                    i = len(levels)
+                    levels.append((data[f"min{i}"], data[f"max{i}"], data[f"rms{i}"]))
+        except (OSError, ValueError, KeyError):
+            return None
+        return cls(sampleRate, samplesPerPeak, levels, factor) if levels else None
+
+class WaveformIndexer(QObject):
+    # Decodes the audio track on headless players through the audio callbacks and reduces it while it plays.
+    # Above 1x libvlc time-stretches or resamples what reaches the callbacks, so every player runs at 1x
+    # and the speed comes from splitting the file into segments that play side by side, each on its own player
+    ready = Signal(object)
+    failed = Signal(str)
+
+    def __init__(self, parent=None, sampleRate=8000, samplesPerPeak=32, workers=16, minSegment=15000, cacheDir=None):
+        super(WaveformIndexer, self).__init__(parent)
+        self.sampleRate = sampleRate
+        self.samplesPerPeak = samplesPerPeak
+        self.workers = max(workers, 1)
+        self.minSegment = minSegment
+        self.cacheDir = cacheDir or os.path.join(os.path.dirname(defaultCachePath()), "waveforms")
+        self.thread = None
+        self.cancelled = threading.Event()
+        self.elapsed = 0.0
+        self.duration = 0
+
+    @staticmethod
+    def available():
+        return np is not None
+
+    def cachePath(self, path):
+        stat = os.stat(path)
+        signature = f"{os.path.normcase(path)}|{stat.st_size}|{int(stat.st_mtime)}"
+        return os.path.join(self.cacheDir, hashlib.sha1(signature.encode("utf-8")).hexdigest() + ".npz")
+
+    def start(self, mediaPath):
+        self.cancel()
+        path = MetadataCache.localPath(mediaPath) if mediaPath else None
+        if np is None or not path or not os.path.isfile(path):
+            return False
+        self.cancelled = threading.Event()
+        self.thread = threading.Thread(target=self.run, args=(path, self.cancelled), daemon=True)
+        self.thread.start()
+        return True
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def run(self, path, cancelled):
+        cachePath = self.cachePath(path)
+        pyramid = WaveformPyramid.load(cachePath)
+        if pyramid is None:
+            pyramid = self.index(path, cancelled)
+            if pyramid is None:
+                return
+            try:
+                pyramid.save(cachePath)
+            except OSError as e:
+                print("Unable to save waveform", e)
+        if not cancelled.is_set():
+            self.ready.emit(pyramid)
+
+    def index(self, path, cancelled):
+        instance = instancePool.acquire(["--no-video", "--no-spu"])
+        try:
+            begin = time.perf_counter()
+            self.duration = self.mediaDuration(instance, path)
+            # Segments of at least minSegment ms, a file of unknown length is read in one go
+            count = min(self.workers, self.duration // self.minSegment) if self.duration else 1
+            count = max(count, 1)
+            edges = [self.duration * i // count for i in range(count)] + [None]
+            results = [None] * count
+            threads = [threading.Thread(target=self._runSegment, args=(instance, path, edges[i], edges[i + 1], cancelled, results, i),
+                                        daemon=True) for i in range(count)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.elapsed = time.perf_counter() - begin
+        finally:
+            instancePool.release(instance)
+
+        if cancelled.is_set():
+            return None
+        parts = [part for part in results if part is not None and len(part[0])]
+        if not parts:
+            self.failed.emit(path)
+            return None
+        mins, maxs, squares = (np.concatenate([part[i] for part in parts]) for i in range(3))
+        return WaveformPyramid.build(self.sampleRate, self.samplesPerPeak, mins, maxs, squares)
+
+    def mediaDuration(self, instance, path):
+        cached = MetadataCache.shared().get(path, count=False)
+        if cached and cached['duration']:
+            return cached['duration']
+        media = instance.media_new(path)
+        parsed = threading.Event()
+        media.event_manager().event_attach(vlc.EventType.MediaParsedChanged, lambda event: parsed.set())
+        try:
+            media.parse_with_options(vlc.MediaParseFlag.local, 5000)
+            parsed.wait(5.5)
+            return max(media.get_duration(), 0)
+        finally:
+            media.release()
+
+    def _runSegment(self, instance, path, startMs, endMs, cancelled, results, i):
+        results[i] = self.indexSegment(instance, path, startMs, endMs, cancelled)
+
+    def indexSegment(self, instance, path, startMs, endMs, cancelled):
+        # (mins, maxs, squares) of the peaks from startMs to endMs, None when cancelled
+        block = self.samplesPerPeak
+        state = {'rest' : np.zeros(0, dtype=np.int16)}
+        mins, maxs, squares = [], [], []
+        finished = threading.Event()
+
+        @vlc.CallbackDecorators.AudioPlayCb
+        def play(opaque, samples, count, pts):
+            data = np.frombuffer((ctypes.c_int16 * count).from_address(samples), dtype=np.int16)
+            if len(state['rest']):
+                data = np.concatenate((state['rest'], data))
+            usable = len(data) // block * block
+            state['rest'] = data[usable:].copy()
+            if usable:
+                peaks = data[:usable].reshape(-1, block).astype(np.float32) / 32768
+                mins.append(peaks.min(axis=1))
+                maxs.append(peaks.max(axis=1))
+                squares.append((peaks * peaks).sum(axis=1))
+
+        def onEnd(event):
+            finished.set()
+
+        options = ["no-video", "no-spu"]
+        if startMs:
+            options.append(f"start-time={startMs / 1000:.3f}")
+        if endMs is not None:
+            options.append(f"stop-time={endMs / 1000:.3f}")
+        player = instance.media_player_new()
+        try:
+            media = instance.media_new(path, *options)
+            player.set_media(media)
+            player.audio_set_format("S16N", self.sampleRate, 1)
+            player.audio_set_callbacks(play, None, None, None, None, None)
+            events = player.event_manager()
+            events.event_attach(vlc.EventType.MediaPlayerEndReached, onEnd)
+            events.event_attach(vlc.EventType.MediaPlayerEncounteredError, onEnd)
+            player.play()
+            while not finished.wait(0.1):
+                if cancelled.is_set():
+                    return None
+        finally:
+            player.stop()
+            player.release()
+
+        empty = np.zeros(0, dtype=np.float32)
+        peaks = [np.concatenate(values) if values else empty for values in (mins, maxs, squares)]
+        if endMs is None:
+            return peaks
+        # Segments meet at their expected peak count so the ones after stay in place
+        expected = int(round((endMs - startMs) * self.sampleRate / 1000 / block))
+        return [np.pad(values[:expected], (0, max(expected - len(values), 0))) for values in peaks]
+
+    def realtimeFactor(self):
+        return self.duration / 1000 / self.elapsed if self.elapsed else 0.0
@@ -1,12 +1,12 @@
 import sys
 import os
 from datetime import datetime
-from PySide2.QtGui import QColor, QKeySequence, QPainter, QPen
-from PySide2.QtCore import Property, QAbstractAnimation, QEvent, QPoint, QPropertyAnimation, QTimer, Qt
+from PySide2.QtGui import QColor, QKeySequence, QPainter, QPen, QRegion
+from PySide2.QtCore import Property, QAbstractAnimation, QEvent, QParallelAnimationGroup, QPoint, QPropertyAnimation, QTimer, Qt
 from PySide2.QtWidgets import QAction, QFileDialog, QGraphicsOpacityEffect, QMenu, QPushButton, QSlider, QVBoxLayout, QWidget, QHBoxLayout, QApplication
-import pafy
 
 from component.ButtonIcon import ButtonIcon
+from component.IdleManager import IdleManager
 from component.TimeSlider import TimeSlider
 from component.MediaContainer import MediaContainer
 
@@ -16,14 +16,23 @@ except:
     import inspect
     fileDir = os.path.dirname(inspect.getframeinfo(inspect.currentframe()).filename)
 
+def mediaFilter():
+    # The library's extensions, sqlite3 only loads once a dialog asks for them
+    from component.MediaLibrary import MediaLibrary
+    return " ".join(f"*{ext}" for ext in MediaLibrary.extensions)
+
 class Controller(QWidget):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, deferSetup=False, embedded=False):
         super(Controller, self).__init__(parent)
 
         self.resourcePath = os.path.normpath(os.path.join(fileDir, "resource")).replace("\\", "/")
 
-        self.setWindowFlags(Qt.Window | Qt.FramelessWindowHint)
-        self.setAttribute(Qt.WA_TranslucentBackground)
+        # Embedded the Controller is a child widget drawn on the video window's surface,
+        # otherwise a translucent window kept on top of the player
+        self.embedded = embedded
+        if not embedded:
+            self.setWindowFlags(Qt.Window | Qt.FramelessWindowHint)
+            self.setAttribute(Qt.WA_TranslucentBackground)
         self.setAttribute(Qt.WA_Hover)
         self.setMouseTracking(True)
         self.setAcceptDrops(True)
@@ -38,16 +47,48 @@ class Controller(QWidget):
         self.visible = False
         self.drawDrag = False
         self.isPaused = False
-        self.lastMove = datetime.now()
         self.lastButton = Qt.MouseButton.NoButton
 
+        # With deferSetup the hidden effects, thumbnails and waveform are built once the window is up,
+        # the context menu is always built on the first right click
+        self.deferSetup = deferSetup
+        self.setupDone = False
+        self.popMenu = None
+        self.thumbnails = None
+        self.waveform = None
+        self.waveformPath = None
+
+        # Built on first use by the playlist property, a single file never needs the model or its probe
+        self._playlist = None
+        self.playlistView = None
+        self.playFrom = None
+        self.queuedPath = None
+        # Created with the first library action
+        self.scanner = None
+        self.library = None
+        # Compare or overlay window and the hidden player of the file it's opened against
+        self.compareTool = None
+        self.compareSource = None
+        self.libraryFolder = None
+
         self.setupWidget()
-        self.setupRightClick()
+        if not deferSetup:
+            self.finishSetup()
         if parent:
             self.player = parent
             self.setupSignal()
         self.toggleVisibility(False)
 
+    @property
+    def playlist(self):
+        if self._playlist is None:
+            from component.MediaProbe import MediaProbe
+            from component.PlaylistModel import PlaylistModel
+            # Probe threads only start once the playlist view shows rows without a duration
+            self._playlist = PlaylistModel(self, probe=MediaProbe(self))
+            self._playlist.rowsInserted.connect(self.onPlaylistInserted)
+        return self._playlist
+
     def setParent(self, parent):
         self.player = parent
         return super(Controller, self).setParent(parent)
@@ -98,31 +139,82 @@ class Controller(QWidget):
         self.layout().addStretch()
         self.layout().addLayout(self.bottomLayout)
 
-        self.timer = QTimer()
-        self.timer.setInterval(50)
-        self.timer.timeout.connect(self.toggleCursor)
-        self.timer.start()
+        # Hides the cursor and the controls after 5 s without input, nothing runs while idle
+        self.idle = IdleManager(self, timeout=5000)
+        self.idle.idle.connect(self.onIdle)
+
+        # While playing the playhead follows the player's clock at display rate, libvlc is not queried
+        screen = QApplication.primaryScreen()
+        refreshRate = screen.refreshRate() if screen else 60
+        self.playhead = QTimer(self)
+        self.playhead.setTimerType(Qt.PreciseTimer)
+        self.playhead.setInterval(max(int(1000 / max(refreshRate, 1)), 8))
+        self.playhead.timeout.connect(self.updatePlayhead)
 
         self.opacFX = []
-        for w in (self.pinBtn, self.closeBtn, self.playBtn, self.volumeSlider, self.volumeBtn, self.addBtn, self.repeatBtn, self.listBtn):
+        self.visibilityAnim = None
+        self.fadeWidgets = (self.pinBtn, self.closeBtn, self.playBtn, self.volumeSlider, self.volumeBtn, self.addBtn, self.repeatBtn, self.listBtn)
+        for w in self.fadeWidgets:
             w.setFocusProxy(self)
+            if self.deferSetup:
+                # Hidden until the opacity effects exist, toggleVisibility shows them again
+                w.hide()
+        self.timeSlider.setHeight(1)
+        self.timeSlider.setFocusProxy(self)
+
+    def finishSetup(self):
+        if self.setupDone:
+            return
+        self.setupDone = True
+        for w in self.fadeWidgets:
             fx = QGraphicsOpacityEffect(w)
             fx.setOpacity(0)
             w.setGraphicsEffect(fx)
             self.opacFX.append(fx)
-        self.timeSlider.setHeight(1)
-        self.timeSlider.setFocusProxy(self)
+        self.setupAnimation()
+        self.setupMediaTools()
+
+    def setupAnimation(self, duration=300):
+        # One group for every show and hide, played forward to show and backward to hide.
+        # Reversing a running group continues from where it is, like the per toggle animations did
+        self.visibilityAnim = QParallelAnimationGroup(self)
+        for fx in self.opacFX:
+            self.visibilityAnim.addAnimation(self.propertyAnimation(fx, b"opacity", 0.0, 1.0, duration))
+        for w in (self.addBtn, self.timeSlider, self.listBtn, self.repeatBtn):
+            self.visibilityAnim.addAnimation(self.propertyAnimation(w, b"Height", 1, 20, duration))
+        self.visibilityAnim.finished.connect(self.onVisibilityFinished)
+        if not self.visible:
+            for w in (self.addBtn, self.timeSlider, self.listBtn, self.repeatBtn):
+                w.setHeight(1)
+
+    def setupMediaTools(self):
+        # numpy and the thumbnail workers are only loaded here
+        from component.ThumbnailProvider import ThumbnailProvider
+        from component.Waveform import WaveformIndexer
+
+        self.thumbnails = ThumbnailProvider(self)
+        self.timeSlider.setThumbnailProvider(self.thumbnails)
+        self.waveform = WaveformIndexer(self)
+        self.waveform.ready.connect(self.timeSlider.setWaveform)
+        if hasattr(self, "player") and self.player.media:
+            self.updateMediaTools(self.timeSlider.maxTime)
 
     def setupRightClick(self):
         self.popMenu = QMenu(self)
         self.openAct = QAction('Open File', self)
+        self.folderAct = QAction('Add Folder to Library', self)
+        self.rescanAct = QAction('Rescan Library', self)
         self.fullAct = QAction('Fullscreen', self)
         self.atopAct = QAction('Pin on Top', self)
         self.listAct = QAction('Playlist', self)
+        self.shuffleAct = QAction('Shuffle', self)
+        self.compareAct = QAction('Compare With File', self)
+        self.overlayAct = QAction('Overlay With File', self)
         self.helpAct = QAction('Help', self)
         self.exitAct = QAction('Exit', self)
 
-        for act in (self.openAct, self.fullAct, self.listAct, self.helpAct):
+        for act in (self.openAct, self.folderAct, self.rescanAct, self.fullAct, self.listAct, self.shuffleAct,
+                    self.compareAct, self.overlayAct, self.helpAct):
             self.popMenu.addAction(act)
         self.popMenu.addSeparator()
         self.popMenu.addAction(self.exitAct)
@@ -130,32 +222,32 @@ class Controller(QWidget):
         # Initial 
         self.fullAct.setCheckable(True)
         self.listAct.setCheckable(True)
+        self.shuffleAct.setCheckable(True)
 
         # Temp
-        self.listAct.setDisabled(True)
         self.helpAct.setDisabled(True)
 
-    def opacityAnimation(self, end, duration, callback):
-        anims = []
-        for fx in self.opacFX:
-            ani = QPropertyAnimation(fx, b"opacity")
-            ani.setStartValue(fx.opacity())
-            ani.setEndValue(end)
-            a = max(fx.opacity(), end)
-            i = min(fx.opacity(), end)
-            ani.setDuration((a-i)*duration)
-            ani.stateChanged.connect(callback)
-            anims.append(ani)
-        return anims
-
-    def heightAnimation(self, target, height, duration, callback):
-        ani = QPropertyAnimation(target, b"Height")
-        ani.setStartValue(target.getHeight())
-        ani.setEndValue(height)
-        a = max(target.getHeight(), height)
-        i = min(target.getHeight(), height)
-        ani.setDuration((a-i)/a*duration)
-        # ani.finished.connect(callback)
+        # Both tools need NumPy
+        from component.LumaCompare import LumaCompare
+        from component.VideoOverlay import VideoOverlay
+        self.compareAct.setEnabled(LumaCompare.available())
+        self.overlayAct.setEnabled(VideoOverlay.available())
+
+        self.openAct.triggered.connect(self.openFile)
+        self.folderAct.triggered.connect(self.openFolder)
+        self.rescanAct.triggered.connect(self.rescanLibrary)
+        self.listAct.triggered.connect(self.togglePlaylist)
+        self.shuffleAct.triggered.connect(self.toggleShuffle)
+        self.compareAct.triggered.connect(lambda: self.openCompareTool(LumaCompare))
+        self.overlayAct.triggered.connect(lambda: self.openCompareTool(VideoOverlay))
+        self.fullAct.triggered.connect(self.toggleFullscreen)
+        self.exitAct.triggered.connect(self.player.close)
+
+    def propertyAnimation(self, target, name, start, end, duration):
+        ani = QPropertyAnimation(target, name, self)
+        ani.setStartValue(start)
+        ani.setEndValue(end)
+        ani.setDuration(duration)
         return ani
 
     def setupSignal(self):
@@ -164,34 +256,68 @@ class Controller(QWidget):
         self.playBtn.clicked.connect(self.togglePlay)
         self.volumeSlider.valueChanged.connect(self.player.setVolume)
         self.addBtn.clicked.connect(self.openFile)
+        self.listBtn.clicked.connect(self.togglePlaylist)
+        self.repeatBtn.clicked.connect(self.cycleRepeat)
         self.timeSlider.sliderMoved.connect(self.seek)
 
         # Player
         self.player.stateChanged.connect(self.onStateChanged)
         self.player.lengthChanged.connect(self.onLengthChanged)
         self.player.timeChanged.connect(self.onTimeChanged)
-
-        # Right click
-        self.openAct.triggered.connect(self.openFile)
-        self.fullAct.triggered.connect(self.toggleFullscreen)
-        self.exitAct.triggered.connect(self.player.close)
+        self.player.frameStepped.connect(self.timeSlider.setValue)
+        self.player.mediaChanged.connect(self.onMediaChanged)
+        self.player.playlistOpened.connect(self.openPlaylist)
 
     def event(self, event):
         if event.type() == QEvent.Type.Enter:
-            self.lastMove = datetime.now()
+            self.idle.poke()
             self.toggleVisibility(True)
         elif event.type() == QEvent.Type.Leave:
+            self.idle.stop()
             self.toggleVisibility(False)
         return super(Controller, self).event(event)
 
+    def showEvent(self, event):
+        if hasattr(self, "player") and self.player.clock.playing:
+            self.playhead.start()
+        return super(Controller, self).showEvent(event)
+
+    def hideEvent(self, event):
+        self.idle.stop()
+        self.playhead.stop()
+        return super(Controller, self).hideEvent(event)
+
+    def closeEvent(self, event):
+        self.idle.stop()
+        self.playhead.stop()
+        if self._playlist is not None:
+            self._playlist.cancelLoad()
+            self._playlist.probe.close()
+        if self.scanner:
+            self.scanner.cancel()
+        if self.compareTool:
+            # Stopped now, the hidden player is released once the window is gone
+            self.compareTool.close()
+        if self.playlistView:
+            self.playlistView.close()
+        if self.thumbnails:
+            self.thumbnails.close()
+        if self.waveform:
+            self.waveform.cancel()
+        return super(Controller, self).closeEvent(event)
+
     def paintEvent(self, event):
+        if self.embedded and not self.drawDrag:
+            # A child widget gets the mouse without the nearly transparent fill, the video underneath stays untouched
+            return
         s = self.size()
         qp = QPainter()
         qp.begin(self)
         qp.setRenderHint(QPainter.Antialiasing, True)
-        qp.setPen(self.penColor)
-        qp.setBrush(self.fillColor)
-        qp.drawRect(0, 0, s.width(), s.height())
+        if not self.embedded:
+            qp.setPen(self.penColor)
+            qp.setBrush(self.fillColor)
+            qp.drawRect(0, 0, s.width(), s.height())
 
         if self.drawDrag:
             pen = QPen(Qt.white, 5)
@@ -220,6 +346,14 @@ class Controller(QWidget):
 
         qp.end()
 
+    def dragRegion(self):
+        # What the drop indicator covers: the frame's outline and the plus sign, pen width included
+        s = self.size()
+        outer = QRegion(27, 27, s.width() - 54, s.height() - 54)
+        inner = QRegion(33, 33, s.width() - 66, s.height() - 66)
+        cross = QRegion(int(s.width()/2 - 25) - 1, int(s.height()/2 - 25) - 1, 52, 52)
+        return outer.subtracted(inner).united(cross)
+
     def mousePressEvent(self, event):
         self.lastButton = event.button()
         if event.button() == Qt.MouseButton.LeftButton:
@@ -248,14 +382,16 @@ class Controller(QWidget):
         return super(Controller, self).mouseReleaseEvent(event)
 
     def mouseMoveEvent(self, event):
-        self.lastMove = datetime.now()
+        self.idle.poke()
         self.toggleVisibility(True)
 
         if self.lastButton == Qt.MouseButton.LeftButton:
             if not self.player.isFullScreen():
                 if hasattr(self, "startPos"):
                     delta = event.pos()-self.startPos
-                    self.move(self.pos()+delta)
+                    # The embedded Controller moves with its parent, the window has to follow by hand
+                    if not self.embedded:
+                        self.move(self.pos()+delta)
                     self.player.move(self.player.pos()+delta)
         elif self.lastButton == Qt.MouseButton.MiddleButton:
             if hasattr(self, "startFrame"):
@@ -288,7 +424,7 @@ class Controller(QWidget):
 
     def dragEnterEvent(self, event):
         self.drawDrag = True
-        self.update()
+        self.update(self.dragRegion())
         if event.mimeData().hasUrls():
             event.accept()
         elif event.mimeData().hasText():
@@ -298,33 +434,31 @@ class Controller(QWidget):
     
     def dragLeaveEvent(self, event):
         self.drawDrag = False
-        self.update()
+        self.update(self.dragRegion())
         return super(Controller, self).dragLeaveEvent(event)
 
     def dropEvent(self, event):
         self.drawDrag = False
-        self.update()
+        self.update(self.dragRegion())
         if event.mimeData().hasUrls():
-            url = event.mimeData().urls()[0].toString()
-            self.player.createMedia(url)
-            self.player.play()
+            # Every dropped item goes to the playlist, the first one plays as soon as its row exists.
+            # Dropped playlists are read entry by entry while the rows load
+            from component.PlaylistParser import PlaylistParser
+            urls = event.mimeData().urls()
+            self.enqueue(PlaylistParser.expand(url.toString() for url in urls), play=True)
         elif event.mimeData().hasText():
             url =  event.mimeData().text()
             if os.path.isfile(url):
-                self.player.createMedia(url)
-                self.player.play()
+                if self.player.createMedia(url):
+                    self.player.play()
     
     def keyPressEvent(self, event):
-        self.lastMove = datetime.now()
+        self.idle.poke()
         self.toggleVisibility(True)
         if event.key() in [Qt.Key_Left, Qt.Key_A, Qt.Key_Less, Qt.Key_Comma]:
-            self.player.pause()
-            self.timeSlider.setValue(self.timeSlider.value()-1)
-            self.seek()
+            self.player.stepBackward(1)
         elif event.key() in [Qt.Key_Right, Qt.Key_D, Qt.Key_Greater, Qt.Key_Period]:
-            self.player.pause()
-            self.timeSlider.setValue(self.timeSlider.value()+1)
-            self.seek()
+            self.player.stepForward(1)
         elif event.key() in [Qt.Key_Up, Qt.Key_Plus]:
             self.volumeSlider.setValue(self.volumeSlider.value()+5)
         elif event.key() in [Qt.Key_Down, Qt.Key_Minus]:
@@ -336,7 +470,11 @@ class Controller(QWidget):
         elif event.key() in [Qt.Key_F11, Qt.Key_F]:
             self.toggleFullscreen()
         elif event.key() in [Qt.Key_Tab, Qt.Key_L]:
-            print("Open Playlist")
+            self.togglePlaylist()
+        elif event.key() in [Qt.Key_PageDown]:
+            self.playRow(self.playlist.next())
+        elif event.key() in [Qt.Key_PageUp]:
+            self.playRow(self.playlist.previous())
         elif event.key() in [Qt.Key_Slash, Qt.Key_Question]:
             print("Open Help")
         elif event.key() in [Qt.Key_Menu]:
@@ -346,6 +484,8 @@ class Controller(QWidget):
         elif QKeySequence(event.key()+int(event.modifiers())) == QKeySequence("Ctrl+V"):
             url = QApplication.clipboard().text()
             if "youtube.com" in url.lower():
+                # The YouTube resolver is only imported when a link is pasted
+                import pafy
                 video = pafy.new(url)
                 best = video.getbest()
                 playurl = best.url
@@ -353,18 +493,33 @@ class Controller(QWidget):
                     pass
             else:
                 playurl = url
-            self.player.createMedia(playurl)
-            self.player.play()
+            if self.player.createMedia(playurl):
+                self.player.play()
 
         return super(Controller, self).keyPressEvent(event)
 
     def onLengthChanged(self, length):
         self.timeSlider.setMaxTime(length)
-        self.timeSlider.setMaximum(int(length/1000*self.player.fps))
+        self.timeSlider.setFrameMapper(self.player.frameToTime if self.player.frameIndex else None)
+        self.timeSlider.setMaximum(max(self.player.frameCount(length), 1))
+        self.updateMediaTools(length)
 
-    def onTimeChanged(self, pos):
-        sliderPos = int(pos * self.timeSlider.maximum())
-        self.timeSlider.setValue(sliderPos)
+    def updateMediaTools(self, length):
+        if not self.setupDone:
+            return
+        self.thumbnails.setMedia(self.player.mediaPath, length, self.player.ratio)
+        if self.player.mediaPath != self.waveformPath and self.waveform.available():
+            self.waveformPath = self.player.mediaPath
+            self.timeSlider.setWaveform(None)
+            self.waveform.start(self.waveformPath)
+
+    def onTimeChanged(self, ms):
+        # Also called on every libvlc report, which keeps a paused playhead in place after a seek
+        if not self.timeSlider.isSliderDown():
+            self.timeSlider.setValue(self.player.timeToFrame(ms))
+
+    def updatePlayhead(self):
+        self.onTimeChanged(self.player.clock.now())
 
     def onStateChanged(self, state):
         if state == 'NothingSpecial':
@@ -375,8 +530,13 @@ class Controller(QWidget):
             return
         elif state == 'Playing':
             self.playBtn.changeIcon(f"{self.resourcePath}/pause.svg")
-        elif state == 'Paused':
+            if self.isVisible():
+                self.playhead.start()
+            return
+        self.playhead.stop()
+        if state == 'Paused':
             self.playBtn.changeIcon(f"{self.resourcePath}/play.svg")
+            self.updatePlayhead()
         elif state == 'Stopped':
             self.playBtn.changeIcon(f"{self.resourcePath}/replay.svg")
             mediaPath = self.player.media.get_mrl()
@@ -386,39 +546,119 @@ class Controller(QWidget):
             
         elif state == 'Ended':
             self.timeSlider.setValue(self.timeSlider.maximum())
+            if self.queuedPath is not None:
+                # The next item wasn't pre-rolled in time
+                self.playRow(self.playlist.next())
         elif state == 'Error':
             return
 
     def onRightClick(self, point):
+        if self.popMenu is None:
+            self.setupRightClick()
         self.fullAct.setChecked(self.player.isFullScreen())
+        self.listAct.setChecked(bool(self.playlistView and self.playlistView.isVisible()))
+        self.shuffleAct.setChecked(self._playlist is not None and self._playlist.store.shuffle)
         self.popMenu.exec_(self.mapToGlobal(point))   
 
     def openFile(self):
-        fileName, _ = QFileDialog.getOpenFileName(self, "Open Movie", fileDir, "All (*.*)")
+        from component.PlaylistParser import PlaylistParser
+        playlists = " ".join(f"*{ext}" for ext in PlaylistParser.extensions)
+        filters = f"Media and playlists ({mediaFilter()} {playlists});;Playlists ({playlists});;All (*.*)"
+        fileName, _ = QFileDialog.getOpenFileName(self, "Open Movie", fileDir, filters)
         if fileName != '':
-            self.player.createMedia(fileName)
-            self.player.play()
+            if self.player.createMedia(fileName):
+                self.player.play()
 
-    def toggleWidget(self, state):
-        if (self.sender().endValue() > 0 and state == QAbstractAnimation.State.Running) :
-            self.sender().targetObject().parent().show()
-        elif (self.sender().endValue() <= 0 and state == QAbstractAnimation.State.Stopped) :
-            self.sender().targetObject().parent().hide()
+    def openCompareTool(self, tool):
+        # The open media against a second file in a LumaCompare or VideoOverlay window. The second file plays
+        # in a hidden player from the same time, the tool's window shows both
+        if self.player.mediaPath is None:
+            return
+        fileName, _ = QFileDialog.getOpenFileName(self, "Open File to Compare", fileDir, f"Media ({mediaFilter()});;All (*.*)")
+        if fileName == '':
+            return
+        if self.compareTool:
+            self.compareTool.close()
+        seconds = max(self.player.mediaPlayer.get_time(), 0) / 1000
+        source = MediaContainer(vlcOptions=["--aout=dummy"])
+        if not source.createMedia(fileName, f"start-time={seconds:.3f}"):
+            self.closeCompareTool(source)
+            return
+        self.compareSource = source
+        self.compareTool = tool(self.player, source)
+        self.compareTool.setAttribute(Qt.WA_DeleteOnClose)
+        self.compareTool.destroyed.connect(lambda: self.closeCompareTool(source))
+        self.compareTool.resize(960, 540)
+        self.compareTool.show()
+        self.compareTool.start()
+        self.player.play()
+        self.compareSource.play()
+
+    def closeCompareTool(self, source):
+        # The tool gave the main player its window back when it stopped, the hidden player goes with it
+        if source is self.compareSource:
+            self.compareTool = None
+            self.compareSource = None
+        source.releasePlayer()
+        source.deleteLater()
+
+    def openFolder(self):
+        folder = QFileDialog.getExistingDirectory(self, "Add Folder to Library", fileDir)
+        if folder:
+            self.libraryFolder = os.path.normpath(os.path.abspath(folder))
+            self.scanLibrary([folder])
+
+    def rescanLibrary(self):
+        self.scanLibrary(None)
+
+    def scanLibrary(self, roots):
+        # The walk and the database writes run on the scanner's thread, the probes in its process pool
+        if self.scanner is None:
+            from component.LibraryScanner import LibraryScanner
+            self.scanner = LibraryScanner(self)
+            self.scanner.walked.connect(self.onLibraryWalked)
+            self.scanner.finished.connect(self.onLibraryScanned)
+        if not self.scanner.scan(roots):
+            print("Library scan already running")
+
+    def onLibraryWalked(self, root):
+        # An added folder is queued as soon as its files are indexed
+        if root != self.libraryFolder:
+            return
+        self.libraryFolder = None
+        if self.library is None:
+            from component.MediaLibrary import MediaLibrary
+            self.library = MediaLibrary()
+        self.enqueue(self.library.paths(root), play=self.player.media is None)
+
+    def onLibraryScanned(self, stats):
+        print(f"Library: {stats['files']} files scanned ({stats['filesPerSecond']:.0f}/s), "
+              f"{stats['changed']} new or changed, {stats['removed']} removed, {stats['probed']} probed")
+
+    def onVisibilityFinished(self):
+        # Faded out widgets are hidden so they don't take clicks
+        if not self.visible:
+            for w in self.fadeWidgets:
+                w.hide()
 
     def toggleVisibility(self, visible=True):
         if self.visible == visible:
             return
+        self.finishSetup()
         self.visible = visible
         if visible:
             self.setCursor(Qt.ArrowCursor)
-            
-        self.move(self.player.pos().x()+self.player.gripSize, self.player.pos().y()+self.player.gripSize)
-        self.resize(self.player.width()-(self.player.gripSize*2), self.player.height()-(self.player.gripSize*2))
+            for w in self.fadeWidgets:
+                w.show()
+
+        # Drags and grip resizes already keep the overlay on the player, this only catches moves made elsewhere
+        geometry = self.player.controllerGeometry()
+        if self.geometry() != geometry:
+            self.setGeometry(geometry)
 
-        self.anims = self.opacityAnimation(1 if visible else 0, 300, self.toggleWidget)
-        self.anims += [self.heightAnimation(w, 20 if visible else 1, 300, self.toggleWidget) for w in (self.addBtn, self.timeSlider, self.listBtn, self.repeatBtn)]
-        for a in self.anims:
-            a.start()
+        self.visibilityAnim.setDirection(QAbstractAnimation.Forward if visible else QAbstractAnimation.Backward)
+        if self.visibilityAnim.state() != QAbstractAnimation.Running:
+            self.visibilityAnim.start()
 
         self.timeSlider.setTipVisibility(visible)
 
@@ -426,15 +666,13 @@ class Controller(QWidget):
         # self.onTop = not self.onTop
         self.player.onTop(not self.player.isOnTop())
         self.player.update()
-        self.setWindowFlag(Qt.WindowStaysOnBottomHint, not self.player.isOnTop()) 
+        if not self.embedded:
+            self.setWindowFlag(Qt.WindowStaysOnBottomHint, not self.player.isOnTop()) 
         self.player.update()
 
-    def toggleCursor(self):
-        if (datetime.now() - self.lastMove).seconds >= 5 :
-            self.setCursor(Qt.BlankCursor)
-            self.toggleVisibility(False)
-        else:
-            self.setCursor(Qt.ArrowCursor)
+    def onIdle(self):
+        self.setCursor(Qt.BlankCursor)
+        self.toggleVisibility(False)
 
     def toggleFullscreen(self):
         if self.player.isFullScreen():
@@ -453,16 +691,98 @@ class Controller(QWidget):
             self.player.play()
 
     def seek(self):
-        self.player.setPosition(self.timeSlider.value()/self.timeSlider.maximum())
+        self.player.setFrame(self.timeSlider.value())
+
+    def enqueue(self, paths, play=False):
+        # Rows are only known once the model has read them, a row still loading can't be played yet
+        if play and not self.playlist.isLoading():
+            self.playFrom = self.playlist.rowCount()
+        self.playlist.extend(paths)
+
+    def openPlaylist(self, mediaPath):
+        from component.PlaylistParser import PlaylistParser
+        self.enqueue(PlaylistParser.parse(mediaPath), play=True)
+
+    def onPlaylistInserted(self, parent, first, last):
+        if self.playFrom is not None and first <= self.playFrom <= last:
+            row, self.playFrom = self.playFrom, None
+            self.playRow(row)
+
+    def playRow(self, row):
+        if row < 0:
+            return
+        self.playlist.setCurrent(row)
+        self.queuedPath = None
+        if self.player.createMedia(self.playlist.path(row)):
+            self.player.play()
+
+    def onMediaChanged(self, mediaPath):
+        # The player moved on to the queued item by itself, the playlist follows and the next one is queued
+        if self.queuedPath is not None and mediaPath == self.queuedPath:
+            self.playlist.next()
+        self.queueFollowing()
+
+    def queueFollowing(self):
+        # Hands the next item to the player for gapless playback, nothing changes while the playlist isn't in use.
+        # It isn't when the open media didn't come from the current row, e.g. a file opened or pasted directly
+        self.queuedPath = None
+        if self._playlist is None:
+            return
+        current = self.playlist.current()
+        if current < 0 or self.playlist.path(current) != self.player.mediaPath:
+            return
+        row = self.playlist.peekNext()
+        if row < 0:
+            self.player.cancelNext()
+            return
+        self.queuedPath = self.playlist.path(row)
+        self.player.queueNext(self.queuedPath)
+
+    def togglePlaylist(self):
+        if self.playlistView is None:
+            from component.PlaylistView import PlaylistView
+            self.playlistView = PlaylistView(self.playlist)
+            self.playlistView.rowActivated.connect(self.playRow)
+        if self.playlistView.isVisible():
+            self.playlistView.hide()
+            return
+        geometry = self.player.geometry()
+        self.playlistView.setGeometry(geometry.right() + 1, geometry.top(), 320, geometry.height())
+        self.playlistView.show()
+        if self.playlist.current() >= 0:
+            self.playlistView.scrollTo(self.playlist.index(self.playlist.current()))
+
+    def cycleRepeat(self):
+        modes = self.playlist.store.repeatModes
+        mode = modes[(modes.index(self.playlist.store.repeat) + 1) % len(modes)]
+        self.playlist.setRepeat(mode)
+        self.repeatBtn.setToolTip(f"Repeat {mode}")
+        self.queueFollowing()
+
+    def toggleShuffle(self, shuffle):
+        self.playlist.setShuffle(shuffle)
+        self.queueFollowing()
 
     def slide(self, pos):
         self.player.setPosition(pos)
 
+def launch(mediaPath=None, deferSetup=True, setupDelay=1000, vlcOptions=(), singleWindow=False):
+    # Window first, then the file from the command line, everything the first frame doesn't need comes after
+    main = MediaContainer(vlcOptions=vlcOptions, singleWindow=singleWindow)
+    controller = Controller(main, deferSetup=deferSetup, embedded=main.singleWindow)
+    main.setController(controller)
+    main.resize(500, 500)
+    main.show()
+    if mediaPath:
+        if main.createMedia(mediaPath):
+            main.play()
+    if deferSetup:
+        QTimer.singleShot(setupDelay, controller.finishSetup)
+    return main
+
 if __name__ == '__main__':
     import sys
     app = QApplication(sys.argv)
-    main = MediaContainer()
-    main.setController(Controller(main))
-    main.resize(500, 500)
-    main.show()
+    args = [arg for arg in sys.argv[1:] if arg != "--single-window"]
+    main = launch(args[0] if args else None, singleWindow="--single-window" in sys.argv)
     sys.exit(app.exec_())
\ No newline at end of file
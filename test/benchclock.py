@@ -0,0 +1,95 @@
+# Playhead accuracy of PlaybackClock against showing the last libvlc report, without libvlc.
+# Time reports are simulated in real time with libvlc's coarse interval, jitter and delivery latency,
+# the playhead is sampled at display rate and compared with the true media time.
+#   python test/benchclock.py [--seconds 5] [--interval 250] [--jitter 40] [--latency 30] [--rate 1.0] [--fps 60] [--json]
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+rootDir = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, rootDir)
+
+from component.PlaybackClock import PlaybackClock
+
+def summary(errors, backwards):
+    ordered = sorted(abs(e) for e in errors)
+    return {
+        'meanErrorMs' : sum(ordered) / len(ordered),
+        'p95ErrorMs' : ordered[int(0.95 * (len(ordered) - 1))],
+        'maxErrorMs' : ordered[-1],
+        'backwardSteps' : backwards
+    }
+
+def run(args):
+    rng = random.Random(1)
+    clock = PlaybackClock()
+    clock.setLength(int((args.seconds + 10) * 1000))
+    clock.setRate(args.rate)
+    clock.setPlaying(True)
+
+    start = time.monotonic()
+    def mediaTime(t):
+        return (t - start) * 1000 * args.rate
+
+    # Each report carries the media time when it was taken and arrives after the latency
+    pending = []
+    nextReport = start
+    lastReport = 0.0
+    frame = 1 / args.fps
+    errors = {'report' : [], 'clock' : []}
+    backwards = {'report' : 0, 'clock' : 0}
+    previous = {'report' : 0.0, 'clock' : 0.0}
+    while True:
+        now = time.monotonic()
+        if now - start >= args.seconds:
+            break
+        if now >= nextReport:
+            pending.append((now + max(rng.gauss(args.latency, args.latency / 3), 0) / 1000, mediaTime(now)))
+            nextReport = now + max(args.interval + rng.uniform(-args.jitter, args.jitter), 1) / 1000
+        while pending and pending[0][0] <= now:
+            lastReport = pending.pop(0)[1]
+            clock.report(lastReport)
+
+        truth = mediaTime(now)
+        for name, shown in (('report', lastReport), ('clock', clock.now())):
+            errors[name].append(shown - truth)
+            if shown < previous[name]:
+                backwards[name] += 1
+            previous[name] = shown
+        time.sleep(max(frame - (time.monotonic() - now), 0))
+
+    result = {name : summary(errors[name], backwards[name]) for name in errors}
+    result['clock'].update(clock.stats())
+
+    calls = 100000
+    begin = time.perf_counter_ns()
+    for _ in range(calls):
+        clock.now()
+    result['clock']['nowUs'] = (time.perf_counter_ns() - begin) / calls / 1000
+    return result
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--interval", type=float, default=250, help="ms between libvlc time reports")
+    parser.add_argument("--jitter", type=float, default=40, help="ms of uniform jitter on the report interval")
+    parser.add_argument("--latency", type=float, default=30, help="ms from the report to the GUI thread")
+    parser.add_argument("--rate", type=float, default=1.0)
+    parser.add_argument("--fps", type=float, default=60, help="display refresh rate the playhead is sampled at")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    result = run(args)
+    if args.json:
+        print(json.dumps(result, indent=4))
+        return
+    for name in ('report', 'clock'):
+        r = result[name]
+        print(f"{name:>7}: mean {r['meanErrorMs']:7.1f} ms, p95 {r['p95ErrorMs']:7.1f} ms, max {r['maxErrorMs']:7.1f} ms, {r['backwardSteps']} backward steps")
+    print(f"PlaybackClock.now(): {result['clock']['nowUs']:.2f} us per call, {result['clock']['resyncs']} resyncs out of {result['clock']['reports']} reports")
+
+if __name__ == '__main__':
+    main()
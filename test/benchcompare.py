@@ -0,0 +1,80 @@
+# Luminance compare throughput, runs the comparator on synthetic luma planes (one core, no decoding) and optionally
+# on two real files through libvlc to report the end to end compared frames per second.
+#   python test/benchcompare.py [--size 1920x1080] [--frames 300] [--left a.mp4 --right b.mp4 --seconds 10] [--json]
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+rootDir = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, rootDir)
+
+from component.LumaCompare import LumaComparator
+
+def synthetic(width, height, frames):
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 256, (height, width), dtype=np.uint8)
+    noisy = base.copy()
+    noisy[::3] = np.clip(noisy[::3].astype(np.int16) + rng.integers(-8, 9, noisy[::3].shape), 0, 255)
+    comparator = LumaComparator()
+    comparator.compare(base, noisy)
+
+    begin = time.perf_counter()
+    for i in range(frames):
+        metrics, _ = comparator.compare(base, noisy)
+    elapsed = time.perf_counter() - begin
+    return {'size' : f"{width}x{height}", 'frames' : frames, 'fps' : frames / elapsed,
+            'msPerFrame' : elapsed * 1000 / frames, 'psnr' : metrics['psnr']}
+
+def media(left, right, seconds):
+    from PySide2.QtCore import QTimer
+    from PySide2.QtWidgets import QApplication
+    from component.LumaCompare import LumaCompare
+    from component.MediaContainer import MediaContainer
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    containers = [MediaContainer(vlcOptions=["--aout=dummy"]) for i in range(2)]
+    for container, path in zip(containers, (left, right)):
+        container.createMedia(path)
+    compare = LumaCompare(*containers)
+    compare.start()
+    for container in containers:
+        container.play()
+
+    begin = time.perf_counter()
+    QTimer.singleShot(int(seconds * 1000), app.quit)
+    app.exec_()
+    elapsed = time.perf_counter() - begin
+    result = {'left' : left, 'right' : right, 'compared' : compare.frames, 'fps' : compare.frames / elapsed,
+              'tapStats' : [tap.stats() for tap in compare.taps], 'metrics' : compare.metrics}
+    compare.stop()
+    for container in containers:
+        container.releasePlayer()
+    return result
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", default="1920x1080")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--left")
+    parser.add_argument("--right")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    result = {'synthetic' : synthetic(width, height, args.frames)}
+    if args.left and args.right:
+        result['media'] = media(args.left, args.right, args.seconds)
+
+    if args.json:
+        print(json.dumps(result, indent=4, default=float))
+    else:
+        r = result['synthetic']
+        print(f"synthetic {r['size']}: {r['fps']:.1f} fps ({r['msPerFrame']:.2f} ms per frame), PSNR {r['psnr']:.2f} dB")
+        if 'media' in result:
+            r = result['media']
+            print(f"media: {r['compared']} frames compared, {r['fps']:.1f} fps, taps {r['tapStats']}")
@@ -0,0 +1,115 @@
+# Headless decode throughput, plays files on a libvlc player with dummy outputs and reports decode fps,
+# dropped and late pictures, CPU time and peak RSS. Every configuration runs in a fresh process.
+#   python test/benchdecode.py [--media sample.mp4 ...] [--mode fast|realtime] [--threads 0 1 4] [--caching 300 1000] [--json]
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+rootDir = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, rootDir)
+
+from memory import peakRss
+
+def decode(media, threads, caching, rate, timeout):
+    import vlc
+
+    # The same player setup as MediaContainer, without a window and with the outputs discarded
+    instance = vlc.Instance(["--vout=dummy", "--aout=dummy", "--no-spu"])
+    player = instance.media_player_new()
+    options = [f"avcodec-threads={threads}", f"file-caching={caching}"]
+    item = instance.media_new(media, *options)
+    player.set_media(item)
+
+    finished = threading.Event()
+    def onEnd(event):
+        finished.set()
+    events = player.event_manager()
+    events.event_attach(vlc.EventType.MediaPlayerEndReached, onEnd)
+    events.event_attach(vlc.EventType.MediaPlayerEncounteredError, onEnd)
+
+    stats = vlc.MediaStats()
+    last = None
+    cpuStart = time.process_time()
+    start = time.perf_counter()
+    player.play()
+    if rate != 1:
+        player.set_rate(rate)
+    # Stats are sampled while playing, they may be gone once the input is closed
+    while not finished.wait(0.1):
+        if item.get_stats(stats):
+            last = (stats.decoded_video, stats.displayed_pictures, stats.lost_pictures, getattr(stats, "late_pictures", 0))
+        if time.perf_counter() - start > timeout:
+            break
+    if item.get_stats(stats):
+        last = (stats.decoded_video, stats.displayed_pictures, stats.lost_pictures, getattr(stats, "late_pictures", 0))
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - cpuStart
+    duration = item.get_duration()
+
+    player.stop()
+    player.release()
+    instance.release()
+
+    decoded, displayed, lost, late = last or (0, 0, 0, 0)
+    return {
+        'media' : media,
+        'threads' : threads,
+        'caching' : caching,
+        'rate' : rate,
+        'completed' : finished.is_set(),
+        'durationMs' : duration,
+        'wallSeconds' : elapsed,
+        'realtimeFactor' : duration / 1000 / elapsed if elapsed else 0.0,
+        'decoded' : decoded,
+        'displayed' : displayed,
+        'dropped' : lost,
+        'late' : late,
+        'decodeFps' : decoded / elapsed if elapsed else 0.0,
+        'cpuSeconds' : cpu,
+        'cpuPercent' : cpu * 100 / elapsed if elapsed else 0.0,
+        'peakRssMb' : peakRss()
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--media", nargs="+", default=[os.path.join(rootDir, "sample.mp4")])
+    parser.add_argument("--mode", choices=("fast", "realtime"), default="fast")
+    parser.add_argument("--rate", type=float, default=32, help="playback rate used by the fast mode")
+    parser.add_argument("--threads", type=int, nargs="+", default=[0], help="avcodec-threads, 0 lets libavcodec decide")
+    parser.add_argument("--caching", type=int, nargs="+", default=[300], help="file-caching in ms")
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--child", nargs=4, metavar=("MEDIA", "THREADS", "CACHING", "RATE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        media, threads, caching, rate = args.child
+        print(json.dumps(decode(media, int(threads), int(caching), float(rate), args.timeout)))
+        return
+
+    rate = args.rate if args.mode == "fast" else 1
+    results = []
+    for media in args.media:
+        media = os.path.abspath(media)
+        for threads in args.threads:
+            for caching in args.caching:
+                command = [sys.executable, __file__, "--timeout", str(args.timeout), "--child", media, str(threads), str(caching), str(rate)]
+                out = subprocess.check_output(command)
+                results.append(json.loads(out.decode().strip().splitlines()[-1]))
+
+    if args.json:
+        print(json.dumps(results, indent=4))
+        return
+    print(f"{'media':>20} {'threads':>7} {'caching':>7} {'fps':>8} {'x rt':>6} {'dropped':>7} {'late':>5} {'cpu s':>7} {'cpu %':>6} {'rss MB':>7}")
+    for r in results:
+        name = os.path.basename(r['media'])[-20:]
+        print(f"{name:>20} {r['threads']:>7} {r['caching']:>7} {r['decodeFps']:>8.1f} {r['realtimeFactor']:>6.2f} "
+              f"{r['dropped']:>7} {r['late']:>5} {r['cpuSeconds']:>7.2f} {r['cpuPercent']:>6.1f} {r['peakRssMb']:>7.1f}"
+              + ("" if r['completed'] else "  (timed out)"))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+# Idle detection wakeups, the old 50 ms polling QTimer against IdleManager over the same input pattern.
+# A burst of simulated mouse moves is followed by a long idle stretch, the wakeups of each are counted.
+#   python test/benchidle.py [--active 2] [--idle 8] [--rate 100] [--timeout 5000] [--json]
+import argparse
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+rootDir = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, rootDir)
+
+from PySide2.QtCore import QTimer
+from PySide2.QtWidgets import QApplication
+
+from component.IdleManager import IdleManager
+
+class PollingIdle(object):
+    # What Controller did before, a 50 ms timer comparing the time of the last move
+    def __init__(self, timeout):
+        self.timeout = timeout / 1000
+        self.lastMove = time.monotonic()
+        self.wakeups = 0
+        self.idleAt = None
+        self.timer = QTimer()
+        self.timer.setInterval(50)
+        self.timer.timeout.connect(self.tick)
+        self.timer.start()
+
+    def poke(self):
+        self.lastMove = time.monotonic()
+
+    def tick(self):
+        self.wakeups += 1
+        if time.monotonic() - self.lastMove >= self.timeout and self.idleAt is None:
+            self.idleAt = time.monotonic()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--active", type=float, default=2, help="seconds of simulated mouse movement")
+    parser.add_argument("--idle", type=float, default=8, help="seconds without input afterwards")
+    parser.add_argument("--rate", type=float, default=100, help="simulated mouse moves per second")
+    parser.add_argument("--timeout", type=int, default=5000)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    polling = PollingIdle(args.timeout)
+    manager = IdleManager(timeout=args.timeout)
+    idleAt = {}
+    manager.idle.connect(lambda: idleAt.setdefault('manager', time.monotonic()))
+
+    start = time.monotonic()
+    moves = QTimer()
+    moves.setInterval(int(1000 / args.rate))
+    def move():
+        if time.monotonic() - start >= args.active:
+            moves.stop()
+            idleAt['input'] = time.monotonic()
+            return
+        polling.poke()
+        manager.poke()
+    moves.timeout.connect(move)
+    moves.start()
+    QTimer.singleShot(int((args.active + args.idle) * 1000), app.quit)
+    app.exec_()
+    elapsed = time.monotonic() - start
+
+    result = {'seconds' : elapsed}
+    for name, wakeups, at in (("polling", polling.wakeups, polling.idleAt), ("idleManager", manager.wakeups, idleAt.get('manager'))):
+        result[name] = {
+            'wakeups' : wakeups,
+            'wakeupsPerSecond' : wakeups / elapsed,
+            'idleDetectedAfterMs' : (at - idleAt['input']) * 1000 if at and 'input' in idleAt else None
+        }
+    if args.json:
+        print(json.dumps(result, indent=4))
+        return
+    for name in ("polling", "idleManager"):
+        r = result[name]
+        detected = f"{r['idleDetectedAfterMs']:.0f} ms" if r['idleDetectedAfterMs'] is not None else "never"
+        print(f"{name:>12}: {r['wakeups']:5} wakeups, {r['wakeupsPerSecond']:6.2f}/s, idle detected {detected} after the last input")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+# Spawn time and memory of N headless players, each with its own libvlc Instance or sharing one from the pool.
+# Every configuration runs in a fresh process so the RSS numbers don't leak into each other.
+#   python test/benchinstances.py [--counts 1 4 16] [--json]
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+rootDir = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, rootDir)
+
+from memory import peakRss
+
+def spawn(count, shared, media):
+    import vlc
+    from component.InstancePool import InstancePool
+
+    pool = InstancePool(vlc.Instance)
+    options = ["--vout=dummy", "--aout=dummy"]
+    start = time.perf_counter()
+    players = []
+    for i in range(count):
+        instance = pool.acquire(options) if shared else vlc.Instance(options)
+        player = instance.media_player_new()
+        if media:
+            player.set_media(instance.media_new(media))
+        players.append((instance, player))
+    spawnTime = (time.perf_counter() - start) * 1000
+
+    result = {
+        'players' : count,
+        'mode' : "shared" if shared else "separate",
+        'instances' : len(pool.instances) if shared else count,
+        'spawnMs' : spawnTime,
+        'rssMb' : peakRss()
+    }
+    for instance, player in players:
+        player.release()
+        if shared:
+            pool.release(instance)
+        else:
+            instance.release()
+    return result
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--counts", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--media", default=os.path.join(rootDir, "sample.mp4"))
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--child", nargs=2, metavar=("COUNT", "MODE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(spawn(int(args.child[0]), args.child[1] == "shared", args.media)))
+        return
+
+    results = []
+    for count in args.counts:
+        for mode in ("separate", "shared"):
+            out = subprocess.check_output([sys.executable, __file__, "--media", args.media, "--child", str(count), mode])
+            results.append(json.loads(out.decode().strip().splitlines()[-1]))
+
+    if args.json:
+        print(json.dumps(results, indent=4))
+        return
+    print(f"{'players':>8} {'mode':>9} {'instances':>10} {'spawn ms':>10} {'rss MB':>8}")
+    for r in results:
+        print(f"{r['players']:>8} {r['mode']:>9} {r['instances']:>10} {r['spawnMs']:>10.1f} {r['rssMb']:>8.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+# Library scan speed on a synthetic tree of empty media files, or on a real folder with --root.
+# Runs a first scan, a rescan with nothing changed and a rescan after touching and deleting a share of the files.
+# Probing needs libvlc and real media, it is off unless --probe is given.
+#   python test/benchlibrary.py [--files 100000] [--per-folder 200] [--change 0.01] [--root D:/footage] [--probe] [--json]
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+rootDir = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, rootDir)
+
+from component.LibraryScanner import LibraryScanner
+from component.MediaLibrary import MediaLibrary
+
+def makeTree(folder, files, perFolder):
+    for i in range(files):
+        sub = os.path.join(folder, f"{2000 + i // perFolder % 25}", f"reel_{i // perFolder:05d}")
+        if i % perFolder == 0:
+            os.makedirs(sub, exist_ok=True)
+        open(os.path.join(sub, f"clip_{i:07d}.mp4"), "wb").close()
+
+def changeTree(folder, share):
+    # Every 1/share file is rewritten, every other one of those is deleted
+    step = max(int(1 / share), 1) if share else 0
+    touched = deleted = 0
+    if not step:
+        return touched, deleted
+    i = 0
+    for path, dirs, names in os.walk(folder):
+        for name in names:
+            i += 1
+            if i % step:
+                continue
+            if i // step % 2:
+                with open(os.path.join(path, name), "wb") as f:
+                    f.write(b"changed")
+                touched += 1
+            else:
+                os.remove(os.path.join(path, name))
+                deleted += 1
+    return touched, deleted
+
+def run(scanner, roots):
+    begin = time.perf_counter()
+    scanner.scan(roots)
+    scanner.wait()
+    stats = scanner.stats()
+    stats['seconds'] = time.perf_counter() - begin
+    return stats
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=100000)
+    parser.add_argument("--per-folder", type=int, default=200)
+    parser.add_argument("--change", type=float, default=0.01)
+    parser.add_argument("--root", help="scan this folder instead of a synthetic tree, it is not modified")
+    parser.add_argument("--probe", action="store_true")
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    work = tempfile.mkdtemp(prefix="benchlibrary")
+    try:
+        root = args.root
+        if not root:
+            root = os.path.join(work, "footage")
+            makeTree(root, args.files, args.per_folder)
+        databasePath = os.path.join(work, "library.sqlite3")
+        scanner = LibraryScanner(libraryPath=databasePath, workers=args.workers or None, probe=args.probe)
+
+        result = {'first' : run(scanner, [root]), 'unchanged' : run(scanner, [root])}
+        if not args.root:
+            touched, deleted = changeTree(root, args.change)
+            result['changed'] = run(scanner, [root])
+            result['changed'].update({'touched' : touched, 'deleted' : deleted})
+        library = MediaLibrary(databasePath)
+        result['library'] = library.stats()
+        result['databaseBytes'] = sum(os.path.getsize(os.path.join(work, name)) for name in os.listdir(work)
+                                      if name.startswith("library.sqlite3"))
+        library.close()
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps(result, indent=4))
+        sys.exit()
+    for name in ('first', 'unchanged', 'changed'):
+        if name not in result:
+            continue
+        stats = result[name]
+        line = (f"{name:9} {stats['files']:8d} files in {stats['folders']:5d} folders, walk {stats['walkTime']*1000:7.0f} ms "
+                f"({stats['filesPerSecond']:8.0f} files/s), {stats['changed']} new or changed, {stats['removed']} removed")
+        if stats['skipped'] or stats['errors']:
+            line += f", {stats['skipped']} skipped, {stats['errors']} errors"
+        if args.probe:
+            line += f", {stats['probed']} probed ({stats['probesPerSecond']:.1f}/s), {stats['failed']} failed"
+            if stats['unavailable']:
+                line += ", libvlc unavailable"
+        print(line)
+    print(f"library: {result['library']['files']} files, database {result['databaseBytes']/1e6:.1f} MB")
@@ -0,0 +1,87 @@
+# Overlay blending throughput, blends synthetic RV32 frames for every mode on one core and checks the 30 fps target,
+# optionally plays two real files through the overlay to report the end to end blended frames per second.
+#   python test/benchoverlay.py [--size 1920x1080] [--frames 300] [--target 30] [--base a.mp4 --top b.mp4 --seconds 10] [--json]
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+rootDir = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, rootDir)
+
+from component.VideoOverlay import OverlayBlender
+
+def synthetic(width, height, frames):
+    rng = np.random.default_rng(0)
+    top = rng.integers(0, 256, (height, width, 4), dtype=np.uint8)
+    bottom = rng.integers(0, 256, (height, width, 4), dtype=np.uint8)
+    blender = OverlayBlender()
+    blender.setOpacity(0.4)
+    results = {}
+    for mode in blender.modes:
+        blender.setMode(mode)
+        blender.blend(top, bottom)
+        begin = time.perf_counter()
+        for i in range(frames):
+            blender.blend(top, bottom)
+        elapsed = time.perf_counter() - begin
+        results[mode] = {'fps' : frames / elapsed, 'msPerFrame' : elapsed * 1000 / frames}
+    return results
+
+def media(base, top, seconds):
+    from PySide2.QtCore import QTimer
+    from PySide2.QtWidgets import QApplication
+    from component.MediaContainer import MediaContainer
+    from component.VideoOverlay import VideoOverlay
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    containers = [MediaContainer(vlcOptions=["--aout=dummy"]) for i in range(2)]
+    for container, path in zip(containers, (base, top)):
+        container.createMedia(path)
+    overlay = VideoOverlay(*containers)
+    overlay.resize(960, 540)
+    overlay.show()
+    overlay.start()
+    overlay.play()
+
+    begin = time.perf_counter()
+    QTimer.singleShot(int(seconds * 1000), app.quit)
+    app.exec_()
+    elapsed = time.perf_counter() - begin
+    result = {'base' : base, 'top' : top, 'blended' : overlay.frames, 'fps' : overlay.frames / elapsed,
+              'driftMs' : overlay.drift, 'tapStats' : [tap.stats() for tap in overlay.taps]}
+    overlay.close()
+    for container in containers:
+        container.releasePlayer()
+    return result
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", default="1920x1080")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--target", type=float, default=30)
+    parser.add_argument("--base")
+    parser.add_argument("--top")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    result = {'size' : f"{width}x{height}", 'target' : args.target, 'synthetic' : synthetic(width, height, args.frames)}
+    result['passed'] = all(r['fps'] >= args.target for r in result['synthetic'].values())
+    if args.base and args.top:
+        result['media'] = media(args.base, args.top, args.seconds)
+
+    if args.json:
+        print(json.dumps(result, indent=4))
+    else:
+        for mode, r in result['synthetic'].items():
+            print(f"{mode:>10} {result['size']}: {r['fps']:7.1f} fps ({r['msPerFrame']:.2f} ms per frame)")
+        print("target", args.target, "fps", "passed" if result['passed'] else "FAILED")
+        if 'media' in result:
+            r = result['media']
+            print(f"media: {r['blended']} frames blended, {r['fps']:.1f} fps, drift {r['driftMs']} ms")
+    sys.exit(0 if result['passed'] else 1)
@@ -0,0 +1,143 @@
+# Playlist load and scroll with a large synthetic list on Qt's offscreen platform.
+# Load: entries are streamed from a generator into PlaylistModel, the longest event loop stall is measured with a 1 ms heartbeat.
+# Scroll: the PlaylistView is scrolled through the whole list, the rows that would be probed are counted.
+#   python test/benchplaylist.py [--entries 100000] [--scroll-steps 300] [--budget 8] [--json]
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+rootDir = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, rootDir)
+
+from PySide2.QtCore import QTimer
+from PySide2.QtWidgets import QApplication
+
+from component.PlaylistModel import PlaylistModel
+from component.PlaylistView import PlaylistView
+
+def paths(count):
+    for i in range(count):
+        yield f"/mnt/footage/{2000 + i % 25}/reel_{i // 1000:03d}/clip_{i:07d}.mp4"
+
+def checkOrder(size=7, steps=200):
+    # The row peekNext reports is the one next moves to, across the reshuffle of every wrap and in every mode
+    from component.PlaylistStore import PlaylistStore
+    mismatches = 0
+    for shuffle in (False, True):
+        for mode in PlaylistStore.repeatModes:
+            store = PlaylistStore(seed=1)
+            store.extend(f"/clip_{i}.mp4" for i in range(size))
+            store.setShuffle(shuffle)
+            store.setRepeat(mode)
+            store.setCurrent(0)
+            for i in range(steps):
+                peeked = store.peekNext()
+                if store.next() != peeked:
+                    mismatches += 1
+    return mismatches
+
+def percentile(ordered, p):
+    return ordered[min(int(round(p / 100 * (len(ordered) - 1))), len(ordered) - 1)] if ordered else 0.0
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=100000)
+    parser.add_argument("--scroll-steps", type=int, default=300)
+    parser.add_argument("--budget", type=float, default=8, help="ms of loading per event loop turn")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    model = PlaylistModel(sliceBudget=args.budget)
+    # Rows the view asks a duration for, this is where MediaProbe would be called
+    requested = set()
+    model.requestProbe = requested.add
+    view = PlaylistView(model)
+    view.resize(320, 720)
+    view.show()
+    app.processEvents()
+
+    # Load
+    gaps = []
+    last = [time.perf_counter()]
+    def beat():
+        now = time.perf_counter()
+        gaps.append((now - last[0]) * 1000)
+        last[0] = now
+    heartbeat = QTimer()
+    heartbeat.setInterval(1)
+    heartbeat.timeout.connect(beat)
+    heartbeat.start()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    model.extend(paths(args.entries))
+    while model.isLoading():
+        app.processEvents()
+    loadSeconds = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    heartbeat.stop()
+    ordered = sorted(gaps)
+    load = {
+        'entries' : model.rowCount(),
+        'seconds' : loadSeconds,
+        'entriesPerSecond' : model.rowCount() / loadSeconds,
+        'maxStallMs' : ordered[-1] if ordered else 0.0,
+        'p99StallMs' : percentile(ordered, 99),
+        'storeBytes' : model.store.memoryUsage(),
+        'pythonBytes' : memory,
+        'rowsRequestedWhileLoading' : len(requested)
+    }
+
+    # Scroll
+    requested.clear()
+    bar = view.verticalScrollBar()
+    times = []
+    for i in range(args.scroll_steps + 1):
+        begin = time.perf_counter()
+        bar.setValue(int(bar.maximum() * i / args.scroll_steps))
+        view.viewport().repaint()
+        app.processEvents()
+        times.append((time.perf_counter() - begin) * 1000)
+    ordered = sorted(times)
+    scroll = {
+        'steps' : len(times),
+        'meanMs' : sum(times) / len(times),
+        'p95Ms' : percentile(ordered, 95),
+        'maxMs' : ordered[-1],
+        'rowsRequested' : len(requested)
+    }
+
+    # Play order
+    calls = 100000
+    model.setShuffle(True)
+    model.setRepeat("all")
+    begin = time.perf_counter()
+    for i in range(calls):
+        model.store.next()
+    nextUs = (time.perf_counter() - begin) / calls * 1e6
+
+    mismatches = checkOrder()
+    result = {'load' : load, 'scroll' : scroll, 'shuffledNextUs' : nextUs, 'peekMismatches' : mismatches}
+    if args.json:
+        print(json.dumps(result, indent=4))
+        sys.exit(1 if mismatches else 0)
+    print(f"load: {load['entries']} entries in {load['seconds']*1000:.0f} ms ({load['entriesPerSecond']:.0f}/s), "
+          f"longest stall {load['maxStallMs']:.1f} ms, p99 {load['p99StallMs']:.1f} ms")
+    print(f"      store {load['storeBytes']/1e6:.1f} MB, Python heap {load['pythonBytes']/1e6:.1f} MB, "
+          f"{load['rowsRequestedWhileLoading']} rows probed while loading")
+    print(f"scroll: {scroll['steps']} steps, mean {scroll['meanMs']:.2f} ms, p95 {scroll['p95Ms']:.2f} ms, "
+          f"max {scroll['maxMs']:.2f} ms, {scroll['rowsRequested']} rows probed")
+    print(f"shuffled next: {nextUs:.2f} us")
+    if mismatches:
+        print(f"FAIL: peekNext and next disagreed {mismatches} times")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+# Playlist parse throughput on synthetic files, one per format with the given number of lines.
+# The peak Python heap while parsing is measured on a second pass, it should not grow with the file size.
+#   python test/benchplaylistparse.py [--lines 1000000] [--formats m3u8 pls xspf] [--keep] [--json]
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+rootDir = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, rootDir)
+
+from component.PlaylistParser import PlaylistParser
+
+def clip(i):
+    return f"{2000 + i % 25}/reel_{i // 1000:04d}/clip_{i:07d}.mp4"
+
+def writeM3U(f, lines):
+    # Extended M3U, a directive and a relative path per entry
+    f.write("#EXTM3U\n")
+    for i in range((lines - 1) // 2):
+        f.write(f"#EXTINF:{30 + i % 600},Clip {i}\n{clip(i)}\n")
+
+def writePLS(f, lines):
+    entries = (lines - 3) // 3
+    f.write("[playlist]\n")
+    for i in range(entries):
+        f.write(f"File{i + 1}=/mnt/footage/{clip(i)}\nTitle{i + 1}=Clip {i}\nLength{i + 1}={30 + i % 600}\n")
+    f.write(f"NumberOfEntries={entries}\nVersion=2\n")
+
+def writeXSPF(f, lines):
+    f.write('<?xml version="1.0" encoding="UTF-8"?>\n<playlist version="1" xmlns="http://xspf.org/ns/0/">\n<trackList>\n')
+    for i in range(lines - 5):
+        f.write(f"<track><location>file:///mnt/footage/{clip(i)}</location><title>Clip {i}</title></track>\n")
+    f.write("</trackList>\n</playlist>\n")
+
+writers = {'m3u8' : writeM3U, 'pls' : writePLS, 'xspf' : writeXSPF}
+
+def parse(path):
+    entries = 0
+    for entry in PlaylistParser.parse(path):
+        entries += 1
+    return entries
+
+def cancelLatency(path):
+    # Time from setting the cancel event to the generator returning
+    cancel = threading.Event()
+    entries = PlaylistParser.parse(path, cancel)
+    for i, entry in enumerate(entries):
+        if i == 1000:
+            begin = time.perf_counter()
+            cancel.set()
+    return (time.perf_counter() - begin) * 1000
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, default=1000000)
+    parser.add_argument("--formats", nargs="+", default=list(writers), choices=list(writers))
+    parser.add_argument("--keep", action="store_true", help="keep the generated files")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp(prefix="benchplaylist")
+    results = {}
+    try:
+        for name in args.formats:
+            path = os.path.join(folder, f"synthetic.{name}")
+            with open(path, "w", encoding="utf-8") as f:
+                writers[name](f, args.lines)
+
+            begin = time.perf_counter()
+            entries = parse(path)
+            seconds = time.perf_counter() - begin
+
+            tracemalloc.start()
+            parse(path)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            results[name] = {
+                'lines' : args.lines,
+                'bytes' : os.path.getsize(path),
+                'entries' : entries,
+                'seconds' : seconds,
+                'entriesPerSecond' : entries / seconds,
+                'linesPerSecond' : args.lines / seconds,
+                'peakHeapBytes' : peak,
+                'cancelMs' : cancelLatency(path)
+            }
+    finally:
+        if args.keep:
+            print("Files kept in", folder)
+        else:
+            shutil.rmtree(folder, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps(results, indent=4))
+        sys.exit()
+    for name, result in results.items():
+        print(f"{name:5} {result['entries']:8d} entries in {result['seconds']*1000:6.0f} ms, "
+              f"{result['entriesPerSecond']:9.0f} entries/s, {result['linesPerSecond']:9.0f} lines/s, "
+              f"peak heap {result['peakHeapBytes']/1024:.0f} KiB, cancelled in {result['cancelMs']:.3f} ms")
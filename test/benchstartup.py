@@ -0,0 +1,89 @@
+# Startup time of player.py, from process spawn to the imports, the window and the first Playing state.
+# Eager builds the whole Controller up front, deferred is the default startup of player.py.
+# The cold run uses an empty bytecode cache, the warm runs reuse it. Runs headless on the offscreen platform.
+#   python test/benchstartup.py [--media sample.mp4] [--warm 5] [--timeout 10] [--json]
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+rootDir = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, rootDir)
+
+def child(spawn, media, deferSetup, timeout):
+    marks = {'interpreter' : time.time()}
+    from PySide2.QtCore import QTimer
+    from PySide2.QtWidgets import QApplication
+    import player
+    marks['imports'] = time.time()
+
+    app = QApplication(sys.argv[:1])
+    vlcOptions = ["--vout=dummy", "--aout=dummy"] if os.environ.get("QT_QPA_PLATFORM") == "offscreen" else []
+    main = player.launch(media, deferSetup=deferSetup, vlcOptions=vlcOptions)
+    marks['window'] = time.time()
+
+    def onState(state):
+        if state == "Playing" and 'playing' not in marks:
+            marks['playing'] = time.time()
+            app.quit()
+    main.stateChanged.connect(onState)
+    QTimer.singleShot(0, lambda: marks.setdefault('eventLoop', time.time()))
+    QTimer.singleShot(int(timeout * 1000), app.quit)
+    if media:
+        app.exec_()
+    else:
+        app.processEvents()
+        marks['eventLoop'] = time.time()
+    main.releasePlayer()
+    return {name : (t - spawn) * 1000 for name, t in marks.items()}
+
+def run(media, deferSetup, timeout, cacheDir):
+    env = dict(os.environ, PYTHONPYCACHEPREFIX=cacheDir)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    command = [sys.executable, __file__, "--timeout", str(timeout), "--child", str(time.time()), media or "", "deferred" if deferSetup else "eager"]
+    out = subprocess.check_output(command, env=env, cwd=rootDir)
+    return json.loads(out.decode().strip().splitlines()[-1])
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2] if values else None
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--media", default=os.path.join(rootDir, "sample.mp4"))
+    parser.add_argument("--warm", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=10)
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--child", nargs=3, metavar=("SPAWN", "MEDIA", "MODE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        spawn, media, mode = args.child
+        print(json.dumps(child(float(spawn), media or None, mode == "deferred", args.timeout)))
+        return
+
+    results = {}
+    for mode in ("eager", "deferred"):
+        with tempfile.TemporaryDirectory() as cacheDir:
+            cold = run(args.media, mode == "deferred", args.timeout, cacheDir)
+            warm = [run(args.media, mode == "deferred", args.timeout, cacheDir) for i in range(args.warm)]
+        results[mode] = {
+            'cold' : cold,
+            'warm' : {name : median([r[name] for r in warm if name in r]) for name in cold}
+        }
+
+    if args.json:
+        print(json.dumps(results, indent=4))
+        return
+    names = ('interpreter', 'imports', 'window', 'eventLoop', 'playing')
+    print(f"{'mode':>9} {'run':>5} " + " ".join(f"{name:>11}" for name in names))
+    for mode, r in results.items():
+        for kind in ('cold', 'warm'):
+            values = r[kind]
+            print(f"{mode:>9} {kind:>5} " + " ".join(f"{values[name]:>9.1f}ms" if values.get(name) is not None else f"{'-':>11}" for name in names))
+
+if __name__ == '__main__':
+    main()
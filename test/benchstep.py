@@ -0,0 +1,86 @@
+# Frame step latency against sample.mp4, time from stepForward/stepBackward until libvlc reports the new time.
+#   python test/benchstep.py [--steps 50] [--media sample.mp4] [--json]
+import argparse
+import json
+import os
+import sys
+
+rootDir = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, rootDir)
+
+from PySide2.QtCore import QTimer
+from PySide2.QtWidgets import QApplication
+
+from component.MediaContainer import MediaContainer
+
+class StepBenchmark(object):
+    def __init__(self, media, steps, timeout=2000):
+        self.player = MediaContainer(vlcOptions=["--vout=dummy", "--aout=dummy"])
+        self.player.latency.setEnabled(True)
+        self.steps = steps
+        self.plan = [("forward", 1)] * steps + [("backward", 1)] * steps + [("forward", 10)] * (steps // 5)
+        self.current = None
+        self.results = {}
+
+        self.timeout = QTimer()
+        self.timeout.setSingleShot(True)
+        self.timeout.setInterval(timeout)
+        self.timeout.timeout.connect(self.next)
+
+        self.player.stateChanged.connect(self.onStateChanged)
+        self.player.eventBridge.timeChanged.connect(self.onTime)
+        self.player.createMedia(media)
+        self.player.play()
+
+    def onStateChanged(self, state):
+        if state == "Playing" and self.current is None:
+            self.player.pause()
+            self.current = "start"
+            QTimer.singleShot(500, self.next)
+
+    def onTime(self, ms):
+        if self.current not in (None, "start"):
+            QTimer.singleShot(0, self.next)
+
+    def next(self):
+        if self.current not in (None, "start"):
+            samples = self.player.latency.samples.get('step', [])
+            self.results.setdefault(self.current, []).extend(samples)
+            self.player.latency.samples.pop('step', None)
+        if not self.plan:
+            self.finish()
+            return
+        direction, n = self.plan.pop(0)
+        self.current = f"{direction} x{n}"
+        self.timeout.start()
+        if direction == "forward":
+            self.player.stepForward(n)
+        else:
+            self.player.stepBackward(n)
+
+    def finish(self):
+        self.timeout.stop()
+        report = {}
+        for name, samples in self.results.items():
+            ordered = sorted(samples)
+            report[name] = {f"p{p}" : self.player.latency.percentile(ordered, p) for p in (50, 95, 99)}
+            report[name]['count'] = len(ordered)
+        self.report = report
+        self.player.releasePlayer()
+        QApplication.instance().quit()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--media", default=os.path.join(rootDir, "sample.mp4"))
+    parser.add_argument("--steps", type=int, default=50)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    bench = StepBenchmark(args.media, args.steps)
+    app.exec_()
+    if args.json:
+        print(json.dumps(bench.report, indent=4))
+    else:
+        for name, r in bench.report.items():
+            print(f"{name:>12}  p50 {r['p50']:7.2f} ms  p95 {r['p95']:7.2f} ms  p99 {r['p99']:7.2f} ms  ({r['count']} steps)")
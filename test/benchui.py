@@ -0,0 +1,234 @@
+# UI hot path micro benchmarks on Qt's offscreen platform, reports the time per call and the Python allocations per call.
+# Results can be saved as a baseline and later runs compared against it, regressions past --threshold fail the run.
+#   python test/benchui.py [--calls 500] [--only name ...] [--save [FILE]] [--baseline [FILE]] [--threshold 20] [--json]
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+rootDir = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, rootDir)
+
+from PySide2.QtCore import QSize, Qt
+from PySide2.QtGui import QColor, QImage
+from PySide2.QtWidgets import QApplication, QWidget
+
+from component.ButtonIcon import ButtonIcon
+from component.FrameWidget import FrameWidget
+from component.PlaybackClock import PlaybackClock
+from component.TimeSlider import TimeSlider
+
+resourcePath = os.path.join(rootDir, "resource").replace("\\", "/")
+defaultBaseline = os.path.join(rootDir, "test", "benchui.baseline.json")
+
+# Widgets stay referenced for the whole run, PySide deletes the C++ side with the last Python reference
+alive = []
+
+class Skip(Exception):
+    pass
+
+class PlayerStub(FrameWidget):
+    # MediaContainer without libvlc, only what the Controller reads while it shows, hides and paints
+    def __init__(self):
+        super(PlayerStub, self).__init__()
+        self.singleWindow = False
+        self.clock = PlaybackClock()
+
+    def controllerGeometry(self):
+        from component.MediaContainer import MediaContainer
+        return MediaContainer.controllerGeometry(self)
+
+def controller():
+    # player.py pulls in libvlc, the Controller cases are skipped where it can't load
+    try:
+        from player import Controller
+    except (ImportError, OSError, AttributeError) as e:
+        raise Skip(f"player.py unavailable ({e})")
+    player = PlayerStub()
+    player.resize(1280, 720)
+    player.show()
+    widget = Controller()
+    widget.player = player
+    widget.show()
+    alive.extend((player, widget))
+    return widget
+
+def toggleVisibility():
+    widget = controller()
+    return lambda i: widget.toggleVisibility(i % 2 == 0)
+
+def paintDragOverlay():
+    widget = controller()
+    widget.resize(1280, 720)
+    widget.drawDrag = True
+    image = QImage(widget.size(), QImage.Format_ARGB32_Premultiplied)
+    return lambda i: widget.render(image)
+
+def buttonSetColor():
+    button = ButtonIcon(icon=f"{resourcePath}/play.svg", iconsize=100)
+    alive.append(button)
+    # The colors a 300 ms hover animation steps through at 60 fps
+    colors = [QColor(255, int(255 * (1 - t / 18)), int(255 * (1 - t / 18))) for t in range(19)]
+    return lambda i: button.setColor(colors[i % len(colors)])
+
+def buttonHover():
+    # One hover animation step on the eight Controller buttons
+    icons = ("pin", "cancel", "play", "speaker", "plus", "replay", "list", "pause")
+    buttons = [ButtonIcon(icon=f"{resourcePath}/{name}.svg", iconsize=100 if name == "play" else 15) for name in icons]
+    alive.extend(buttons)
+    colors = [QColor(255, int(255 * (1 - t / 18)), int(255 * (1 - t / 18))) for t in range(19)]
+    def step(i):
+        for button in buttons:
+            button.setColor(colors[i % len(colors)])
+    return step
+
+def sliderShowTip():
+    parent = QWidget()
+    parent.resize(1280, 40)
+    slider = TimeSlider(Qt.Horizontal, parent)
+    slider.setMaxTime(2 * 60 * 60 * 1000)
+    slider.setMaximum(432000)
+    slider.resize(1280, 20)
+    parent.show()
+    alive.append(parent)
+    slider.blockSignals(True)
+    def step(i):
+        slider.setValue(i * 97 % slider.maximum())
+        slider.showTip(None)
+    return step
+
+def resizeStorm():
+    widget = FrameWidget()
+    widget.show()
+    alive.append(widget)
+    sizes = [QSize(640 + (i * 37) % 640, 360 + (i * 23) % 360) for i in range(64)]
+    return lambda i: widget.resize(sizes[i % len(sizes)])
+
+def updateGrips():
+    widget = FrameWidget()
+    widget.resize(1280, 720)
+    widget.show()
+    alive.append(widget)
+    return lambda i: widget.updateGrips()
+
+cases = (
+    ("Controller.toggleVisibility", toggleVisibility),
+    ("Controller.paintEvent drag", paintDragOverlay),
+    ("ButtonIcon.setColor", buttonSetColor),
+    ("ButtonIcon hover x8", buttonHover),
+    ("TimeSlider.showTip", sliderShowTip),
+    ("FrameWidget.resize storm", resizeStorm),
+    ("FrameWidget.updateGrips", updateGrips),
+)
+
+def percentile(ordered, p):
+    if not ordered:
+        return 0.0
+    index = min(int(round(p / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+def measure(app, step, calls):
+    for i in range(min(calls, 20)):
+        step(i)
+        app.processEvents()
+
+    # Timing pass, pending events are processed between calls but outside the timed region
+    times = []
+    for i in range(calls):
+        begin = time.perf_counter_ns()
+        step(i)
+        times.append((time.perf_counter_ns() - begin) / 1000)
+        app.processEvents()
+
+    # Allocation pass, tracemalloc only sees Python objects and slows everything down so it runs separately
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    peak = 0
+    for i in range(calls):
+        tracemalloc.reset_peak()
+        start = tracemalloc.get_traced_memory()[0]
+        step(i)
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - start)
+        app.processEvents()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    ordered = sorted(times)
+    return {
+        'calls' : calls,
+        'meanUs' : sum(times) / len(times),
+        'p50Us' : percentile(ordered, 50),
+        'p95Us' : percentile(ordered, 95),
+        'peakBytesPerCall' : peak,
+        'retainedBytesPerCall' : retained / calls
+    }
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        if not base or 'meanUs' not in r or not base.get('meanUs'):
+            continue
+        r['deltaPercent'] = (r['meanUs'] - base['meanUs']) * 100 / base['meanUs']
+        if r['deltaPercent'] > threshold:
+            regressions.append(name)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--only", nargs="+", help="run the cases whose name contains any of these")
+    parser.add_argument("--save", nargs="?", const=defaultBaseline, help="store the results as a baseline")
+    parser.add_argument("--baseline", nargs="?", const=defaultBaseline, help="compare against a stored baseline")
+    parser.add_argument("--threshold", type=float, default=20, help="mean time increase in percent counted as a regression")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    results = {}
+    for name, factory in cases:
+        if args.only and not any(part.lower() in name.lower() for part in args.only):
+            continue
+        try:
+            step = factory()
+        except Skip as e:
+            results[name] = {'skipped' : str(e)}
+            continue
+        except Exception as e:
+            results[name] = {'skipped' : f"setup failed ({type(e).__name__}: {e})"}
+            continue
+        try:
+            results[name] = measure(app, step, args.calls)
+        except Exception as e:
+            # One broken case is reported, the rest of the suite still runs
+            results[name] = {'skipped' : f"failed ({type(e).__name__}: {e})"}
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({name : r for name, r in results.items() if 'skipped' not in r}, f, indent=4)
+
+    if args.json:
+        print(json.dumps({'results' : results, 'regressions' : regressions}, indent=4))
+    else:
+        print(f"{'case':>28} {'mean us':>9} {'p50 us':>9} {'p95 us':>9} {'peak B':>8} {'kept B':>8} {'delta':>7}")
+        for name, r in results.items():
+            if 'skipped' in r:
+                print(f"{name:>28}  skipped: {r['skipped']}")
+                continue
+            delta = f"{r['deltaPercent']:+6.1f}%" if 'deltaPercent' in r else ""
+            print(f"{name:>28} {r['meanUs']:>9.1f} {r['p50Us']:>9.1f} {r['p95Us']:>9.1f} "
+                  f"{r['peakBytesPerCall']:>8} {r['retainedBytesPerCall']:>8.1f} {delta:>7}")
+        if regressions:
+            print("Regressions past", args.threshold, "%:", ", ".join(regressions))
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,88 @@
+# Waveform indexing speed, decodes the audio of a file into a peak pyramid and reports it as a multiple of realtime.
+# With --tone a sine of that many seconds is generated and indexed instead, its envelope has to come out filled
+# and flat from the first peak to the last, otherwise the run fails.
+#   python test/benchwaveform.py [--media sample.mp4] [--workers 16] [--tone 120] [--json]
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import wave
+
+rootDir = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, rootDir)
+
+from component.Waveform import WaveformIndexer, np
+
+def writeTone(path, seconds, frequency=440, amplitude=0.5, sampleRate=44100):
+    t = np.arange(int(seconds * sampleRate)) / sampleRate
+    samples = (np.sin(2 * np.pi * frequency * t) * amplitude * 32767).astype("<i2")
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sampleRate)
+        f.writeframes(samples.tobytes())
+
+def checkTone(pyramid, durationMs, amplitude=0.5):
+    # Every level 0 peak of a steady tone reaches close to the amplitude with the same rms, gaps and
+    # time-compressed segments show up as low peaks
+    mins, maxs, rms = pyramid.levels[0]
+    expected = int(durationMs * pyramid.sampleRate / 1000 / pyramid.samplesPerPeak)
+    filled = float(np.mean(maxs > amplitude * 0.8)) if len(maxs) else 0.0
+    flat = float(np.std(rms) / np.mean(rms)) if len(rms) and np.mean(rms) else float("inf")
+    return {'peaks' : len(maxs), 'expectedPeaks' : expected, 'filled' : filled, 'rmsSpread' : flat,
+            'ok' : abs(len(maxs) - expected) <= expected * 0.01 and filled >= 0.98 and flat <= 0.1}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--media", default=os.path.join(rootDir, "sample.mp4"))
+    parser.add_argument("--workers", type=int, default=16, help="segments decoded side by side, each at 1x")
+    parser.add_argument("--tone", type=float, help="seconds of generated 440 Hz tone to index instead of --media")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    work = None
+    media = os.path.abspath(args.media)
+    if args.tone:
+        work = tempfile.mkdtemp(prefix="benchwaveform")
+        media = os.path.join(work, "tone.wav")
+        writeTone(media, args.tone)
+    try:
+        indexer = WaveformIndexer(workers=args.workers, cacheDir=work)
+        pyramid = indexer.index(media, threading.Event())
+    finally:
+        if work:
+            shutil.rmtree(work, ignore_errors=True)
+    if pyramid is None:
+        sys.exit("No audio decoded from " + media)
+
+    begin = time.perf_counter()
+    for width in (200, 800, 3200):
+        pyramid.peaks(0, indexer.duration, width)
+    zoomTime = (time.perf_counter() - begin) * 1000 / 3
+
+    result = {
+        'media' : media,
+        'durationMs' : indexer.duration,
+        'workers' : args.workers,
+        'indexSeconds' : indexer.elapsed,
+        'realtimeFactor' : indexer.realtimeFactor(),
+        'levels' : [len(level[0]) for level in pyramid.levels],
+        'zoomReadMs' : zoomTime
+    }
+    if args.tone:
+        result['tone'] = checkTone(pyramid, args.tone * 1000)
+    if args.json:
+        print(json.dumps(result, indent=4))
+    else:
+        print(f"{media}: {indexer.duration/1000:.1f} s of audio indexed in {indexer.elapsed:.2f} s "
+              f"({result['realtimeFactor']:.1f}x realtime), levels {result['levels']}, zoom read {zoomTime:.2f} ms")
+        if args.tone:
+            tone = result['tone']
+            print(f"tone: {tone['peaks']} of {tone['expectedPeaks']} peaks, {tone['filled']*100:.1f}% filled, "
+                  f"rms spread {tone['rmsSpread']*100:.1f}% {'ok' if tone['ok'] else 'FAIL'}")
+    if args.tone and not result['tone']['ok']:
+        sys.exit(1)
@@ -0,0 +1,107 @@
+# Two window Controller against the single window mode while playing, with the controls shown.
+# Drag: a window drag is replayed through Controller.mouseMoveEvent, the frame time is the time of one move step
+# including the event processing and repaints it causes. Compositor: the translucent top level area the compositor
+# blends for every composited frame, and the pixels Qt repaints per second.
+#   python test/benchwindowmode.py [--media sample.mp4] [--steps 200] [--step 3] [--seconds 3] [--json]
+import argparse
+import json
+import os
+import sys
+import time
+
+rootDir = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, rootDir)
+
+from PySide2.QtCore import QEvent, QObject, QPoint, Qt
+from PySide2.QtGui import QMouseEvent
+from PySide2.QtWidgets import QApplication
+
+import player
+
+class PaintCounter(QObject):
+    def __init__(self):
+        super(PaintCounter, self).__init__()
+        self.pixels = 0
+        self.events = 0
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint:
+            self.events += 1
+            self.pixels += sum(rect.width() * rect.height() for rect in event.region().rects())
+        return False
+
+def wait(app, seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        app.processEvents()
+
+def percentile(ordered, p):
+    return ordered[min(int(round(p / 100 * (len(ordered) - 1))), len(ordered) - 1)] if ordered else 0.0
+
+def run(app, args, singleWindow):
+    vlcOptions = ["--aout=dummy"] + (["--vout=dummy"] if os.environ.get("QT_QPA_PLATFORM") == "offscreen" else [])
+    main = player.launch(args.media, deferSetup=False, vlcOptions=vlcOptions, singleWindow=singleWindow)
+    main.resize(1280, 720)
+    controller = main.controller
+    wait(app, 1.5)
+    controller.toggleVisibility(True)
+    wait(app, 0.5)
+
+    counter = PaintCounter()
+    app.installEventFilter(counter)
+    wait(app, args.seconds)
+    playing = {'pixelsPerSecond' : counter.pixels / args.seconds, 'paintsPerSecond' : counter.events / args.seconds}
+    app.removeEventFilter(counter)
+
+    # The press position stays under the cursor while the window follows it
+    start = QPoint(controller.width() // 2, controller.height() // 2)
+    app.sendEvent(controller, QMouseEvent(QEvent.MouseButtonPress, start, Qt.LeftButton, Qt.LeftButton, Qt.NoModifier))
+    times = []
+    for i in range(args.steps):
+        delta = QPoint(args.step if (i // 50) % 2 == 0 else -args.step, 0)
+        begin = time.perf_counter()
+        app.sendEvent(controller, QMouseEvent(QEvent.MouseMove, start + delta, Qt.NoButton, Qt.LeftButton, Qt.NoModifier))
+        app.processEvents()
+        times.append((time.perf_counter() - begin) * 1000)
+    # No release event, a quick release would count as a click and toggle playback
+    controller.lastButton = None
+
+    translucent = 0 if singleWindow else controller.width() * controller.height()
+    main.releasePlayer()
+    main.close()
+    app.processEvents()
+
+    ordered = sorted(times)
+    return {
+        'dragFrameMs' : {'mean' : sum(times) / len(times), 'p50' : percentile(ordered, 50),
+                         'p95' : percentile(ordered, 95), 'max' : ordered[-1]},
+        'translucentPixelsPerFrame' : translucent,
+        'topLevelWindows' : 1 if singleWindow else 2,
+        'playing' : playing
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--media", default=os.path.join(rootDir, "sample.mp4"))
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--step", type=int, default=3, help="pixels the window moves per step")
+    parser.add_argument("--seconds", type=float, default=3, help="seconds of playback for the repaint count")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    results = {}
+    for name, singleWindow in (("twoWindows", False), ("singleWindow", True)):
+        results[name] = run(app, args, singleWindow)
+
+    if args.json:
+        print(json.dumps(results, indent=4))
+        return
+    print(f"{'mode':>13} {'windows':>8} {'drag p50':>9} {'drag p95':>9} {'drag max':>9} {'blended px':>11} {'Qt px/s':>12} {'paints/s':>9}")
+    for name, r in results.items():
+        d = r['dragFrameMs']
+        print(f"{name:>13} {r['topLevelWindows']:>8} {d['p50']:>7.2f}ms {d['p95']:>7.2f}ms {d['max']:>7.2f}ms "
+              f"{r['translucentPixelsPerFrame']:>11} {r['playing']['pixelsPerSecond']:>12.0f} {r['playing']['paintsPerSecond']:>9.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+# Frame number round trips at NTSC rates: the time of every frame, as a float and truncated to whole ms like
+# libvlc reports it, has to map back to the same frame. Covers FrameIndex on synthetic sample tables and
+# the duration*fps estimate used for files without one.
+#   python test/frameindex.py [--frames 20000]
+import argparse
+import os
+import sys
+from array import array
+from types import SimpleNamespace
+
+rootDir = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, rootDir)
+
+from component.FrameIndex import FrameIndex
+from component.MediaContainer import MediaContainer
+
+# (timescale, ticks per frame, edit list offset)
+rates = [(24000, 1001, 0), (30000, 1001, 0), (60000, 1001, 0), (90000, 3003, 0), (30000, 1001, 2002)]
+
+def roundTrip(container, frames):
+    wrong = {'float' : 0, 'truncated' : 0}
+    for f in range(frames):
+        ms = container.frameToTime(f)
+        wrong['float'] += container.timeToFrame(ms) != f
+        wrong['truncated'] += container.timeToFrame(int(ms)) != f
+    return wrong
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=20000)
+    args = parser.parse_args()
+
+    failed = False
+    for timescale, delta, editOffset in rates:
+        pts = array("q", range(editOffset, editOffset + args.frames * delta, delta))
+        index = FrameIndex(timescale, pts, array("I", [0]), editOffset)
+        for name, frameIndex in (("index", index), ("estimate", None)):
+            container = SimpleNamespace(frameIndex=frameIndex, fps=timescale / delta)
+            container.frameToTime = lambda frame, c=container: MediaContainer.frameToTime(c, frame)
+            container.timeToFrame = lambda ms, c=container: MediaContainer.timeToFrame(c, ms)
+            wrong = roundTrip(container, args.frames)
+            failed = failed or any(wrong.values())
+            print(f"{timescale}/{delta} offset {editOffset} {name:8}: {wrong['float']} wrong from float ms, "
+                  f"{wrong['truncated']} wrong from truncated ms")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,58 @@
+# Decoded frame tap, plays a file into a FrameTap and reads frames in order with their timestamps.
+#   python test/frametap.py [--media sample.mp4] [--chroma RV32] [--policy drop|block] [--pool 4] [--seconds 5]
+import argparse
+import os
+import sys
+import threading
+import time
+
+rootDir = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, rootDir)
+
+from PySide2.QtCore import QTimer
+from PySide2.QtWidgets import QApplication
+
+from component.MediaContainer import MediaContainer
+
+def consume(tap, stop, report):
+    last = None
+    for frame in tap.frames(timeout=0.5):
+        if last is not None:
+            report['intervals'].append((frame.timestamp - last) * 1000)
+        last = frame.timestamp
+        report['mean'] = float(frame.array.mean())
+        report['shape'] = frame.array.shape
+        if stop.is_set():
+            break
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--media", default=os.path.join(rootDir, "sample.mp4"))
+    parser.add_argument("--chroma", default="RV32")
+    parser.add_argument("--policy", default="drop")
+    parser.add_argument("--pool", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    player = MediaContainer(vlcOptions=["--aout=dummy"])
+    player.createMedia(args.media)
+    tap = player.enableFrameTap(chroma=args.chroma, poolSize=args.pool, policy=args.policy)
+    player.play()
+
+    stop = threading.Event()
+    report = {'intervals' : []}
+    consumer = threading.Thread(target=consume, args=(tap, stop, report), daemon=True)
+    consumer.start()
+
+    QTimer.singleShot(int(args.seconds * 1000), app.quit)
+    app.exec_()
+    stop.set()
+    consumer.join(1)
+
+    intervals = report['intervals']
+    print("frame shape", report.get('shape'), "last mean", report.get('mean'))
+    if intervals:
+        print(f"{len(intervals) + 1} frames, mean interval {sum(intervals) / len(intervals):.2f} ms, max {max(intervals):.2f} ms")
+    print(tap.stats())
+    player.releasePlayer()
@@ -0,0 +1,12 @@
+# Peak memory of the running process for the bench scripts, in MB.
+# psutil is only needed on Windows, on POSIX the peak comes from getrusage
+import sys
+
+def peakRss():
+    if sys.platform == "win32":
+        import psutil
+        return psutil.Process().memory_info().peak_wset / (1024*1024)
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes everywhere else
+    return peak / (1024*1024) if sys.platform == "darwin" else peak / 1024
@@ -1,7 +1,14 @@
-import vlc
+import os
+import sys
 import time
 
+sys.path.insert(0, os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")))
+
+import vlc
+from component.InstancePool import InstancePool
+
 files = ['./sample.mp4','./sample.mp4'] 
+pool = InstancePool(vlc.Instance)
 instances = []
 medias = []
 players = []
@@ -9,13 +16,14 @@ players = []
 
 for idx, fname in enumerate(files):
     print("Loading",fname)
-    instances.append(vlc.Instance())
+    instances.append(pool.acquire())
     medias.append(instances[idx].media_new(fname))
 
-    players.append(vlc.MediaPlayer())
+    players.append(instances[idx].media_player_new())
     players[idx].set_media(medias[idx])
     players[idx].play() 
 
+print("Instances", pool.stats())
 player_count = players # copy of the players list so we don't modify during iteration
 still_playing = True
 time.sleep(0.5) # Wait for players to start
@@ -34,3 +42,6 @@ while still_playing:
         continue
     else:
         still_playing = False
+
+for instance in instances:
+    pool.release(instance)
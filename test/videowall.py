@@ -0,0 +1,35 @@
+# Video wall demo, plays the given files (or sample.mp4 repeated) in one grid window and prints per tile metrics.
+#   python test/videowall.py [--tiles 9] [files...]
+import argparse
+import json
+import os
+import sys
+
+rootDir = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, rootDir)
+
+from PySide2.QtCore import QTimer
+from PySide2.QtWidgets import QApplication
+
+from component.VideoWall import VideoWall
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("files", nargs="*")
+    parser.add_argument("--tiles", type=int, default=4)
+    args = parser.parse_args()
+
+    files = args.files or [os.path.join(rootDir, "sample.mp4")]
+    app = QApplication(sys.argv)
+    wall = VideoWall(vlcOptions=["--input-repeat=65535"])
+    wall.resize(1280, 720)
+    wall.show()
+    for i in range(max(args.tiles, len(args.files))):
+        wall.addStream(files[i % len(files)])
+    wall.play()
+
+    report = QTimer()
+    report.setInterval(5000)
+    report.timeout.connect(lambda: print(json.dumps(wall.stats())))
+    report.start()
+    sys.exit(app.exec_())